@@ -0,0 +1,162 @@
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmark_fact_matcher import create_bear_data, create_name
+
+from sample_efficiency_evaluation.entity_information import _load_relation_facts
+from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+from utility.utility import load_json_dict
+
+
+def extract_entity_information_dicts(
+    bear_facts_path: str, bear_relation_info_path: str, path_to_all_entities: str
+) -> dict:
+    """
+    Extract the entity information as dictionaries with alias sets (the representation before EntityFact).
+
+    :param bear_facts_path: Path to bear facts directory.
+    :param bear_relation_info_path: Path to the BEAR relation info file.
+    :param path_to_all_entities: Path to all entities file.
+    :return: Relation dictionary (relation_id -> subj_id -> fact dictionary)
+    """
+    relation_dict: dict = {}
+    all_entities_dict = load_json_dict(path_to_all_entities)
+    subj_aliases_index: dict[str, set[str]] = {}
+    for relation_key in load_json_dict(bear_relation_info_path):
+        relation_dict[relation_key] = {}
+        for fact_dict in _load_relation_facts(f"{bear_facts_path}/{relation_key}.jsonl") or []:
+            fact = {
+                "subj_label": fact_dict["sub_label"],
+                "subj_aliases": set(fact_dict["sub_aliases"]),
+                "obj_id": fact_dict["obj_id"],
+                "obj_label": fact_dict["obj_label"],
+                "obj_aliases": set(),
+                "occurrences": 0,
+                "sentences": {},
+            }
+            if fact_dict["sub_id"] in all_entities_dict:
+                fact["subj_aliases"].update(all_entities_dict[fact_dict["sub_id"]]["aliases"])
+            if fact_dict["obj_id"] in all_entities_dict:
+                fact["obj_aliases"].update(all_entities_dict[fact_dict["obj_id"]]["aliases"])
+            relation_dict[relation_key][fact_dict["sub_id"]] = fact
+            subj_aliases_index.setdefault(fact_dict["sub_id"], set()).update(fact["subj_aliases"])
+    for facts in relation_dict.values():
+        for fact in facts.values():
+            fact["obj_aliases"].update(subj_aliases_index.get(fact["obj_id"], ()))
+    return relation_dict
+
+
+def create_mapping_dicts(mapping: dict) -> dict:
+    """
+    Create a mapping with {"relations": set of (relation_id, subj_id) tuples} values (the representation before the
+    flattened tuples of shared fact tuples).
+
+    :param mapping: Mapping (name -> tuple of (relation_id, subj_id) tuples).
+    :return: Mapping (name -> {"relations": set of (relation_id, subj_id) tuples})
+    """
+    return {
+        name: {"relations": {(relation_id, subj_id) for relation_id, subj_id in facts}}
+        for name, facts in mapping.items()
+    }
+
+
+def create_mapping_tuples(mapping: dict) -> dict:
+    """
+    Copy a mapping with tuple values (the fact tuples are shared with the given mapping).
+
+    :param mapping: Mapping (name -> tuple of (relation_id, subj_id) tuples).
+    :return: Mapping (name -> tuple of (relation_id, subj_id) tuples)
+    """
+    return {name: tuple([*facts]) for name, facts in mapping.items()}
+
+
+def measure(function: Callable, *args) -> tuple[object, float, float]:
+    """
+    Measure the memory retained by the result of a function.
+
+    :param function: Function to measure.
+    :param args: Arguments of the function.
+    :return: (result, retained MiB, seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, memory / 2**20, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the memory of the entity information and the relation and object mapping dictionaries"
+        " as dictionaries with sets and as compact records with interned, shared tuples (synthetic BEAR-big-like data"
+        " with an all entities file)."
+    )
+    parser.add_argument("--num_facts", type=int, default=41000)
+    parser.add_argument("--num_relations", type=int, default=60)
+    parser.add_argument("--num_aliases", type=int, default=3)
+    parser.add_argument("--num_all_entities_aliases", type=int, default=6)
+    parser.add_argument("--max_name_words", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as bear_data_path:
+        create_bear_data(
+            bear_data_path, args.num_facts, args.num_aliases, args.num_relations, args.max_name_words, args.seed
+        )
+        rng = random.Random(args.seed)
+        path_to_all_entities = os.path.join(bear_data_path, "all_entities.json")
+        with open(path_to_all_entities, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    f"Q{entity_index}": {
+                        "aliases": [create_name(rng, args.max_name_words) for _ in range(args.num_all_entities_aliases)]
+                    }
+                    for entity_index in range(max(args.num_facts // 2, 1))
+                },
+                f,
+            )
+        bear_facts_path = os.path.join(bear_data_path, "BEAR")
+        bear_relation_info_path = os.path.join(bear_data_path, "relation_info.json")
+
+        dict_entity_information, dict_memory, dict_seconds = measure(
+            extract_entity_information_dicts, bear_facts_path, bear_relation_info_path, path_to_all_entities
+        )
+        del dict_entity_information
+        entity_information, compact_memory, compact_seconds = measure(
+            FactMatcherSimple.extract_entity_information,
+            bear_facts_path,
+            bear_relation_info_path,
+            path_to_all_entities,
+        )
+        del entity_information
+        print(
+            f"entity information: {dict_memory:.1f} MiB ({dict_seconds:.2f} s) as dictionaries,"
+            f" {compact_memory:.1f} MiB ({compact_seconds:.2f} s) as EntityFact records"
+        )
+
+        fact_matcher = FactMatcherSimple(bear_data_path=bear_data_path, path_to_all_entities=path_to_all_entities)
+        for name, mapping in [
+            ("relation mapping", fact_matcher.relation_mapping_dict),
+            ("object mapping", fact_matcher.object_mapping_dict),
+        ]:
+            _, dict_memory, _ = measure(create_mapping_dicts, mapping)
+            _, compact_memory, _ = measure(create_mapping_tuples, mapping)
+            print(
+                f"{name} ({len(mapping)} names): {dict_memory:.1f} MiB with set values, {compact_memory:.1f} MiB with"
+                " tuple values (without the names and the shared fact tuples)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import spacy
+
+from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+
+SYLLABLES = ["ka", "ro", "vin", "del", "mas", "tor", "li", "an", "ber", "go", "na", "sel", "ur", "qui", "zan", "pe"]
+FILLER = ["the", "of", "and", "in", "was", "river", "capital", "born", "north-east", "province", "(1999)", "blah"]
+
+
+def create_name(rng: random.Random, max_words: int) -> str:
+    num_words = min(max_words, 1 + int(rng.expovariate(0.8)))
+    return " ".join("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize() for _ in range(num_words))
+
+
+def create_bear_data(
+    bear_data_path: str, num_facts: int, num_aliases: int, num_relations: int, max_name_words: int, seed: int
+) -> list[tuple[list[str], list[str]]]:
+    """
+    Create a synthetic BEAR-like dataset (relation_info.json and BEAR/{relation_id}.jsonl).
+
+    The entities have a label and num_aliases aliases (random names and, for every other entity, the initials as a
+    short, case-sensitive alias). The objects are drawn from the subjects, so the object aliases are extended with the
+    subject aliases.
+    :param bear_data_path: Directory to create the dataset in.
+    :param num_facts: Number of facts.
+    :param num_aliases: Number of aliases per entity.
+    :param num_relations: Number of relations.
+    :param max_name_words: Maximum number of words of an entity name.
+    :param seed: Random seed.
+    :return: List of (subject names, object names) tuples of the facts.
+    """
+    rng = random.Random(seed)
+    entities = []
+    for entity_index in range(max(num_facts // 2, 1)):
+        label = create_name(rng, max_name_words)
+        aliases = [create_name(rng, max_name_words) for _ in range(num_aliases)]
+        if aliases and entity_index % 2 == 0:
+            aliases[0] = "".join(word[0] for word in label.split())
+        entities.append((f"Q{entity_index}", label, aliases))
+    relation_ids = [f"P{relation_index}" for relation_index in range(num_relations)]
+    os.makedirs(os.path.join(bear_data_path, "BEAR"), exist_ok=True)
+    with open(os.path.join(bear_data_path, "relation_info.json"), "w", encoding="utf-8") as f:
+        json.dump({relation_id: {"domains": ["Synthetic"]} for relation_id in relation_ids}, f)
+    facts = []
+    for relation_index, relation_id in enumerate(relation_ids):
+        subjects = rng.sample(entities, k=min(len(entities), num_facts // num_relations))
+        with open(os.path.join(bear_data_path, "BEAR", f"{relation_id}.jsonl"), "w", encoding="utf-8") as f:
+            for subj_id, subj_label, subj_aliases in subjects:
+                obj_id, obj_label, obj_aliases = entities[(int(subj_id[1:]) + relation_index + 1) % len(entities)]
+                fact = {
+                    "sub_id": subj_id,
+                    "sub_label": subj_label,
+                    "sub_aliases": subj_aliases,
+                    "obj_id": obj_id,
+                    "obj_label": obj_label,
+                }
+                f.write(json.dumps(fact) + "\n")
+                facts.append(([subj_label, *subj_aliases], [obj_label, *obj_aliases]))
+    return facts
+
+
+def create_documents(
+    facts: list[tuple[list[str], list[str]]],
+    num_docs: int,
+    sentences_per_doc: int,
+    fact_probability: float,
+    seed: int,
+) -> list[dict]:
+    """
+    Create synthetic Wikipedia-like documents.
+
+    :param facts: List of (subject names, object names) tuples of the facts.
+    :param num_docs: Number of documents.
+    :param sentences_per_doc: Number of sentences per document.
+    :param fact_probability: Probability that a sentence mentions a subject and an object of a fact.
+    :param seed: Random seed.
+    :return: List of {"text": document} dictionaries.
+    """
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(num_docs):
+        sentences = []
+        for _ in range(sentences_per_doc):
+            words = rng.choices(FILLER, k=rng.randint(5, 30))
+            if facts and rng.random() < fact_probability:
+                subj_names, obj_names = rng.choice(facts)
+                words.insert(rng.randint(0, len(words)), rng.choice(subj_names))
+                words.insert(rng.randint(0, len(words)), rng.choice(obj_names))
+            sentences.append(" ".join(words).capitalize() + rng.choice([".", "!", "?", ".\n"]))
+        documents.append({"text": " ".join(sentences)})
+    return documents
+
+
+def get_peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 2**20 if platform.system() == "Darwin" else peak_rss / 2**10
+
+
+def run_configuration(configuration: dict) -> dict:
+    """
+    Run a benchmark configuration (in a fresh process, so the peak RSS belongs to this configuration only).
+
+    :param configuration: Benchmark configuration.
+    :return: Measurements.
+    """
+    with tempfile.TemporaryDirectory() as bear_data_path:
+        facts = create_bear_data(
+            bear_data_path,
+            configuration["num_facts"],
+            configuration["num_aliases"],
+            configuration["num_relations"],
+            configuration["max_name_words"],
+            configuration["seed"],
+        )
+        documents = create_documents(
+            facts,
+            configuration["num_docs"],
+            configuration["sentences_per_doc"],
+            configuration["fact_probability"],
+            configuration["seed"],
+        )
+        kwargs = {
+            "bear_data_path": bear_data_path,
+            "max_allowed_ngram_length": configuration["max_allowed_ngram_length"],
+        }
+        start = time.perf_counter()
+        FactMatcherSimple.extract_entity_information(
+            bear_facts_path=os.path.join(bear_data_path, "BEAR"),
+            bear_relation_info_path=os.path.join(bear_data_path, "relation_info.json"),
+        )
+        extract_entity_information_seconds = time.perf_counter() - start
+        fact_matcher = FactMatcherSimple(**kwargs)
+        start = time.perf_counter()
+        fact_matcher._create_mapped_relations()  # pylint: disable=protected-access
+        create_mapped_relations_seconds = time.perf_counter() - start
+        index_peak_rss_mib = get_peak_rss_mib()
+
+        start = time.perf_counter()
+        fact_matcher.create_fact_statistics(documents, text_key="text", save_file_content=True)
+        create_fact_statistics_seconds = time.perf_counter() - start
+
+    num_sentences = configuration["num_docs"] * configuration["sentences_per_doc"]
+    store = fact_matcher.occurrence_store
+    return {
+        "configuration": configuration,
+        "extract_entity_information_seconds": extract_entity_information_seconds,
+        "create_mapped_relations_seconds": create_mapped_relations_seconds,
+        "create_fact_statistics_seconds": create_fact_statistics_seconds,
+        "documents_per_second": configuration["num_docs"] / create_fact_statistics_seconds,
+        "sentences_per_second": num_sentences / create_fact_statistics_seconds,
+        "index_peak_rss_mib": index_peak_rss_mib,
+        "peak_rss_mib": get_peak_rss_mib(),
+        "num_facts": len(store),
+        "num_subject_names": len(fact_matcher.relation_mapping_dict),
+        "max_ngram": fact_matcher.max_ngram,
+        "matched_facts": int((store.occurrences > 0).sum()),
+        "occurrences": int(store.occurrences.sum()),
+        "ngram_window_counters": fact_matcher.ngram_window_counters,
+    }
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark FactMatcherSimple on synthetic BEAR-like facts and Wikipedia-like documents. Each"
+        " dimension is swept separately, with the first value of the other dimensions."
+    )
+    parser.add_argument("--num_facts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--num_aliases", type=int, nargs="+", default=[2, 0, 8])
+    parser.add_argument("--sentences_per_doc", type=int, nargs="+", default=[20, 5, 80])
+    parser.add_argument("--max_allowed_ngram_length", type=int, nargs="+", default=[10, 3, 5])
+    parser.add_argument("--num_relations", type=int, default=10)
+    parser.add_argument("--max_name_words", type=int, default=6)
+    parser.add_argument("--num_docs", type=int, default=500)
+    parser.add_argument("--fact_probability", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output_file", type=str, default="benchmark_fact_matcher.json")
+    args = parser.parse_args()
+
+    dimensions = ["num_facts", "num_aliases", "sentences_per_doc", "max_allowed_ngram_length"]
+    base_configuration = {
+        "num_relations": args.num_relations,
+        "max_name_words": args.max_name_words,
+        "num_docs": args.num_docs,
+        "fact_probability": args.fact_probability,
+        "seed": args.seed,
+        **{dimension: getattr(args, dimension)[0] for dimension in dimensions},
+    }
+    configurations = [base_configuration]
+    for dimension in dimensions:
+        for value in getattr(args, dimension)[1:]:
+            configurations.append({**base_configuration, dimension: value})
+
+    results = []
+    for configuration in configurations:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            result = executor.submit(run_configuration, configuration).result()
+        print(
+            ", ".join(f"{dimension}={configuration[dimension]}" for dimension in dimensions)
+            + f": index {result['extract_entity_information_seconds']:.2f} s +"
+            f" {result['create_mapped_relations_seconds']:.2f} s, {result['documents_per_second']:.1f} docs/s,"
+            f" {result['sentences_per_second']:.1f} sentences/s, {result['peak_rss_mib']:.1f} MiB peak RSS"
+        )
+        results.append(result)
+
+    with open(args.output_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "git_commit": get_git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python_version": platform.python_version(),
+                "spacy_version": spacy.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results saved to {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+from utility import utility
+
+parser = argparse.ArgumentParser(description="Compare the memory of saved sentences and saved sentence references.")
+parser.add_argument(
+    "--bear_data_path",
+    type=str,
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "test_resources"),
+)
+parser.add_argument("--num_docs", type=int, default=2000)
+parser.add_argument("--sentences_per_doc", type=int, default=20)
+parser.add_argument("--facts_per_sentence", type=int, default=3)
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+random.seed(args.seed)
+filler = ["the", "of", "and", "in", "was", "river", "capital", "born", "north-east", "province", "blah"]
+facts = [
+    (fact["subj_label"], fact["obj_label"])
+    for facts_ in FactMatcherSimple.extract_entity_information(
+        bear_facts_path=f"{args.bear_data_path}/BEAR",
+        bear_relation_info_path=f"{args.bear_data_path}/relation_info.json",
+    ).values()
+    for fact in facts_.values()
+]
+
+
+def create_sentence() -> str:
+    words = random.choices(filler, k=random.randint(5, 30))
+    for subj_label, obj_label in random.sample(facts, k=min(args.facts_per_sentence, len(facts))):
+        words.insert(random.randint(0, len(words)), subj_label)
+        words.insert(random.randint(0, len(words)), obj_label)
+    return " ".join(words) + "."
+
+
+documents = [{"text": " ".join(create_sentence() for _ in range(args.sentences_per_doc))} for _ in range(args.num_docs)]
+
+for sentence_references in [False, True]:
+    fact_matcher = FactMatcherSimple(bear_data_path=args.bear_data_path, sentence_references=sentence_references)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    fact_matcher.create_fact_statistics(documents, text_key="text", save_file_content=True)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    memory, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    relation_info_dict = fact_matcher.entity_relation_occurrence_info_dict
+    json_size = len(json.dumps(relation_info_dict, ensure_ascii=False, cls=utility.SetEncoder).encode("utf-8"))
+    num_entries = sum(len(sentences) for sentences in fact_matcher.occurrence_store.sentences.values())
+    print(
+        f"sentence_references={sentence_references}: {memory / 2**20:.2f} MiB retained, {peak_memory / 2**20:.2f} MiB"
+        f" peak, {json_size / 2**20:.2f} MiB json, {num_entries} sentence entries,"
+        f" {len(fact_matcher.occurrence_store.reference_documents)} references, {elapsed:.2f} s"
+    )
+    if sentence_references:
+        start = time.perf_counter()
+        utility.expand_sentence_references(relation_info_dict, documents)
+        print(f"expand_sentence_references: {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import time
+
+from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+from utility import utility
+
+parser = argparse.ArgumentParser(description="Compare per-document and batched sentence splitting.")
+parser.add_argument(
+    "--bear_data_path",
+    type=str,
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "test_resources"),
+)
+parser.add_argument("--num_docs", type=int, default=2000)
+parser.add_argument("--sentences_per_doc", type=int, default=30)
+parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 100, 1000])
+parser.add_argument("--n_processes", type=int, nargs="+", default=[1, 2, 4])
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+random.seed(args.seed)
+vocabulary = [
+    "the",
+    "of",
+    "and",
+    "in",
+    "was",
+    "river",
+    "capital",
+    "United",
+    "States",
+    "America",
+    "Washington,",
+    "D.C.",
+    "born",
+    "(1999)",
+    "north-east",
+    "Limpopo",
+    "province",
+    "Mr.",
+]
+
+
+def create_document() -> str:
+    sentences = []
+    for _ in range(args.sentences_per_doc):
+        words = random.choices(vocabulary, k=random.randint(5, 30))
+        sentences.append(" ".join(words).capitalize() + random.choice([".", "!", "?", ".\n"]))
+    return " ".join(sentences)
+
+
+documents = [create_document() for _ in range(args.num_docs)]
+fact_matcher = FactMatcherSimple(bear_data_path=args.bear_data_path)
+
+start = time.perf_counter()
+num_sentences = 0
+for document in documents:
+    num_sentences += len(list(fact_matcher.nlp(utility.clean_string(document)).sents))
+baseline = time.perf_counter() - start
+print(f"nlp(content) per document: {args.num_docs / baseline:.1f} docs/s ({num_sentences} sentences)")
+
+for n_process in args.n_processes:
+    for batch_size in args.batch_sizes:
+        fact_matcher.sentencizer_batch_size = batch_size
+        fact_matcher.sentencizer_n_process = n_process
+        start = time.perf_counter()
+        num_sentences_batched = 0
+        for split_doc in fact_matcher.split_contents(utility.clean_string(document) for document in documents):
+            num_sentences_batched += len(list(split_doc.sents))
+        elapsed = time.perf_counter() - start
+        assert num_sentences_batched == num_sentences
+        print(
+            f"nlp.pipe batch_size={batch_size} n_process={n_process}: {args.num_docs / elapsed:.1f} docs/s"
+            f" (x{baseline / elapsed:.2f})"
+        )
@@ -1,2 +1,4 @@
 from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+from sample_efficiency_evaluation.fact_matcher_trie import FactMatcherTrie
 from sample_efficiency_evaluation.knowledge_prober import KnowledgeProber
+from sample_efficiency_evaluation.occurrence_store import OccurrenceStore
@@ -0,0 +1,457 @@
+import argparse
+import logging
+import os
+import sys
+from typing import Optional
+
+from utility import utility
+
+
+def str_to_bool(value: str) -> bool:
+    return value.lower() == "true"
+
+
+def get_slice_range(dataset_len: int, total_slices: int, slice_num: int) -> range:
+    """
+    Get the document range of a dataset slice (the last slice contains the remaining documents).
+
+    :param dataset_len: Number of documents in the dataset.
+    :param total_slices: Number of slices.
+    :param slice_num: Index of the slice.
+    :return: Range of the document indices of the slice.
+    """
+    slice_size = dataset_len // total_slices
+    start_index = slice_num * slice_size
+    end_index = dataset_len if slice_num == total_slices - 1 else (slice_num + 1) * slice_size
+    return range(start_index, end_index)
+
+
+def create_matcher(args: argparse.Namespace):
+    """
+    Create the fact matcher of the match command.
+
+    :param args: Arguments of the match command.
+    :return: Fact matcher
+    """
+    # pylint: disable=import-outside-toplevel
+    from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+    from sample_efficiency_evaluation.fact_matcher_trie import FactMatcherTrie
+
+    matcher_types = {"simple": FactMatcherSimple, "trie": FactMatcherTrie}
+    return matcher_types[args.matcher_type](
+        bear_data_path=args.bear_data_path,
+        bear_facts_path=args.bear_facts_path or f"{args.bear_data_path}/BEAR",
+        path_to_all_entities=args.path_to_all_entities or None,
+        exclude_aliases=args.exclude_aliases,
+        index_cache_dir=args.index_cache_dir or None,
+        document_prefilter=args.document_prefilter,
+        profile=bool(args.profile_path),
+        profile_path=args.profile_path or None,
+        max_sentences_per_fact=args.max_sentences_per_fact,
+        sentence_sampling=args.sentence_sampling,
+        alias_attribution=args.alias_attribution,
+        shared_index=args.shared_index,
+        sentence_cache_size=args.sentence_cache_size,
+        document_deduplication=args.document_deduplication,
+        document_fingerprint_dir=args.document_fingerprint_dir or None,
+    )
+
+
+def get_output_paths(output_dir: str, name: str, output_format: str, save_file_content: bool) -> tuple[str, ...]:
+    """
+    Get the relation occurrence info output paths.
+
+    :param output_dir: Output directory.
+    :param name: Name of the output (slice number or "joined").
+    :param output_format: Output format ("json" or "parquet").
+    :param save_file_content: If True, the parquet sentences file is included.
+    :return: Paths of the relation occurrence info file (and the sentences file for parquet outputs).
+    """
+    if output_format == "json":
+        return (os.path.join(output_dir, f"{name}_relation_occurrence_info.json"),)
+    if save_file_content:
+        return (
+            os.path.join(output_dir, f"{name}_relation_occurrence_info.parquet"),
+            os.path.join(output_dir, f"{name}_relation_occurrence_sentences.parquet"),
+        )
+    return (os.path.join(output_dir, f"{name}_relation_occurrence_info.parquet"),)
+
+
+def match(args: argparse.Namespace) -> None:
+    """
+    Match the BEAR facts in the dataset slices and merge the slice results.
+
+    The matcher is created once and the slices are processed one after another (each with num_workers worker
+    processes). Slices with an existing output are skipped and slices with a checkpoint are resumed, so an
+    interrupted run can be restarted with the same arguments. The slice results are only merged once all slices are
+    processed.
+
+    If the dataset path is a local Parquet, JSON Lines or Arrow file, only its text column is loaded (see
+    documents.load_documents), otherwise the dataset is loaded with datasets.load_dataset. The document indices of the
+    sentence references and the match event log are indices in the full dataset (not in the slice). If a match event
+    log directory is given, the matches of every slice are logged to its own subdirectory (see MatchEventLog).
+    :param args: Arguments of the match command.
+    :return:
+    """
+    # pylint: disable=import-outside-toplevel
+    import datasets
+    from sample_efficiency_evaluation.documents import DOCUMENT_FILE_EXTENSIONS, get_chunk, load_documents
+    from sample_efficiency_evaluation.event_log import MatchEventLog
+
+    os.makedirs(os.path.join(args.rel_info_output_dir, "slice_infos"), exist_ok=True)
+    os.makedirs(os.path.join(args.rel_info_output_dir, "checkpoints"), exist_ok=True)
+    if os.path.isfile(args.dataset_path) and args.dataset_path.lower().endswith(DOCUMENT_FILE_EXTENSIONS):
+        full_dataset = load_documents(args.dataset_path, args.text_key)
+    else:
+        full_dataset = datasets.load_dataset(args.dataset_path, args.dataset_name or None, split="train")
+    slice_nums = range(args.total_slices) if args.slice_num is None else [args.slice_num]
+    fact_matcher = create_matcher(args)
+    for slice_num in slice_nums:
+        output_paths = get_output_paths(
+            args.rel_info_output_dir, str(slice_num), args.output_format, args.save_file_content
+        )
+        if all(os.path.exists(output_path) for output_path in output_paths):
+            logging.info("Slice %d is already processed, skipping it", slice_num)
+            continue
+        slice_range = get_slice_range(len(full_dataset), args.total_slices, slice_num)
+        slice_info = (
+            f"Dataset: {args.dataset_path}"
+            f"\nDataset name: {args.dataset_name or None}"
+            f"\nDataset length: {len(full_dataset)}"
+            f"\nStart index: {slice_range.start}"
+            f"\nEnd index: {slice_range.stop}"
+            f"\nTotal slices: {args.total_slices}"
+            f"\nSlice number: {slice_num + 1}"
+            f"\nMatcher type: {args.matcher_type}"
+            f"\nNumber of workers: {args.num_workers}"
+            "\n"
+        )
+        print(slice_info)
+        with open(
+            os.path.join(args.rel_info_output_dir, "slice_infos", f"slice_{slice_num}_info.txt"), "w", encoding="utf-8"
+        ) as f:
+            f.write(slice_info)
+
+        checkpoint_path = None
+        resume_from = None
+        if args.num_workers == 1:
+            checkpoint_path = os.path.join(
+                args.rel_info_output_dir, "checkpoints", f"slice_{slice_num}_checkpoint.json"
+            )
+            resume_from = checkpoint_path if os.path.exists(checkpoint_path) else None
+        fact_matcher.occurrence_store.reset()
+        if args.match_event_log_dir:
+            fact_matcher.match_event_log = MatchEventLog(os.path.join(args.match_event_log_dir, f"slice_{slice_num}"))
+        fact_matcher.create_fact_statistics(
+            get_chunk(full_dataset, slice_range),
+            text_key=args.text_key,
+            save_file_content=args.save_file_content,
+            num_workers=args.num_workers,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval_seconds=args.checkpoint_interval_seconds,
+            resume_from=resume_from,
+            chunks_per_worker=args.chunks_per_worker,
+            document_offset=slice_range.start,
+        )
+        for worker, stats in fact_matcher.worker_utilization.items():
+            print(
+                f"Worker {worker}: {stats['chunks']} chunks, {stats['busy_seconds']:.1f} s busy"
+                f" ({stats['utilization']:.1%} utilization)"
+            )
+        if args.output_format == "parquet":
+            fact_matcher.convert_relation_occurrence_info_dict_to_parquet(*output_paths)
+        else:
+            fact_matcher.convert_relation_occurrence_info_dict_to_json(output_paths[0])
+
+    print_counters(fact_matcher, bool(args.profile_path))
+    if args.slice_num is None:
+        merge_slices(args)
+
+
+def print_counters(fact_matcher, profile: bool) -> None:
+    """
+    Print the counters of the fact matcher (ngram windows, document prefilter, sentence cache, document fingerprints
+    and profile).
+
+    :param fact_matcher: Fact matcher of the match command.
+    :param profile: If True, the profile is printed as well.
+    :return:
+    """
+    print(f"Ngram windows probed: {fact_matcher.ngram_window_counters}")
+    if fact_matcher.document_prefilter is not None:
+        print(f"Document prefilter: {fact_matcher.document_prefilter.counters}")
+    if fact_matcher.sentence_cache is not None:
+        print(f"Sentence cache: {fact_matcher.sentence_cache.counters}")
+    if fact_matcher.document_fingerprints is not None:
+        print(f"Document fingerprints: {fact_matcher.document_fingerprints.counters}")
+    if profile:
+        print(f"Profile: {fact_matcher.get_profile()}")
+
+
+def merge_slices(args: argparse.Namespace) -> None:
+    """
+    Merge the slice results of the match command into the joined relation occurrence info (without the sentences).
+
+    :param args: Arguments of the match command.
+    :return:
+    """
+    slice_output_paths = [
+        get_output_paths(args.rel_info_output_dir, str(slice_num), args.output_format, False)[0]
+        for slice_num in range(args.total_slices)
+    ]
+    joined_output_path = get_output_paths(args.rel_info_output_dir, "joined", args.output_format, False)[0]
+    if args.output_format == "parquet":
+        utility.merge_relation_occurrence_info_parquet_files(slice_output_paths, joined_output_path)
+    else:
+        utility.merge_relation_occurrence_info_json_files(slice_output_paths, joined_output_path)
+    print(f"Merged {args.total_slices} slices into {joined_output_path}")
+
+
+def merge(args: argparse.Namespace) -> None:
+    """
+    Merge relation occurrence info files (json or parquet, see utility.merge_relation_occurrence_info_json_files and
+    utility.merge_relation_occurrence_info_parquet_files).
+
+    :param args: Arguments of the merge command.
+    :return:
+    """
+    if args.output_file.endswith(".parquet"):
+        utility.merge_relation_occurrence_info_parquet_files(
+            args.input_files,
+            args.output_file,
+            args.sentences_input_files or None,
+            args.sentences_output_file or None,
+            max_sentences_per_fact=args.max_sentences_per_fact,
+            sentence_sampling=args.sentence_sampling,
+        )
+    else:
+        utility.merge_relation_occurrence_info_json_files(
+            args.input_files,
+            args.output_file,
+            merge_sentences=args.merge_sentences,
+            max_sentences_per_fact=args.max_sentences_per_fact,
+            sentence_sampling=args.sentence_sampling,
+        )
+
+
+def aggregate(args: argparse.Namespace) -> None:
+    """
+    Count the fact occurrences from match event logs (see FactMatcherSimple.load_match_event_log) and save them.
+
+    :param args: Arguments of the aggregate command.
+    :return:
+    """
+    from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple  # pylint: disable=import-outside-toplevel
+
+    log_dirs = [
+        os.path.join(log_dir, name)
+        for log_dir in args.match_event_log_dirs
+        for name in sorted(os.listdir(log_dir))
+        if name.startswith("slice_") and os.path.isdir(os.path.join(log_dir, name))
+    ] or args.match_event_log_dirs
+    fact_matcher = FactMatcherSimple(
+        bear_data_path=args.bear_data_path,
+        bear_facts_path=args.bear_facts_path or f"{args.bear_data_path}/BEAR",
+        path_to_all_entities=args.path_to_all_entities or None,
+        index_cache_dir=args.index_cache_dir or None,
+        alias_attribution=args.alias_attribution,
+    )
+    fact_matcher.load_match_event_log(
+        log_dirs, subject_aliases=args.subject_aliases, object_aliases=args.object_aliases
+    )
+    if args.output_file.endswith(".parquet"):
+        fact_matcher.convert_relation_occurrence_info_dict_to_parquet(args.output_file)
+    else:
+        fact_matcher.convert_relation_occurrence_info_dict_to_json(args.output_file)
+    print(f"Aggregated {len(log_dirs)} match event logs into {args.output_file}")
+
+
+def histogram(args: argparse.Namespace) -> None:
+    """
+    Create the fact occurrence histogram of a relation occurrence info file.
+
+    :param args: Arguments of the histogram command.
+    :return:
+    """
+    utility.create_fact_occurrence_histogram(
+        args.rel_info_file, output_diagram_name=args.output_diagram_name, output_path=args.output_path or None
+    )
+
+
+def probe(args: argparse.Namespace) -> None:
+    """
+    Probe a model with the BEAR facts (see KnowledgeProber.probe_model).
+
+    :param args: Arguments of the probe command.
+    :return:
+    """
+    from sample_efficiency_evaluation.knowledge_prober import KnowledgeProber  # pylint: disable=import-outside-toplevel
+
+    KnowledgeProber.probe_model(
+        args.model,
+        args.bear_facts_path,
+        args.result_save_path,
+        model_type=args.model_type,
+        batch_size=args.batch_size,
+        device=args.device,
+    )
+
+
+def _add_match_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Add the match command.
+
+    :param subparsers: Subparsers of the command line parser.
+    :return:
+    """
+    match_parser = subparsers.add_parser("match", help="Match the BEAR facts in a dataset and merge the slices.")
+    match_parser.add_argument("--dataset_path", type=str, required=True)
+    match_parser.add_argument("--dataset_name", type=str, default="")
+    match_parser.add_argument("--text_key", type=str, default="text")
+    match_parser.add_argument("--bear_data_path", type=str, required=True)
+    match_parser.add_argument("--bear_facts_path", type=str, default="")
+    match_parser.add_argument("--path_to_all_entities", type=str, default="")
+    match_parser.add_argument("--exclude_aliases", type=str_to_bool, default=False)
+    match_parser.add_argument("--rel_info_output_dir", type=str, required=True)
+    match_parser.add_argument("--matcher_type", type=str, choices=["simple", "trie"], default="simple")
+    match_parser.add_argument("--total_slices", type=int, default=1)
+    match_parser.add_argument(
+        "--slice_num", type=int, default=None, help="Only process this slice (the slices are not merged)."
+    )
+    match_parser.add_argument("--save_file_content", type=str_to_bool, default=True)
+    match_parser.add_argument("--num_workers", type=int, default=1)
+    match_parser.add_argument("--chunks_per_worker", type=int, default=16)
+    match_parser.add_argument("--checkpoint_interval_seconds", type=float, default=1800)
+    match_parser.add_argument("--index_cache_dir", type=str, default="")
+    match_parser.add_argument("--max_sentences_per_fact", type=int, default=None)
+    match_parser.add_argument("--sentence_sampling", type=str, choices=["reservoir", "first"], default="reservoir")
+    match_parser.add_argument("--document_prefilter", type=str_to_bool, default=False)
+    match_parser.add_argument("--profile_path", type=str, default="")
+    match_parser.add_argument("--match_event_log_dir", type=str, default="")
+    match_parser.add_argument("--alias_attribution", type=str_to_bool, default=False)
+    match_parser.add_argument("--shared_index", type=str_to_bool, default=False)
+    match_parser.add_argument(
+        "--sentence_cache_size", type=int, default=None, help="Cache the matches of this many sentences (LRU)."
+    )
+    match_parser.add_argument(
+        "--document_deduplication",
+        type=str,
+        choices=["skip", "report"],
+        default=None,
+        help="Replay the matches of exact-duplicate documents (skip) or only count them (report).",
+    )
+    match_parser.add_argument(
+        "--document_fingerprint_dir",
+        type=str,
+        default="",
+        help="Share the document fingerprints between the slices and runs in this directory.",
+    )
+    match_parser.add_argument("--output_format", type=str, choices=["json", "parquet"], default="json")
+    match_parser.set_defaults(func=match)
+
+
+def _add_merge_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Add the merge command.
+
+    :param subparsers: Subparsers of the command line parser.
+    :return:
+    """
+    merge_parser = subparsers.add_parser("merge", help="Merge relation occurrence info files.")
+    merge_parser.add_argument("input_files", type=str, nargs="+")
+    merge_parser.add_argument("--output_file", type=str, required=True)
+    merge_parser.add_argument("--merge_sentences", type=str_to_bool, default=False)
+    merge_parser.add_argument("--sentences_input_files", type=str, nargs="*", default=[])
+    merge_parser.add_argument("--sentences_output_file", type=str, default="")
+    merge_parser.add_argument("--max_sentences_per_fact", type=int, default=None)
+    merge_parser.add_argument("--sentence_sampling", type=str, choices=["reservoir", "first"], default="reservoir")
+    merge_parser.set_defaults(func=merge)
+
+
+def _add_aggregate_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Add the aggregate command.
+
+    :param subparsers: Subparsers of the command line parser.
+    :return:
+    """
+    aggregate_parser = subparsers.add_parser(
+        "aggregate", help="Count the fact occurrences from match event logs instead of matching the dataset again."
+    )
+    aggregate_parser.add_argument(
+        "match_event_log_dirs", type=str, nargs="+", help="Match event log directories (or their parent directories)."
+    )
+    aggregate_parser.add_argument("--output_file", type=str, required=True)
+    aggregate_parser.add_argument("--bear_data_path", type=str, required=True)
+    aggregate_parser.add_argument("--bear_facts_path", type=str, default="")
+    aggregate_parser.add_argument("--path_to_all_entities", type=str, default="")
+    aggregate_parser.add_argument("--index_cache_dir", type=str, default="")
+    aggregate_parser.add_argument("--subject_aliases", type=str_to_bool, default=True)
+    aggregate_parser.add_argument("--object_aliases", type=str_to_bool, default=True)
+    aggregate_parser.add_argument("--alias_attribution", type=str_to_bool, default=False)
+    aggregate_parser.set_defaults(func=aggregate)
+
+
+def _add_histogram_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Add the histogram command.
+
+    :param subparsers: Subparsers of the command line parser.
+    :return:
+    """
+    histogram_parser = subparsers.add_parser("histogram", help="Plot the fact occurrence histogram.")
+    histogram_parser.add_argument("rel_info_file", type=str)
+    histogram_parser.add_argument("--output_diagram_name", type=str, default="occurrence_statistics")
+    histogram_parser.add_argument("--output_path", type=str, default="")
+    histogram_parser.set_defaults(func=histogram)
+
+
+def _add_probe_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    Add the probe command.
+
+    :param subparsers: Subparsers of the command line parser.
+    :return:
+    """
+    probe_parser = subparsers.add_parser("probe", help="Probe a model with the BEAR facts.")
+    probe_parser.add_argument("--model", type=str, required=True)
+    probe_parser.add_argument("--bear_facts_path", type=str, required=True)
+    probe_parser.add_argument("--result_save_path", type=str, required=True)
+    probe_parser.add_argument("--model_type", type=str, default="CLM")
+    probe_parser.add_argument("--batch_size", type=int, default=32)
+    probe_parser.add_argument("--device", type=str, default="cuda:0")
+    probe_parser.set_defaults(func=probe)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sample-efficiency-evaluation", description="Match, merge and analyze BEAR fact occurrences."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_match_parser(subparsers)
+    _add_merge_parser(subparsers)
+    _add_aggregate_parser(subparsers)
+    _add_histogram_parser(subparsers)
+    _add_probe_parser(subparsers)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    :param argv: Command line arguments (sys.argv[1:] if None).
+    :return: Exit code (1 if the command failed, e.g. because a worker process failed).
+    """
+    args = create_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        args.func(args)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logging.exception("Command %s failed", args.command)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
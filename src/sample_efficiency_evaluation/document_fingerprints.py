@@ -0,0 +1,288 @@
+import hashlib
+import logging
+import os
+import struct
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+FINGERPRINT_SIZE = 16
+MATCH_STRUCT = struct.Struct("<iiiiB")
+MATCH_COUNT_STRUCT = struct.Struct("<I")
+
+
+class DocumentFingerprintSet:
+    """
+    DocumentFingerprintSet is a set of document fingerprints (128-bit BLAKE2b hashes of the cleaned documents) with
+    the matches of every document.
+
+    A document whose fingerprint is in the set is an exact duplicate of a document that was already processed, so its
+    matches can be replayed instead of matching it again. The matches of a document are kept as (fact_id,
+    sentence_index, start_char, end_char, subj_via_alias, obj_via_alias) tuples, from which the occurrences, sentences
+    (start_char and end_char are the offsets of the sentence in the cleaned document), alias attribution and match
+    events of the duplicate can be recreated.
+
+    If a fingerprint directory is given, the fingerprints are appended to a binary part file of this process
+    ("part-*.fp") in the directory and all part files in the directory are loaded, so the set is shared by all
+    slices and runs using the directory. Part files are only read and never rewritten, so several processes can add
+    to the same directory. A record that was not completely written (e.g. because the process was killed) is ignored.
+    The fact ids are only valid for the same entity index, so the directory should only be shared by fact matchers
+    with the same BEAR inputs and index settings (see FactMatcherSimple).
+
+    The fingerprints of the loaded and flushed documents are kept in sorted NumPy arrays and their matches in a single
+    buffer, so such a document takes 32 bytes plus 17 bytes per match. Only the documents added since the last flush
+    are kept in a dictionary. The counters attribute counts the looked up documents and the duplicates.
+    """
+
+    def __init__(self, fingerprint_dir: Optional[str] = None):
+        """
+        Initialize DocumentFingerprintSet.
+
+        :param fingerprint_dir: Directory of the part files. If None, the set is only kept in memory.
+        """
+        self.fingerprint_dir = fingerprint_dir
+        self.counters = {"documents": 0, "duplicates": 0}
+        self._loaded_parts: set[str] = set()
+        self._fingerprints = np.zeros((0, 2), dtype=np.uint64)
+        self._match_starts = np.zeros(0, dtype=np.int64)
+        self._match_ends = np.zeros(0, dtype=np.int64)
+        self._matches = bytearray()
+        self._new_fingerprints: dict[bytes, bytes] = {}
+        self._seen: set[bytes] = set()
+        self._unwritten: list[bytes] = []
+        self._part_path: Optional[str] = None
+        self._part_pid: Optional[int] = None
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints) + len(self._new_fingerprints)
+
+    @staticmethod
+    def get_fingerprint(content: str) -> bytes:
+        """
+        Get the fingerprint of a document.
+
+        :param content: Cleaned document content.
+        :return: BLAKE2b hash (16 bytes) of the content.
+        """
+        return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=FINGERPRINT_SIZE).digest()
+
+    def load(self) -> None:
+        """
+        Load the part files of the fingerprint directory that were not loaded yet.
+
+        :return:
+        """
+        if self.fingerprint_dir is None or not os.path.isdir(self.fingerprint_dir):
+            return
+        fingerprints = []
+        match_starts = []
+        match_ends = []
+        for file_name in sorted(os.listdir(self.fingerprint_dir)):
+            if not file_name.startswith("part-") or not file_name.endswith(".fp") or file_name in self._loaded_parts:
+                continue
+            self._loaded_parts.add(file_name)
+            with open(os.path.join(self.fingerprint_dir, file_name), "rb") as f:
+                part_fingerprints, part_match_ends, part_matches, complete = _parse_part(f.read())
+            if not complete:
+                logging.warning(
+                    "Fingerprint part %s is incomplete, read %d documents", file_name, len(part_fingerprints)
+                )
+            part_match_ends_array = np.array(part_match_ends, dtype=np.int64) + len(self._matches)
+            fingerprints.append(np.frombuffer(b"".join(part_fingerprints), dtype=">u8").reshape(-1, 2))
+            match_starts.append(np.concatenate([[len(self._matches)], part_match_ends_array])[:-1].astype(np.int64))
+            match_ends.append(part_match_ends_array)
+            self._matches.extend(part_matches)
+        if fingerprints:
+            self._insert(fingerprints, match_starts, match_ends)
+
+    def _insert(
+        self, fingerprints: list[np.ndarray], match_starts: list[np.ndarray], match_ends: list[np.ndarray]
+    ) -> None:
+        """
+        Insert documents into the sorted fingerprint arrays (their matches have to be in the buffer already).
+
+        :param fingerprints: Fingerprints of the documents (n x 2 arrays of big-endian uint64).
+        :param match_starts: Start offsets of the matches of the documents in the buffer.
+        :param match_ends: End offsets of the matches of the documents in the buffer.
+        :return:
+        """
+        # The documents are sorted by their fingerprints for the lookup, the matches stay where they are in the buffer.
+        # A document can be in several parts (e.g. if it was seen by several workers), the first one is kept.
+        all_fingerprints = np.concatenate([self._fingerprints, *fingerprints]).astype(np.uint64)
+        order = np.lexsort((all_fingerprints[:, 1], all_fingerprints[:, 0]))
+        sorted_fingerprints = all_fingerprints[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = np.any(sorted_fingerprints[1:] != sorted_fingerprints[:-1], axis=1)
+        order = order[first]
+        self._fingerprints = sorted_fingerprints[first]
+        self._match_starts = np.concatenate([self._match_starts, *match_starts])[order]
+        self._match_ends = np.concatenate([self._match_ends, *match_ends])[order]
+
+    def check(self, fingerprint: bytes) -> bool:
+        """
+        Check whether a document is a duplicate (counted as a document and, if it is one, as a duplicate).
+
+        A document that is not a duplicate is marked as seen until it is added, so its duplicates are found before
+        its matches are added (e.g. while it is read ahead by the sentencizer).
+        :param fingerprint: Fingerprint of the document (see get_fingerprint).
+        :return: True if the document was already seen.
+        """
+        self.counters["documents"] += 1
+        if (
+            fingerprint in self._seen
+            or fingerprint in self._new_fingerprints
+            or self._get_loaded(fingerprint) is not None
+        ):
+            self.counters["duplicates"] += 1
+            return True
+        self._seen.add(fingerprint)
+        return False
+
+    def get(self, fingerprint: bytes) -> Optional[list[tuple[int, int, int, int, bool, bool]]]:
+        """
+        Get the matches of a document.
+
+        :param fingerprint: Fingerprint of the document (see get_fingerprint).
+        :return: List of (fact_id, sentence_index, start_char, end_char, subj_via_alias, obj_via_alias) tuples of the
+        matches of the document or None if the document was not added.
+        """
+        packed_matches = self._new_fingerprints.get(fingerprint)
+        if packed_matches is None:
+            packed_matches = self._get_loaded(fingerprint)
+            if packed_matches is None:
+                return None
+        return [
+            (fact_id, sentence_index, start_char, end_char, bool(flags & 1), bool(flags & 2))
+            for fact_id, sentence_index, start_char, end_char, flags in MATCH_STRUCT.iter_unpack(packed_matches)
+        ]
+
+    def _get_loaded(self, fingerprint: bytes) -> Optional[bytes]:
+        """
+        Get the packed matches of a loaded or flushed document.
+
+        :param fingerprint: Fingerprint of the document.
+        :return: Packed matches or None if the document was not loaded or flushed.
+        """
+        high, low = np.frombuffer(fingerprint, dtype=">u8").astype(np.uint64)
+        index = int(np.searchsorted(self._fingerprints[:, 0], high))
+        while index < len(self._fingerprints) and self._fingerprints[index, 0] == high:
+            if self._fingerprints[index, 1] == low:
+                return bytes(self._matches[self._match_starts[index] : self._match_ends[index]])
+            index += 1
+        return None
+
+    def add(self, fingerprint: bytes, matches: Iterable[tuple[int, int, int, int, bool, bool]]) -> None:
+        """
+        Add a document.
+
+        :param fingerprint: Fingerprint of the document (see get_fingerprint).
+        :param matches: (fact_id, sentence_index, start_char, end_char, subj_via_alias, obj_via_alias) tuples of the
+        matches of the document.
+        :return:
+        """
+        packed_matches = b"".join(
+            MATCH_STRUCT.pack(fact_id, sentence_index, start_char, end_char, subj_via_alias | obj_via_alias << 1)
+            for fact_id, sentence_index, start_char, end_char, subj_via_alias, obj_via_alias in matches
+        )
+        self._seen.discard(fingerprint)
+        self._new_fingerprints[fingerprint] = packed_matches
+        if self.fingerprint_dir is not None:
+            self._unwritten.append(fingerprint)
+
+    def flush(self) -> None:
+        """
+        Append the added documents that were not written yet to the part file of this process and move the added
+        documents to the sorted fingerprint arrays.
+
+        The documents are only written when flush is called (e.g. after a checkpoint), so a run that is resumed from
+        a checkpoint does not find the documents after the checkpoint as duplicates of themselves.
+        :return:
+        """
+        if self._unwritten:
+            self._write_part()
+        if not self._new_fingerprints:
+            return
+        match_lengths = np.fromiter(
+            (len(packed_matches) for packed_matches in self._new_fingerprints.values()),
+            dtype=np.int64,
+            count=len(self._new_fingerprints),
+        )
+        match_ends = len(self._matches) + np.cumsum(match_lengths)
+        self._matches.extend(b"".join(self._new_fingerprints.values()))
+        self._insert(
+            [np.frombuffer(b"".join(self._new_fingerprints), dtype=">u8").reshape(-1, 2)],
+            [match_ends - match_lengths],
+            [match_ends],
+        )
+        self._new_fingerprints.clear()
+
+    def _write_part(self) -> None:
+        """
+        Append the added documents that were not written yet to the part file of this process.
+
+        :return:
+        """
+        if self._part_path is None or self._part_pid != os.getpid():
+            os.makedirs(self.fingerprint_dir, exist_ok=True)
+            self._part_pid = os.getpid()
+            file_name = f"part-{self._part_pid}-{time.time_ns()}.fp"
+            self._part_path = os.path.join(self.fingerprint_dir, file_name)
+            # The own part file is not loaded again, its documents are already in the set.
+            self._loaded_parts.add(file_name)
+        records = []
+        for fingerprint in self._unwritten:
+            packed_matches = self._new_fingerprints[fingerprint]
+            records.append(fingerprint + MATCH_COUNT_STRUCT.pack(len(packed_matches) // MATCH_STRUCT.size))
+            records.append(packed_matches)
+        with open(self._part_path, "ab") as f:
+            f.write(b"".join(records))
+        self._unwritten = []
+
+    def close(self) -> None:
+        """
+        Write the added documents (the next documents are written to a new part file) and forget the documents that
+        were seen but not added (e.g. because the run was interrupted).
+
+        :return:
+        """
+        self.flush()
+        self._seen.clear()
+        self._part_path = None
+        self._part_pid = None
+
+    def reset_counters(self) -> None:
+        """
+        Reset the document and duplicate counters.
+
+        :return:
+        """
+        self.counters = {"documents": 0, "duplicates": 0}
+
+
+def _parse_part(content: bytes) -> tuple[list[bytes], list[int], bytes, bool]:
+    """
+    Parse the records of a part file.
+
+    :param content: Content of the part file.
+    :return: Fingerprints, end offsets of the matches of every record in the packed matches, packed matches of all
+    records and whether the last record is complete.
+    """
+    fingerprints = []
+    match_ends = []
+    matches = []
+    position = 0
+    matches_end = 0
+    header_size = FINGERPRINT_SIZE + MATCH_COUNT_STRUCT.size
+    while position + header_size <= len(content):
+        (num_matches,) = MATCH_COUNT_STRUCT.unpack_from(content, position + FINGERPRINT_SIZE)
+        record_end = position + header_size + num_matches * MATCH_STRUCT.size
+        if record_end > len(content):
+            break
+        fingerprints.append(content[position : position + FINGERPRINT_SIZE])
+        matches.append(content[position + header_size : record_end])
+        matches_end += record_end - position - header_size
+        match_ends.append(matches_end)
+        position = record_end
+    return fingerprints, match_ends, b"".join(matches), position == len(content)
@@ -0,0 +1,152 @@
+import re
+from typing import Iterable, Optional
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class AnchorIndex:
+    """
+    AnchorIndex maps anchors (word character runs of entity names) to the facts of the names.
+
+    A name can only be found in a document if its anchor is a substring of a word character run of the document (the
+    tokens and sentences a name is matched in are substrings of the document, so the word character runs of the name
+    can only be extended in the document). The anchors found in a word character run are cached, since most runs
+    repeat across documents.
+    """
+
+    def __init__(self, max_cache_size: int = 1_000_000):
+        """
+        Initialize AnchorIndex.
+
+        :param max_cache_size: Maximum number of cached word character runs. The cache is cleared when it is full.
+        """
+        self.facts: dict[str, set[tuple]] = {}
+        self.unanchored_facts: set[tuple] = set()
+        self.max_cache_size = max_cache_size
+        self._anchor_lengths: tuple[int, ...] = ()
+        self._cache: dict[str, tuple[str, ...]] = {}
+
+    def add(self, name: str, facts: Iterable[tuple]) -> None:
+        """
+        Add name.
+
+        The anchor of the name is its longest word character run. Names without word characters are always
+        candidates (see unanchored_facts).
+        :param name: Name (as it is compared with the document).
+        :param facts: (relation_id, subj_id) tuples of the name.
+        :return:
+        """
+        words = WORD_PATTERN.findall(name)
+        if not words:
+            self.unanchored_facts.update(facts)
+            return
+        anchor = max(words, key=len)
+        self.facts.setdefault(anchor, set()).update(facts)
+        if len(anchor) not in self._anchor_lengths:
+            self._anchor_lengths = tuple(sorted({*self._anchor_lengths, len(anchor)}))
+        self._cache = {}
+
+    def find_anchors(self, word: str) -> tuple[str, ...]:
+        """
+        Find the anchors that are substrings of a word character run.
+
+        :param word: Word character run of a document.
+        :return: Anchors in the word
+        """
+        anchors = self._cache.get(word)
+        if anchors is not None:
+            return anchors
+        found = []
+        for length in self._anchor_lengths:
+            if length > len(word):
+                break
+            for start in range(len(word) - length + 1):
+                if word[start : start + length] in self.facts:
+                    found.append(word[start : start + length])
+        anchors = tuple(found)
+        if len(self._cache) >= self.max_cache_size:
+            self._cache = {}
+        self._cache[word] = anchors
+        return anchors
+
+    def get_facts(self, words: set[str]) -> set[tuple]:
+        """
+        Get the facts whose names can be in a document.
+
+        :param words: Unique word character runs of the document.
+        :return: Set of (relation_id, subj_id) tuples
+        """
+        facts = set(self.unanchored_facts)
+        for word in words:
+            for anchor in self.find_anchors(word):
+                facts.update(self.facts[anchor])
+        return facts
+
+
+class DocumentPrefilter:
+    """
+    DocumentPrefilter finds the facts that can be matched in a document before it is split into sentences.
+
+    A fact can only be matched in a sentence if a name of its subject and a name of its object are both in the
+    sentence. The prefilter collects the facts of the subject and object names whose anchors (see AnchorIndex) are
+    in the document and intersects them. The candidate facts are a superset of the facts that will be matched in the
+    document, so documents without candidates can be skipped and the matching can be restricted to the candidates
+    without changing the results.
+    """
+
+    def __init__(
+        self,
+        relation_mapping_dict: dict,
+        object_mapping_dict: dict,
+        irregular_object_names: dict[tuple, list[str]],
+        min_entity_name_length: int,
+    ):
+        """
+        Initialize DocumentPrefilter.
+
+        :param relation_mapping_dict: Relation mapping dictionary of the fact matcher (subject names).
+        :param object_mapping_dict: Object mapping dictionary of the fact matcher (lower case object names).
+        :param irregular_object_names: Object names that are not in the object mapping dictionary.
+        :param min_entity_name_length: Minimum length of the subject names that are searched case-insensitive.
+        """
+        self.subject_index = AnchorIndex()
+        self.cased_subject_index = AnchorIndex()
+        self.object_index = AnchorIndex()
+        self.counters = {"documents": 0, "skipped": 0}
+        for joined_ngram, facts in relation_mapping_dict.items():
+            if len(joined_ngram) < min_entity_name_length:
+                self.cased_subject_index.add(joined_ngram, facts)
+            else:
+                self.subject_index.add(joined_ngram, facts)
+        for obj_name_lower, facts in object_mapping_dict.items():
+            self.object_index.add(obj_name_lower, facts)
+        for fact, obj_names in irregular_object_names.items():
+            for obj_name in obj_names:
+                obj_name_lower = obj_name.lower()
+                if len(obj_name_lower) != len(obj_name):
+                    self.object_index.unanchored_facts.add(fact)
+                else:
+                    self.object_index.add(obj_name_lower, {fact})
+
+    def get_candidate_facts(self, content: str) -> Optional[set[tuple]]:
+        """
+        Get the facts that can be matched in a document.
+
+        Documents whose lower case content differs in length or contains a capital sigma (whose lower case depends on
+        the context) are not filtered.
+        :param content: Cleaned document content.
+        :return: Set of (relation_id, subj_id) tuples or None if the document is not filtered.
+        """
+        self.counters["documents"] += 1
+        content_lower = content.lower()
+        if len(content_lower) != len(content) or "Σ" in content:
+            return None
+        words_lower = set(WORD_PATTERN.findall(content_lower))
+        candidate_facts = self.object_index.get_facts(words_lower)
+        if candidate_facts:
+            subject_facts = self.subject_index.get_facts(words_lower)
+            subject_facts.update(self.cased_subject_index.get_facts(set(WORD_PATTERN.findall(content))))
+            candidate_facts.intersection_update(subject_facts)
+        if not candidate_facts:
+            self.counters["skipped"] += 1
+        return candidate_facts
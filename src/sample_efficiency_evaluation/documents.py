@@ -0,0 +1,148 @@
+import os
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+from datasets import Dataset, IterableDataset
+
+DOCUMENT_FILE_EXTENSIONS = (".parquet", ".jsonl", ".json", ".arrow")
+
+
+def load_documents(file_path: str, text_key: str) -> pa.Table:
+    """
+    Load the text column of a local Parquet, JSON Lines or Arrow (IPC file or stream) file.
+
+    Parquet and Arrow files are memory-mapped and only the text column is read, so worker processes forked from this
+    process share the texts.
+    :param file_path: Path to the file (.parquet, .jsonl, .json or .arrow).
+    :param text_key: Key (column) of the text in the documents.
+    :return: Table with the text column.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".parquet":
+        return pq.read_table(file_path, columns=[text_key], memory_map=True)
+    if extension in (".jsonl", ".json"):
+        return pj.read_json(file_path).select([text_key])
+    if extension == ".arrow":
+        source = pa.memory_map(file_path)
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            table = pa.ipc.open_stream(source).read_all()
+        return table.select([text_key])
+    raise ValueError(f"Unsupported document file extension: {extension} (supported: {DOCUMENT_FILE_EXTENSIONS})")
+
+
+def iter_texts(
+    file_contents: Union[Dataset, IterableDataset, pa.Table, Iterable[dict]], text_key: str, batch_size: int = 1000
+) -> Iterator[str]:
+    """
+    Iterate over the texts of the documents.
+
+    Only the text column of a Dataset, IterableDataset or Table is read, in Arrow batches of batch_size documents,
+    instead of decoding every column of every document into a dictionary. Missing texts are returned as empty strings.
+    :param file_contents: Documents.
+    :param text_key: Key of the text in the documents.
+    :param batch_size: Number of documents per batch.
+    :return: Iterator over the texts.
+    """
+    if isinstance(file_contents, Dataset):
+        for batch in file_contents.select_columns([text_key]).with_format("arrow").iter(batch_size=batch_size):
+            yield from (text or "" for text in batch.column(text_key).to_pylist())
+    elif isinstance(file_contents, IterableDataset):
+        for batch in file_contents.select_columns([text_key]).iter(batch_size=batch_size):
+            yield from (text or "" for text in batch[text_key])
+    elif isinstance(file_contents, pa.Table):
+        for batch in file_contents.select([text_key]).to_batches(max_chunksize=batch_size):
+            yield from (text or "" for text in batch.column(0).to_pylist())
+    else:
+        yield from (file_content[text_key] or "" for file_content in file_contents)
+
+
+def skip_documents(
+    file_contents: Union[Dataset, IterableDataset, pa.Table, list[dict]], num_documents: int
+) -> Union[Dataset, IterableDataset, pa.Table, Iterable[dict]]:
+    """
+    Skip the first documents.
+
+    :param file_contents: Documents.
+    :param num_documents: Number of documents to skip.
+    :return: The remaining documents.
+    """
+    if isinstance(file_contents, Dataset):
+        return file_contents.select(range(min(num_documents, len(file_contents)), len(file_contents)))
+    if isinstance(file_contents, IterableDataset):
+        return file_contents.skip(num_documents)
+    if isinstance(file_contents, pa.Table):
+        return file_contents.slice(num_documents)
+    if isinstance(file_contents, (list, tuple)):
+        return file_contents[num_documents:]
+    return islice(file_contents, num_documents, None)
+
+
+def get_text_sizes(
+    file_contents: Union[Dataset, IterableDataset, pa.Table, list[dict]], text_key: str
+) -> Optional[np.ndarray]:
+    """
+    Get the text sizes of the documents.
+
+    The sizes of a Dataset or Table are the byte lengths of the text column, which are read from the Arrow offsets
+    (the texts are not read). The sizes of a list of documents are the character lengths of the texts.
+    :param file_contents: Documents.
+    :param text_key: Key of the text in the documents.
+    :return: Text sizes or None if the documents cannot be indexed.
+    """
+    if isinstance(file_contents, (Dataset, pa.Table)):
+        text_column = (file_contents.with_format("arrow") if isinstance(file_contents, Dataset) else file_contents)[
+            text_key
+        ]
+        text_sizes = pc.binary_length(text_column)  # pylint: disable=no-member
+        return pc.fill_null(text_sizes, 0).to_numpy().astype(np.int64)
+    if isinstance(file_contents, (list, tuple)):
+        return np.fromiter(
+            (len(file_content[text_key]) for file_content in file_contents), np.int64, len(file_contents)
+        )
+    return None
+
+
+def split_into_chunks(text_sizes: np.ndarray, num_chunks: int) -> list[range]:
+    """
+    Split the documents into contiguous chunks of about the same text size.
+
+    The chunks are cut at the document boundaries closest to the multiples of the total size / num_chunks. Every
+    document counts one byte more than its text size, so documents with empty texts are distributed as well.
+    :param text_sizes: Text sizes of the documents (see get_text_sizes).
+    :param num_chunks: Maximum number of chunks.
+    :return: Non-empty document ranges of the chunks (fewer than num_chunks if a document is larger than the target
+    chunk size).
+    """
+    if len(text_sizes) == 0:
+        return []
+    cumulative_sizes = np.concatenate([[0], np.cumsum(text_sizes + 1)])
+    targets = cumulative_sizes[-1] * np.arange(1, num_chunks) / num_chunks
+    upper = np.searchsorted(cumulative_sizes, targets)
+    cuts = np.where(cumulative_sizes[upper] - targets <= targets - cumulative_sizes[upper - 1], upper, upper - 1)
+    boundaries = np.unique(np.concatenate([[0], cuts, [len(text_sizes)]]))
+    return [range(int(start), int(end)) for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+def get_chunk(
+    file_contents: Union[Dataset, pa.Table, list[dict]], document_range: range
+) -> Union[Dataset, pa.Table, list[dict]]:
+    """
+    Get a chunk of the documents.
+
+    :param file_contents: Documents that can be indexed.
+    :param document_range: Range of the documents of the chunk.
+    :return: Documents of the chunk.
+    """
+    if isinstance(file_contents, Dataset):
+        return file_contents.select(document_range)
+    if isinstance(file_contents, pa.Table):
+        return file_contents.slice(document_range.start, len(document_range))
+    return file_contents[document_range.start : document_range.stop]
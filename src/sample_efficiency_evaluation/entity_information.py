@@ -0,0 +1,168 @@
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+
+from utility.utility import load_json_dict, load_json_line_dict
+
+
+class EntityFact:
+    """
+    EntityFact is a fact of the entity information (see extract_entity_information).
+
+    The fields are kept in slots instead of a dictionary, the ids and labels are interned and the aliases are kept as
+    interned tuples, which are shared by all facts with the same aliases (e.g. all facts with the same object). For
+    reading, a fact can be used like a fact of the relation info dictionary (fact["subj_label"], "obj_id" in fact,
+    fact.get("occurrences", 0)), it has no occurrences and sentences though.
+    """
+
+    __slots__ = ("subj_label", "subj_aliases", "obj_id", "obj_label", "obj_aliases")
+
+    def __init__(
+        self,
+        subj_label: str,
+        subj_aliases: tuple[str, ...],
+        obj_id: str,
+        obj_label: str,
+        obj_aliases: tuple[str, ...],
+    ):
+        """
+        Initialize EntityFact.
+
+        :param subj_label: Subject label.
+        :param subj_aliases: Subject aliases.
+        :param obj_id: Object id.
+        :param obj_label: Object label.
+        :param obj_aliases: Object aliases.
+        """
+        self.subj_label = subj_label
+        self.subj_aliases = subj_aliases
+        self.obj_id = obj_id
+        self.obj_label = obj_label
+        self.obj_aliases = obj_aliases
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EntityFact):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"EntityFact({', '.join(f'{key}={getattr(self, key)!r}' for key in self.__slots__)})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get field.
+
+        :param key: Field name.
+        :param default: Value to return if the fact has no such field.
+        :return: Field value or default
+        """
+        return getattr(self, key) if key in self.__slots__ else default
+
+
+def extract_entity_information(
+    bear_facts_path: str,
+    bear_relation_info_path: str,
+    path_to_all_entities: Optional[str] = None,
+    exclude_aliases: bool = False,
+    max_loading_threads: int = 8,
+) -> dict:
+    """
+    Extract entity information from bear data (see FactMatcherBase.extract_entity_information).
+
+    :param bear_facts_path: Path to bear facts directory.
+    :param bear_relation_info_path: Path to the BEAR relation info file.
+    :param path_to_all_entities: Path to all entities file.
+    This file contains additional aliases for the entities.
+    :param exclude_aliases: If True, the aliases will not be included in the entity information.
+    :param max_loading_threads: Maximum number of threads loading the relation files.
+    :return: Relation dictionary (relation_id -> subj_id -> EntityFact)
+    """
+    relation_dict: dict[str, dict[str, EntityFact]] = {}
+    bear_relation_info_dict: dict = load_json_dict(bear_relation_info_path)
+    all_entities_dict: dict = {}
+    if path_to_all_entities and not exclude_aliases:
+        all_entities_dict = load_json_dict(path_to_all_entities)
+    interned_aliases: dict[tuple[str, ...], tuple[str, ...]] = {}
+    subj_aliases_index: dict[str, tuple[str, ...]] = {}
+    with ThreadPoolExecutor(max_workers=max_loading_threads) as executor:
+        fact_lists = executor.map(
+            _load_relation_facts,
+            [f"{bear_facts_path}/{relation_key}.jsonl" for relation_key in bear_relation_info_dict],
+        )
+        relation_fact_lists = list(zip(bear_relation_info_dict, fact_lists))
+    for relation_key, fact_list in relation_fact_lists:
+        if fact_list is None:
+            logging.error("File not found: %s/%s.jsonl", bear_facts_path, relation_key)
+            continue
+        logging.info("Extracting entity information for %s", relation_key)
+        facts = relation_dict[sys.intern(relation_key)] = {}
+        for fact_dict in fact_list:
+            subj_id = sys.intern(fact_dict["sub_id"])
+            obj_id = sys.intern(fact_dict["obj_id"])
+            subj_aliases: Iterable[str] = ()
+            obj_aliases: Iterable[str] = ()
+            if not exclude_aliases:
+                subj_aliases = fact_dict["sub_aliases"]
+                if subj_id in all_entities_dict:
+                    subj_aliases = [*subj_aliases, *all_entities_dict[subj_id]["aliases"]]
+                if obj_id in all_entities_dict:
+                    obj_aliases = all_entities_dict[obj_id]["aliases"]
+            fact = EntityFact(
+                subj_label=sys.intern(fact_dict["sub_label"]),
+                subj_aliases=_intern_aliases(subj_aliases, interned_aliases),
+                obj_id=obj_id,
+                obj_label=sys.intern(fact_dict["obj_label"]),
+                obj_aliases=_intern_aliases(obj_aliases, interned_aliases),
+            )
+            facts[subj_id] = fact
+            indexed_aliases = subj_aliases_index.get(subj_id, ())
+            if fact.subj_aliases and indexed_aliases != fact.subj_aliases:
+                subj_aliases_index[subj_id] = _intern_aliases((*indexed_aliases, *fact.subj_aliases), interned_aliases)
+    # The object aliases only depend on the object, so they are extended once per object.
+    obj_aliases_index: dict[str, tuple[str, ...]] = {}
+    for facts in relation_dict.values():
+        for fact in facts.values():
+            if fact.obj_id not in subj_aliases_index:
+                continue
+            if fact.obj_id not in obj_aliases_index:
+                obj_aliases_index[fact.obj_id] = _intern_aliases(
+                    (*fact.obj_aliases, *subj_aliases_index[fact.obj_id]), interned_aliases
+                )
+            fact.obj_aliases = obj_aliases_index[fact.obj_id]
+    return relation_dict
+
+
+def _intern_aliases(
+    aliases: Iterable[str], interned_aliases: dict[tuple[str, ...], tuple[str, ...]]
+) -> tuple[str, ...]:
+    """
+    Intern aliases.
+
+    :param aliases: Aliases (duplicates are removed, the first occurrence is kept).
+    :param interned_aliases: Already interned alias tuples (tuple -> the same tuple).
+    :return: Tuple of interned aliases, shared with all equal alias tuples interned before.
+    """
+    alias_tuple = tuple(dict.fromkeys(map(sys.intern, aliases)))
+    return interned_aliases.setdefault(alias_tuple, alias_tuple)
+
+
+def _load_relation_facts(relation_facts_path: str) -> Optional[list[dict]]:
+    """
+    Load the facts of a relation.
+
+    :param relation_facts_path: Path to the relation facts file (.jsonl).
+    :return: List of facts or None if the file does not exist.
+    """
+    try:
+        return load_json_line_dict(relation_facts_path)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,229 @@
+import logging
+import os
+import time
+import uuid
+from array import array
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MATCH_EVENT_SCHEMA = pa.schema(
+    [
+        ("document_index", pa.int64()),
+        ("sentence_index", pa.int32()),
+        ("relation_id", pa.string()),
+        ("subj_id", pa.string()),
+        ("subj_via_alias", pa.bool_()),
+        ("obj_via_alias", pa.bool_()),
+    ]
+)
+
+
+class MatchEventLog:
+    """
+    MatchEventLog is an append-only log of the fact matches (one event per matched fact and sentence).
+
+    An event is (document_index, sentence_index, relation_id, subj_id, subj_via_alias, obj_via_alias), where
+    subj_via_alias (obj_via_alias) is True if the subject (object) was only found by one of its aliases and not by its
+    label. The events are buffered and written in batches to zstd compressed Arrow IPC stream files
+    ("part-{run_id}-{pid}-{time_ns}.arrow") in the log directory. Every process and every run writes its own part
+    file, so worker processes and runs can log to the same directory. A part file that was not closed (e.g. because
+    the process was killed) can still be read up to its last complete batch.
+
+    The fact occurrences can be rebuilt from the log with count_match_events (see also
+    FactMatcherSimple.load_match_event_log). Events that were logged twice in the same run (documents processed
+    again after resuming from a checkpoint, which continues the run of the checkpoint) are only counted once. Every
+    call of FactMatcherSimple.create_fact_statistics starts a new run, so the events of several runs (e.g. of
+    different datasets) in the same directory are all counted, even if they have the same document indices.
+    """
+
+    def __init__(self, log_dir: str, batch_size: int = 2**16, run_id: Optional[str] = None):
+        """
+        Initialize MatchEventLog.
+
+        :param log_dir: Directory to write the part files to.
+        :param batch_size: Number of events per written batch.
+        :param run_id: Id of the run (see start_run).
+        """
+        self.log_dir = log_dir
+        self.batch_size = batch_size
+        self.run_id = ""
+        self._writer: Optional[pa.ipc.RecordBatchStreamWriter] = None
+        self._writer_pid: Optional[int] = None
+        self._clear_buffer()
+        self.start_run(run_id)
+
+    def start_run(self, run_id: Optional[str] = None) -> None:
+        """
+        Close the part file and write the next events to a part file of a run.
+
+        :param run_id: Id of the run (a string without "-"). If None, a new run is started. The id of a run that is
+        continued (e.g. resumed from a checkpoint) has to be given, so its events are deduplicated together.
+        :return:
+        """
+        self.close()
+        self.run_id = uuid.uuid4().hex if run_id is None else run_id
+
+    def _clear_buffer(self) -> None:
+        self._document_indices = array("q")
+        self._sentence_indices = array("i")
+        self._relation_ids: list[str] = []
+        self._subj_ids: list[str] = []
+        self._subj_via_alias: list[bool] = []
+        self._obj_via_alias: list[bool] = []
+
+    def add(
+        self,
+        document_index: int,
+        sentence_index: int,
+        relation_id: str,
+        subj_id: str,
+        subj_via_alias: bool,
+        obj_via_alias: bool,
+    ) -> None:
+        """
+        Add a match event.
+
+        :param document_index: Index of the document in the dataset.
+        :param sentence_index: Index of the sentence in the document.
+        :param relation_id: Relation id of the matched fact.
+        :param subj_id: Subject id of the matched fact.
+        :param subj_via_alias: True if the subject was only found by an alias.
+        :param obj_via_alias: True if the object was only found by an alias.
+        :return:
+        """
+        self._document_indices.append(document_index)
+        self._sentence_indices.append(sentence_index)
+        self._relation_ids.append(relation_id)
+        self._subj_ids.append(subj_id)
+        self._subj_via_alias.append(subj_via_alias)
+        self._obj_via_alias.append(obj_via_alias)
+        if len(self._relation_ids) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered events to the part file of this process.
+
+        :return:
+        """
+        if not self._relation_ids:
+            return
+        if self._writer is None or self._writer_pid != os.getpid():
+            # A writer inherited from the parent process (fork) is dropped without closing the parent's file.
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._writer_pid = os.getpid()
+            part_path = os.path.join(self.log_dir, f"part-{self.run_id}-{self._writer_pid}-{time.time_ns()}.arrow")
+            self._writer = pa.ipc.new_stream(
+                part_path, MATCH_EVENT_SCHEMA, options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+        batch = pa.record_batch(
+            [
+                pa.array(self._document_indices, type=pa.int64()),
+                pa.array(self._sentence_indices, type=pa.int32()),
+                pa.array(self._relation_ids, type=pa.string()),
+                pa.array(self._subj_ids, type=pa.string()),
+                pa.array(self._subj_via_alias, type=pa.bool_()),
+                pa.array(self._obj_via_alias, type=pa.bool_()),
+            ],
+            schema=MATCH_EVENT_SCHEMA,
+        )
+        self._writer.write_batch(batch)
+        self._clear_buffer()
+
+    def close(self) -> None:
+        """
+        Write the buffered events and close the part file (the next events are written to a new part file).
+
+        :return:
+        """
+        self.flush()
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._writer.close()
+        self._writer = None
+        self._writer_pid = None
+
+
+def read_match_event_part(part_path: str) -> list[pa.RecordBatch]:
+    """
+    Read the complete batches of a part file.
+
+    :param part_path: Path to the part file.
+    :return: Batches of the part file.
+    """
+    batches = []
+    try:
+        with pa.ipc.open_stream(pa.memory_map(part_path)) as reader:
+            for batch in reader:
+                batches.append(batch)
+    except (pa.ArrowInvalid, OSError):
+        logging.warning("Match event log part %s is incomplete, read %d batches", part_path, len(batches))
+    return batches
+
+
+def _get_part_run_id(file_name: str) -> str:
+    """
+    Get the run id of a part file.
+
+    :param file_name: Name of the part file.
+    :return: Run id or "" for part files without run id ("part-{pid}-{time_ns}.arrow").
+    """
+    name_parts = file_name[len("part-") : -len(".arrow")].split("-")
+    return name_parts[0] if len(name_parts) == 3 else ""
+
+
+def read_match_events(log_dir: str) -> pa.Table:
+    """
+    Read the events of a match event log without duplicates.
+
+    The events are only deduplicated within a run (see MatchEventLog.start_run), the events of different runs are
+    all kept.
+    :param log_dir: Directory of the match event log.
+    :return: Table of the distinct events of every run (see MATCH_EVENT_SCHEMA).
+    """
+    run_batches: dict[str, list[pa.RecordBatch]] = {}
+    for file_name in sorted(os.listdir(log_dir)):
+        if file_name.startswith("part-") and file_name.endswith(".arrow"):
+            run_batches.setdefault(_get_part_run_id(file_name), []).extend(
+                read_match_event_part(os.path.join(log_dir, file_name))
+            )
+    return pa.concat_tables(
+        [
+            pa.Table.from_batches(batches, schema=MATCH_EVENT_SCHEMA)
+            .group_by(MATCH_EVENT_SCHEMA.names, use_threads=False)
+            .aggregate([])
+            .select(MATCH_EVENT_SCHEMA.names)
+            for batches in run_batches.values()
+        ]
+        or [MATCH_EVENT_SCHEMA.empty_table()]
+    )
+
+
+def count_match_events(
+    log_dirs: Iterable[str], subject_aliases: bool = True, object_aliases: bool = True, by_alias: bool = False
+) -> dict[tuple, int]:
+    """
+    Count the occurrences of the facts in match event logs.
+
+    The events are only deduplicated within a run (see read_match_events), so the document indices only have to be
+    unique within a run.
+    :param log_dirs: Directories of the match event logs.
+    :param subject_aliases: If False, only the matches with the subject label are counted.
+    :param object_aliases: If False, only the matches with the object label are counted.
+    :param by_alias: If True, the occurrences are counted by how the facts were found.
+    :return: Dictionary of (relation_id, subj_id) -> occurrences, or (relation_id, subj_id, subj_via_alias,
+    obj_via_alias) -> occurrences if by_alias is True.
+    """
+    keys = ["relation_id", "subj_id", "subj_via_alias", "obj_via_alias"] if by_alias else ["relation_id", "subj_id"]
+    occurrences: dict[tuple, int] = {}
+    for log_dir in log_dirs:
+        events = read_match_events(log_dir)
+        if not subject_aliases:
+            events = events.filter(pc.invert(events["subj_via_alias"]))  # pylint: disable=no-member
+        if not object_aliases:
+            events = events.filter(pc.invert(events["obj_via_alias"]))  # pylint: disable=no-member
+        counts = events.group_by(keys, use_threads=False).aggregate([([], "count_all")])
+        for *key, count in zip(*[counts[name].to_pylist() for name in [*keys, "count_all"]]):
+            occurrences[tuple(key)] = occurrences.get(tuple(key), 0) + count
+    return occurrences
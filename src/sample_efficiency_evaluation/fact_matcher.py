@@ -1,149 +1,40 @@
 import logging
+import os
+import sys
+import time
 
-from abc import ABC, abstractmethod
-from typing import Union, Optional
-from more_itertools import windowed
+from itertools import count, groupby
+from typing import Iterable, Iterator, Union, Optional
 
+import pyarrow as pa
 from datasets import DatasetDict, Dataset, IterableDatasetDict, IterableDataset
 from tqdm import tqdm
-from spacy.lang.en import English
 
+from sample_efficiency_evaluation.document_fingerprints import DocumentFingerprintSet
+from sample_efficiency_evaluation.document_prefilter import DocumentPrefilter
+from sample_efficiency_evaluation.documents import iter_texts, skip_documents
+from sample_efficiency_evaluation.event_log import MatchEventLog, count_match_events
+from sample_efficiency_evaluation.fact_matcher_base import FactMatcherBase
+from sample_efficiency_evaluation.index_cache import get_index_cache_path
+from sample_efficiency_evaluation.object_matcher import ObjectMatcher
+from sample_efficiency_evaluation.scheduler import ChunkScheduler
+from sample_efficiency_evaluation.sentence_cache import SentenceMatchCache
+from sample_efficiency_evaluation.shared_index import SharedMatchIndex
 from utility import utility
-from utility.utility import word_in_sentence, load_json_dict, load_json_line_dict
-
-
-class FactMatcherBase(ABC):
-    """
-    FactMatcherBase
-    """
-
-    def __init__(self, **kwargs):
-        """
-        Initialize FactMatcherBase class.
-        """
-
-        bear_data_path = kwargs.get("bear_data_path")
-
-        self.entity_relation_occurrence_info_dict: dict = self.extract_entity_information(
-            bear_facts_path=kwargs.get("bear_facts_path", f"{bear_data_path}/BEAR"),
-            bear_relation_info_path=kwargs.get("bear_relation_info_path", f"{bear_data_path}/relation_info.json"),
-            path_to_all_entities=kwargs.get("path_to_all_entities", None),
-            exclude_aliases=kwargs.get("exclude_aliases", False),
-        )
-
-        self.nlp = English()
-
-        self.tokenizer = self.nlp.tokenizer
-
-        self.nlp.add_pipe("sentencizer")
-
-    def convert_relation_occurrence_info_dict_to_json(self, json_output_file_path: str) -> None:
-        """
-        Convert relation info dictionary to json file.
-
-        :param json_output_file_path: Path to save the json file.
-        :return:
-        """
-        utility.save_dict_as_json(self.entity_relation_occurrence_info_dict, json_output_file_path)
-
-    def get_tokens_from_sentence(
-        self, sentence: str, only_lower: bool = True
-    ) -> Union[list[str], tuple[list[str], list[str]]]:
-        """
-        Get tokens from sentence.
-        :param sentence: Sentence
-        :param only_lower: Return only lower case tokens
-        :return: List of tokens
-        """
-        if only_lower:
-            return [token.orth_ for token in self.tokenizer(sentence.lower())]
-        return [token.orth_ for token in self.tokenizer(sentence)], [
-            token.orth_ for token in self.tokenizer(sentence.lower())
-        ]
-
-    @staticmethod
-    def extract_entity_information(
-        bear_facts_path: str,
-        bear_relation_info_path: str,
-        path_to_all_entities: Optional[str] = None,
-        exclude_aliases: bool = False,
-    ) -> dict:
-        """
-        Extract entity information from bear data.
-
-        First, the method will load the relation info dictionary.
-        Then, it will iterate over the relation info dictionary and load the facts for each relation.
-        The entity information will be extracted and stored in a dictionary.
-        If the path to all entities is provided, the method will load the additional aliases for the entities
-         (for both subject and object).
-        Lastly, some more aliases are added to the object aliases by checking if the object id is a subject in another
-        relation (in the BEAR relation files e.g. "P6.jsonl", subjects have aliases provided).
-        This ensures that each entity has all the aliases from the BEAR data.
-        :param bear_facts_path: Path to bear facts directory.
-        :param bear_relation_info_path: Path to the BEAR relation info file.
-        :param path_to_all_entities: Path to all entities file.
-        This file contains additional aliases for the entities.
-        :param exclude_aliases: If True, the aliases will not be included in the entity information.
-        :return: Relation dictionary
-        """
-        relation_dict: dict = {}
-        bear_relation_info_dict: dict = load_json_dict(bear_relation_info_path)
-        all_entities_dict: dict = {}
-        if path_to_all_entities:
-            all_entities_dict = load_json_dict(path_to_all_entities)
-        for relation_key, _ in bear_relation_info_dict.items():
-            try:
-                fact_list: list[dict] = load_json_line_dict(f"{bear_facts_path}/{relation_key}.jsonl")
-                relation_dict.update({relation_key: {}})
-            except FileNotFoundError:
-                logging.error("File not found: %s/%s.jsonl", bear_facts_path, relation_key)
-                continue
-            for fact_dict in fact_list:
-                logging.info("Extracting entity information for %s", relation_key)
-                relation_dict[relation_key][fact_dict["sub_id"]] = {
-                    "subj_label": fact_dict["sub_label"],
-                    "subj_aliases": set([] if exclude_aliases else fact_dict["sub_aliases"]),
-                    "obj_id": fact_dict["obj_id"],
-                    "obj_label": fact_dict["obj_label"],
-                    "obj_aliases": set(),
-                    "occurrences": 0,
-                    "sentences": {},
-                }
-                if path_to_all_entities and not exclude_aliases:
-                    if fact_dict["sub_id"] in all_entities_dict:
-                        relation_dict[relation_key][fact_dict["sub_id"]]["subj_aliases"].update(
-                            all_entities_dict[fact_dict["sub_id"]]["aliases"]
-                        )
-                    if fact_dict["obj_id"] in all_entities_dict:
-                        relation_dict[relation_key][fact_dict["sub_id"]]["obj_aliases"].update(
-                            all_entities_dict[fact_dict["obj_id"]]["aliases"]
-                        )
-        if not exclude_aliases:
-            for _, relations in relation_dict.items():
-                for _, fact in relations.items():
-                    for _, relations_ in relation_dict.items():
-                        try:
-                            fact["obj_aliases"].update(relations_[fact["obj_id"]]["subj_aliases"])
-                        except KeyError:
-                            continue
-        return relation_dict
-
-    @abstractmethod
-    def create_fact_statistics(
-        self,
-        file_contents: Union[DatasetDict, Dataset, IterableDatasetDict, IterableDataset],
-        text_key: str = "text",
-        save_file_content: bool = False,
-    ) -> None:
-        """
-        Create fact statistics
-        """
+from utility.utility import load_json_dict
 
 
 class FactMatcherSimple(FactMatcherBase):
     """
     FactMatcherSimple is a class that uses a simple search by string heuristic to search for entities in the dataset.
 
+    The ngram_window_counters attribute counts the ngram windows of length 1 to max_ngram that were probed and skipped
+    (see ngram_start_index) while creating the fact statistics. If the document prefilter is enabled, its counters
+    attribute counts the filtered and skipped documents, and if the sentence cache is enabled, its counters attribute
+    counts the hits, misses and evictions. If document deduplication is enabled, the counters attribute of the
+    document fingerprints counts the documents and the exact duplicates. The worker_utilization attribute holds the
+    utilization of the worker processes of the last parallel run (see ChunkScheduler).
+
     kwargs:
         - bear_data_path [str]: Path to bear data directory.
             This is the main directory where all the bear data is stored. It should contain the relation_info.json file
@@ -170,6 +61,87 @@ class FactMatcherSimple(FactMatcherBase):
         - min_entity_name_length [Optional[int]]: Minimum length of the entity name to search for case-insensitive.
             The default is 4. In cases where an entity name is shorter than the min, the search will be case-sensitive.
             This is to avoid matching common words like "is" or "of" (e.g. "US" should not match "us" in "us together").
+
+        - index_cache_dir [Optional[str]]: Directory to cache the entity index (occurrence store) and the relation
+            mapping dictionary in. The cache file is keyed by the BEAR input files and the kwargs above, so a matcher
+            created with the same inputs loads the cache instead of building the index. The default is None (no
+            cache).
+
+        - sentencizer_batch_size [Optional[int]]: Number of documents that are passed through the spaCy pipeline at
+            once when splitting the documents into sentences. The default is 1000.
+
+        - sentencizer_n_process [Optional[int]]: Number of processes used by the spaCy pipeline to split the documents
+            into sentences. The default is 1.
+
+        - sentence_references [Optional[bool]]: If True, the matched facts store references to the sentences
+            ("document_index:start_char:end_char", see utility.format_sentence_reference) instead of the sentences
+            themselves when save_file_content is True. The references can be expanded to the sentences with
+            utility.expand_sentence_references. The default is False.
+
+        - max_sentences_per_fact [Optional[int]]: Maximum number of distinct sentences stored per fact when
+            save_file_content is True. The occurrences are still counted exactly. The default is None (all sentences
+            are stored).
+
+        - sentence_sampling [Optional[str]]: Sentences that are stored if a fact has more than max_sentences_per_fact
+            sentences. "reservoir" keeps a uniform random sample that is the same for any number of workers and
+            slices (see OccurrenceStore), "first" keeps the first sentences. The default is "reservoir".
+
+        - match_event_log_dir [Optional[str]]: Directory to log the matches to (see MatchEventLog). Every matched fact
+            is logged with the document and sentence index and whether the subject and the object were found by their
+            label or only by an alias, so the occurrences can be counted again with other alias settings without
+            matching the documents (see load_match_event_log). The default is None (no log).
+
+        - alias_attribution [Optional[bool]]: If True, the occurrences of every fact are also counted by how the fact
+            was found: with the subject and object labels, only with a subject alias, only with an object alias or
+            only with a subject and an object alias (see OccurrenceStore). The label occurrences are the occurrences
+            of a run with exclude_aliases, so the importance of the aliases can be measured with a single run (see
+            utility.measure_alias_importance). The default is False.
+
+        - shared_index [Optional[bool]]: If True, the subject and object names are matched with a flat, read-only
+            copy of the matching index (see SharedMatchIndex) instead of the mapping dictionaries, which are released
+            once the shared index is created. Forked worker processes share its memory instead of copying the
+            dictionaries page by page. If an index_cache_dir is set, the index is saved next to the index cache and
+            memory mapped, so independent processes (e.g. the slices of a dataset) share the pages of the index. Each
+            of them still loads the mapping dictionaries while it is created (from the index cache, they are only
+            released afterwards) and keeps its own occurrence store with the labels and aliases of the facts. The
+            results are the same as without the shared index. The default is False.
+
+        - document_prefilter [Optional[bool]]: If True, the candidate facts of each document (facts with a subject name
+            and an object name in the document) are collected before the document is split into sentences (see
+            DocumentPrefilter). Documents without candidate facts are not split, and the sentences of the other
+            documents are only matched against the candidate facts. The results are the same as without the
+            prefilter. The default is False.
+
+        - sentence_cache_size [Optional[int]]: Maximum number of sentences whose matches are cached (see
+            SentenceMatchCache). The matches of a repeated sentence (e.g. boilerplate text) are replayed into the
+            occurrences, sentences, alias attribution and match event log instead of matching the sentence again. The
+            ngram windows, subject hits and object checks of a replayed sentence are not counted. The results are the
+            same as without the cache. The default is None (no cache).
+
+        - document_deduplication [Optional[str]]: Exact-duplicate documents (same cleaned content) are detected with
+            a fingerprint of every document (see DocumentFingerprintSet). "skip" replays the matches of a duplicate
+            into the occurrences, sentences (or sentence references with the index of the duplicate), alias
+            attribution and match event log instead of splitting and matching it again, so the results are the same
+            as without deduplication. "report" only counts the duplicates and matches them again. The default is None
+            (no deduplication).
+
+        - document_fingerprint_dir [Optional[str]]: Directory to share the document fingerprints and their matches
+            in (e.g. between the slices of a dataset and between runs), so documents seen by any fact matcher with the
+            same BEAR inputs and index settings are detected as duplicates. The fingerprints are kept in a
+            subdirectory keyed like the index cache and written after each checkpoint and at the end of each run. The
+            default is None (the fingerprints are only kept in memory).
+
+        - profile [Optional[bool]]: If True, the time of the fact matching stages (read_and_split, clean_string,
+            document_fingerprints, prefilter, sentence_cache, tokenize, subject_lookup, object_matching,
+            add_occurrences, checkpoint) and the documents, sentences, ngram windows, subject hits, object checks and
+            matches are counted (see StageProfiler and get_profile). The default is False.
+
+        - profile_path [Optional[str]]: Path to dump the profile to while creating the fact statistics (json or, if
+            the path ends with .prom, Prometheus textfile exporter format). Worker processes dump their profile to
+            the path with the process id before the extension. The default is None (no dump).
+
+        - profile_interval_seconds [Optional[float]]: Minimum number of seconds between two dumps of the profile. The
+            default is 60.
     """
 
     def __init__(self, **kwargs):
@@ -181,114 +153,785 @@ class FactMatcherSimple(FactMatcherBase):
 
         self.max_allowed_ngram_length = kwargs.get("max_allowed_ngram_length", 10)
 
-        self.relation_mapping_dict = self._create_mapped_relations()
+        self.subj_label_keys: list[str] = []
+
+        if self.cached_index is not None:
+            self.relation_mapping_dict = self.cached_index["relation_mapping_dict"]
+            self.max_ngram = self.cached_index["max_ngram"]
+            self.subj_label_keys = self.cached_index["subj_label_keys"]
+        else:
+            self.relation_mapping_dict = self._create_mapped_relations()
+            self._save_index_cache(
+                {
+                    "relation_mapping_dict": self.relation_mapping_dict,
+                    "max_ngram": self.max_ngram,
+                    "subj_label_keys": self.subj_label_keys,
+                }
+            )
+
+        self.ngram_start_index = self._create_ngram_start_index()
+
+        self.ngram_window_counters = {"probed": 0, "skipped": 0}
+
+        self.worker_utilization: dict[int, dict] = {}
+
+        self.object_matcher = ObjectMatcher(self.occurrence_store)
+
+        self.object_mapping_dict = self.object_matcher.object_mapping_dict
+
+        self.object_word_counts = self.object_matcher.object_word_counts
+
+        self.irregular_object_names = self.object_matcher.irregular_object_names
+
+        self.alias_attribution = kwargs.get("alias_attribution", False)
+        self.occurrence_store.set_alias_attribution(self.alias_attribution)
+
+        self.match_event_log: Optional[MatchEventLog] = None
+        if kwargs.get("match_event_log_dir", None) is not None:
+            self.match_event_log = MatchEventLog(kwargs["match_event_log_dir"])
+
+        self.document_prefilter: Optional[DocumentPrefilter] = None
+        if kwargs.get("document_prefilter", False):
+            self.document_prefilter = DocumentPrefilter(
+                self.relation_mapping_dict,
+                self.object_mapping_dict,
+                self.irregular_object_names,
+                self.min_entity_name_length,
+            )
+
+        self.sentence_cache: Optional[SentenceMatchCache] = None
+        if kwargs.get("sentence_cache_size", None) is not None:
+            self.sentence_cache = SentenceMatchCache(kwargs["sentence_cache_size"])
+
+        self.document_deduplication: Optional[str] = kwargs.get("document_deduplication", None)
+        self.document_fingerprints: Optional[DocumentFingerprintSet] = None
+        if self.document_deduplication not in (None, "skip", "report"):
+            raise ValueError(f"Unknown document deduplication: {self.document_deduplication}")
+        if self.document_deduplication is not None:
+            fingerprint_dir = kwargs.get("document_fingerprint_dir", None)
+            if fingerprint_dir is not None:
+                # The fact ids of the matches are only valid for the same entity index.
+                fingerprint_dir = os.path.splitext(
+                    get_index_cache_path(
+                        fingerprint_dir,
+                        self.bear_relation_info_path,
+                        self.bear_facts_path,
+                        self.path_to_all_entities,
+                        kwargs,
+                    )
+                )[0]
+            self.document_fingerprints = DocumentFingerprintSet(fingerprint_dir)
+
+        self.shared_index: Optional[SharedMatchIndex] = None
+        if kwargs.get("shared_index", False):
+            self.shared_index = self._create_shared_index()
+            self.ngram_start_index = self.shared_index.ngram_starts
+            self.object_matcher.shared_index = self.shared_index
+            self._release_mapping_dicts()
+
+    def _create_shared_index(self) -> SharedMatchIndex:
+        """
+        Create the shared match index, or open it if it is saved next to the index cache.
+
+        :return: Shared match index
+        """
+        shared_index_path = None
+        if self.index_cache_path is not None:
+            shared_index_path = f"{os.path.splitext(self.index_cache_path)[0]}.idx"
+            if os.path.exists(shared_index_path):
+                return SharedMatchIndex.open(shared_index_path)
+        shared_index = SharedMatchIndex.build(
+            self.occurrence_store,
+            self.relation_mapping_dict,
+            self.ngram_start_index,
+            self.object_mapping_dict,
+            self.object_word_counts,
+            self.irregular_object_names,
+            self.subj_label_keys,
+        )
+        if shared_index_path is None:
+            return shared_index
+        shared_index.save(shared_index_path)
+        return SharedMatchIndex.open(shared_index_path)
+
+    def _release_mapping_dicts(self) -> None:
+        """
+        Release the mapping dictionaries (and the loaded index cache), which the shared index replaces.
 
-        self.match_tracker: set[tuple] = set()
+        :return:
+        """
+        self.cached_index = None
+        self.relation_mapping_dict = {}
+        self.subj_label_keys = []
+        self.object_matcher.object_mapping_dict = self.object_mapping_dict = {}
+        self.object_matcher.object_word_counts = self.object_word_counts = {}
+        self.object_matcher.irregular_object_names = self.irregular_object_names = {}
 
     def _create_mapped_relations(self) -> dict:
-        mapped_relations = {}
-        for relation_id, relation_info in self.entity_relation_occurrence_info_dict.items():
-            for entity_id, entity_info in relation_info.items():
-                tokens = self.get_tokens_from_sentence(entity_info["subj_label"])
+        """
+        Create relation mapping dictionary.
+
+        The subject labels and aliases are mapped (as space-joined lower case tokens, or as they are if that is shorter
+        than min_entity_name_length) to the tuple of the facts they belong to. The key of the subject label of every
+        fact is kept in subj_label_keys.
+        :return: Relation mapping dictionary (subject name -> tuple of (relation_id, subj_id) tuples)
+        """
+        mapped_relations: dict[str, list[tuple[str, str]]] = {}
+        store = self.occurrence_store
+        self.subj_label_keys = []
+        # The (relation_id, subj_id) tuples of fact_ids are shared with the mapping instead of creating new tuples.
+        for fact, fact_id in store.fact_ids.items():
+            for subj_name in [store.subj_labels[fact_id], *store.subj_aliases[fact_id]]:
+                tokens = self.get_tokens_from_sentence(subj_name)
                 tokenized_subj_label = " ".join(tokens)
                 if len(tokenized_subj_label) < self.min_entity_name_length:
-                    tokenized_subj_label = entity_info["subj_label"]
+                    tokenized_subj_label = subj_name
+                tokenized_subj_label = sys.intern(tokenized_subj_label)
+                if len(self.subj_label_keys) == fact_id:
+                    self.subj_label_keys.append(tokenized_subj_label)
                 if self.max_allowed_ngram_length >= len(tokens) > self.max_ngram:
                     self.max_ngram = len(tokens)
-                try:
-                    mapped_relations[tokenized_subj_label]["relations"].add((relation_id, entity_id))
-                except KeyError:
-                    mapped_relations[tokenized_subj_label] = {"relations": {(relation_id, entity_id)}}
-                for alias in entity_info["subj_aliases"]:
-                    tokens = self.get_tokens_from_sentence(alias)
-                    tokenized_subj_label = " ".join(tokens)
-                    if len(tokenized_subj_label) < self.min_entity_name_length:
-                        tokenized_subj_label = alias
-                    if self.max_allowed_ngram_length >= len(tokens) > self.max_ngram:
-                        self.max_ngram = len(tokens)
-                    try:
-                        mapped_relations[tokenized_subj_label]["relations"].add((relation_id, entity_id))
-                    except KeyError:
-                        mapped_relations[tokenized_subj_label] = {"relations": {(relation_id, entity_id)}}
-        return mapped_relations
-
-    def _add_occurrences(self, ngram: str, sentence: str) -> None:
+                facts = mapped_relations.setdefault(tokenized_subj_label, [])
+                if not facts or facts[-1] is not fact:
+                    facts.append(fact)
+        return {joined_ngram: tuple(facts) for joined_ngram, facts in mapped_relations.items()}
+
+    def _create_ngram_start_index(self) -> dict[str, tuple[int, ...]]:
+        """
+        Create ngram start index.
+
+        Each key of the relation mapping dictionary is a space-joined token list. The index maps the first token of
+        the key to the numbers of tokens of the keys starting with it, so only the ngrams that can be a key are built
+        from the sentence tokens. The tokens are recovered by splitting the key at the spaces: non-empty pieces are
+        tokens, a run of empty pieces is one whitespace token (spaCy merges consecutive whitespace into one token),
+        which is indexed as "".
+        :return: Ngram start index
+        """
+        ngram_sizes: dict[str, set[int]] = {}
+        for joined_ngram in self.relation_mapping_dict:
+            pieces = joined_ngram.split(" ")
+            num_tokens = 0
+            previous_piece = None
+            for piece in pieces:
+                if piece or previous_piece != "":
+                    num_tokens += 1
+                previous_piece = piece
+            ngram_sizes.setdefault(pieces[0], set()).add(num_tokens)
+        return {first_token: tuple(sorted(sizes)) for first_token, sizes in ngram_sizes.items()}
+
+    def _get_ngram_sizes(self, token: str, token_lower: str) -> tuple[int, ...]:
+        """
+        Get the sizes of the ngrams starting with a token that can be keys of the relation mapping dictionary.
+
+        :param token: Token of the sentence.
+        :param token_lower: Lower case token.
+        :return: Sorted ngram sizes.
+        """
+        if " " in token_lower:
+            token, token_lower = token.split(" ", 1)[0], token_lower.split(" ", 1)[0]
+        ngram_sizes = self.ngram_start_index.get(token_lower, ())
+        if token != token_lower and token in self.ngram_start_index:
+            ngram_sizes = tuple(sorted(set(ngram_sizes).union(self.ngram_start_index[token])))
+        return ngram_sizes
+
+    def _count_ngram_windows(self, num_tokens: int, probed_windows: int) -> None:
+        """
+        Update the ngram window counters of a sentence.
+
+        The skipped windows are the windows of length 1 to max_ngram that are not probed.
+        :param num_tokens: Number of tokens of the sentence.
+        :param probed_windows: Number of probed windows.
+        :return:
+        """
+        max_ngram = min(self.max_ngram, num_tokens)
+        self.profiler.count("windows", probed_windows)
+        self.ngram_window_counters["probed"] += probed_windows
+        self.ngram_window_counters["skipped"] += (
+            max_ngram * (num_tokens + 1) - max_ngram * (max_ngram + 1) // 2 - probed_windows
+        )
+
+    def _match_sentence(
+        self, sentence: str, candidate_facts: Optional[set] = None
+    ) -> tuple[tuple[int, bool, bool], ...]:
+        """
+        Match sentence.
+
+        This method will search for the subject names in the sentence and check for the facts of the found subjects
+        whether the object label (or one of the object aliases) is in the sentence as well.
+        :param sentence: The sentence to search.
+        :param candidate_facts: If given, only these facts are matched (see DocumentPrefilter).
+        :return: Tuple of (fact_id, subj_via_alias, obj_via_alias) tuples of the matched facts, where subj_via_alias
+        (obj_via_alias) is True if the subject (object) label is not in the sentence. The labels are only checked if
+        there is a match event log, alias_attribution is True or the documents are deduplicated (otherwise both are
+        False).
+        """
+        profiler = self.profiler
+        tokens, tokens_lower = self.get_tokens_from_sentence(
+            sentence, only_lower=False, case_sensitive_tokens=self.ngram_start_index
+        )
+        profiler.lap("tokenize")
+        subject_matches: set = set()
+        subject_names: Optional[set[str]] = None
+        if self.match_event_log is not None or self.alias_attribution or self.document_fingerprints is not None:
+            # The matches of a fingerprinted document can be replayed by other runs, so the labels are checked.
+            subject_names = set()
+        for joined_ngram in self._get_subject_ngrams(tokens, tokens_lower):
+            if self.shared_index is not None:
+                subject_matches.update(self.shared_index.subjects[joined_ngram])
+            else:
+                subject_matches.update(self.relation_mapping_dict[joined_ngram])
+            if subject_names is not None:
+                subject_names.add(joined_ngram)
+        profiler.count("subject_hits", len(subject_matches))
+        if candidate_facts is not None:
+            subject_matches.intersection_update(candidate_facts)
+        profiler.lap("subject_lookup")
+        if not subject_matches:
+            return ()
+        matches = []
+        sentence_objects = self.object_matcher.match_sentence(sentence, collect_names=subject_names is not None)
+        profiler.count("object_checks", len(subject_matches))
+        for fact in subject_matches:
+            fact_id = fact if self.shared_index is not None else self.occurrence_store.fact_ids[fact]
+            if not sentence_objects.object_in_sentence(fact_id, fact):
+                continue
+            subj_via_alias = obj_via_alias = False
+            if subject_names is not None:
+                if self.shared_index is not None:
+                    subj_via_alias = self.shared_index.subj_label_keys[fact_id][0] not in subject_names
+                else:
+                    subj_via_alias = self.subj_label_keys[fact_id] not in subject_names
+                obj_via_alias = not sentence_objects.object_label_in_sentence(fact_id)
+            matches.append((fact_id, subj_via_alias, obj_via_alias))
+        profiler.lap("object_matching")
+        return tuple(matches)
+
+    def _add_occurrences(
+        self,
+        matches: tuple[tuple[int, bool, bool], ...],
+        sentence: str,
+        save_file_content: bool = True,
+        sentence_reference: Optional[tuple[int, int, int]] = None,
+        sentence_index: int = 0,
+    ) -> None:
         """
         Add occurrences to the relation dictionary.
 
-        This method will search for the ngram in the relation dictionary and update the occurrences if the object label
-        is found in the sentence.
-        :param ngram: The ngram to search for.
-        :param sentence: The sentence where the ngram was found.
+        This method will update the occurrences of the matched facts of a sentence (and count them by how they were
+        found if alias_attribution is True, and log them in the match event log if there is one).
+        :param matches: Tuple of (fact_id, subj_via_alias, obj_via_alias) tuples (see _match_sentence).
+        :param sentence: The sentence where the facts were found.
+        :param save_file_content: If True, the sentence will be saved for the matched facts.
+        :param sentence_reference: (document_index, start_char, end_char) of the sentence. If given and
+        sentence_references is True, the reference is saved instead of the sentence (added to the reference table
+        once, for the first matched fact that keeps the sentence, see OccurrenceStore.add_occurrence).
+        :param sentence_index: Index of the sentence in the document (used for the match event log).
         :return:
         """
-        for relation_subj_tuple in self.relation_mapping_dict[ngram]["relations"]:
+        evidence: Optional[Union[str, int, tuple[int, int, int]]] = None
+        store = self.occurrence_store
+        if save_file_content:
+            evidence = sentence
+            if self.sentence_references and sentence_reference is not None:
+                evidence = sentence_reference
+        document_index = 0 if sentence_reference is None else sentence_reference[0]
+        for fact_id, subj_via_alias, obj_via_alias in matches:
+            evidence = store.add_occurrence(fact_id, evidence)
+            if self.alias_attribution:
+                store.add_alias_occurrence(fact_id, subj_via_alias, obj_via_alias)
+            if self.match_event_log is not None:
+                self.match_event_log.add(
+                    document_index,
+                    sentence_index,
+                    store.relation_ids[fact_id],
+                    store.subj_ids[fact_id],
+                    subj_via_alias,
+                    obj_via_alias,
+                )
+        self.profiler.count("matches", len(matches))
+
+    def _get_subject_ngrams(self, tokens: list[str], tokens_lower: list[str]) -> Iterator[str]:
+        """
+        Get subject ngrams.
+
+        This method will build the ngrams of length 1 to max_ngram from the sentence tokens and yield the ngrams
+        that are keys in the relation mapping dictionary. Only the ngrams whose first token and length match a key
+        (see ngram_start_index) are built and probed.
+        :param tokens: Tokens of the sentence.
+        :param tokens_lower: Lower case tokens of the sentence.
+        :return: Iterator over the matched ngrams.
+        """
+        num_tokens = min(len(tokens), len(tokens_lower))
+        probed_windows = 0
+        subject_keys = self.relation_mapping_dict if self.shared_index is None else self.shared_index.subjects
+        for start in range(num_tokens):
+            for ngram_size in self._get_ngram_sizes(tokens[start], tokens_lower[start]):
+                end = start + ngram_size
+                if ngram_size > self.max_ngram or end > num_tokens:
+                    break
+                probed_windows += 1
+                joined_ngram = " ".join(tokens_lower[start:end])
+                if len(joined_ngram) < self.min_entity_name_length:
+                    joined_ngram = " ".join(tokens[start:end])
+                if joined_ngram in subject_keys:
+                    yield joined_ngram
+        self._count_ngram_windows(num_tokens, probed_windows)
+
+    def _process_sentence(
+        self,
+        sentence: str,
+        save_file_content: bool = True,
+        sentence_reference: Optional[tuple[int, int, int]] = None,
+        candidate_facts: Optional[set] = None,
+        sentence_index: int = 0,
+    ) -> tuple[tuple[int, bool, bool], ...]:
+        """
+        Process sentence.
+
+        This method will search for entities in the sentence. The occurrences will be updated in the relation
+        dictionary (and logged in the match event log if there is one).
+        :param sentence: The sentence to search.
+        :param save_file_content: If True, the sentence will be saved for the matched facts.
+        :param sentence_reference: (document_index, start_char, end_char) of the sentence.
+        :param candidate_facts: If given, only these facts are matched (see DocumentPrefilter).
+        :param sentence_index: Index of the sentence in the document (used for the match event log).
+        :return: Tuple of (fact_id, subj_via_alias, obj_via_alias) tuples of the matched facts (see _match_sentence).
+        """
+        profiler = self.profiler
+        profiler.count("sentences")
+        cache_key = None
+        matches = None
+        if self.sentence_cache is not None:
+            cache_key = self.sentence_cache.get_key(sentence)
+            matches = self.sentence_cache.get(cache_key)
+            profiler.lap("sentence_cache")
+        if matches is None:
+            matches = self._match_sentence(sentence, candidate_facts)
+            if cache_key is not None:
+                self.sentence_cache.put(cache_key, matches)
+        if matches:
+            self._add_occurrences(matches, sentence, save_file_content, sentence_reference, sentence_index)
+            profiler.lap("add_occurrences")
+        return matches
+
+    def _replay_document(
+        self,
+        matches: list[tuple[int, int, int, int, bool, bool]],
+        content: str,
+        save_file_content: bool,
+        document_index: int,
+    ) -> None:
+        """
+        Replay the matches of an exact-duplicate document (see DocumentFingerprintSet).
 
-            relation_id = relation_subj_tuple[0]
-            subj_id = relation_subj_tuple[1]
+        :param matches: (fact_id, sentence_index, start_char, end_char, subj_via_alias, obj_via_alias) tuples of the
+        matches of the document.
+        :param content: Cleaned document content.
+        :param save_file_content: If True, the sentences will be saved for the matched facts.
+        :param document_index: Index of the duplicate in the dataset (used for the sentence references).
+        :return:
+        """
+        for sentence_index, sentence_matches in groupby(matches, key=lambda match: match[1]):
+            sentence_matches = list(sentence_matches)
+            start_char, end_char = sentence_matches[0][2:4]
+            self._add_occurrences(
+                tuple(
+                    (fact_id, subj_via_alias, obj_via_alias)
+                    for fact_id, *_, subj_via_alias, obj_via_alias in sentence_matches
+                ),
+                content[start_char:end_char],
+                save_file_content,
+                (document_index, start_char, end_char),
+                sentence_index,
+            )
+        self.profiler.lap("add_occurrences")
+
+    def _process_split_document(
+        self,
+        split_doc,
+        save_file_content: bool,
+        document_index: int,
+        candidate_facts: Optional[set],
+        fingerprint: Optional[bytes],
+    ) -> None:
+        """
+        Process the sentences of a document that was split by the sentencizer.
+
+        :param split_doc: spaCy document.
+        :param save_file_content: If True, the sentences will be saved for the matched facts.
+        :param document_index: Index of the document in the dataset (used for the sentence references).
+        :param candidate_facts: If given, only these facts are matched (see DocumentPrefilter).
+        :param fingerprint: If given, the matches of the document are added to the document fingerprints.
+        :return:
+        """
+        document_matches = []
+        for sentence_index, sent in enumerate(split_doc.sents):
+            matches = self._process_sentence(
+                sent.text,
+                save_file_content,
+                (document_index, sent.start_char, sent.end_char),
+                candidate_facts,
+                sentence_index,
+            )
+            if fingerprint is not None:
+                document_matches.extend(
+                    (fact_id, sentence_index, sent.start_char, sent.end_char, subj_via_alias, obj_via_alias)
+                    for fact_id, subj_via_alias, obj_via_alias in matches
+                )
+        if fingerprint is not None:
+            self.document_fingerprints.add(fingerprint, document_matches)
+            self.profiler.lap("document_fingerprints")
+
+    def _get_candidate_facts(self, content: str) -> Optional[set]:
+        """
+        Get the candidate facts of a document with the document prefilter.
 
-            obj_label = self.entity_relation_occurrence_info_dict[relation_id][subj_id]["obj_label"]
-            obj_aliases = self.entity_relation_occurrence_info_dict[relation_id][subj_id]["obj_aliases"]
+        :param content: Cleaned document content.
+        :return: Set of (relation_id, subj_id) tuples (fact ids if shared_index is set) or None if the document
+        prefilter is disabled or does not filter the document.
+        """
+        if self.document_prefilter is None:
+            return None
+        candidate_facts = self.document_prefilter.get_candidate_facts(content)
+        if candidate_facts is None or self.shared_index is None:
+            return candidate_facts
+        return {self.occurrence_store.fact_ids[fact] for fact in candidate_facts}
+
+    def _process_file_contents(
+        self,
+        file_contents: Union[Dataset, IterableDataset, pa.Table, Iterable[dict]],
+        text_key: str,
+        save_file_content: bool,
+        desc: str = "Processing dataset",
+        processed_documents: int = 0,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval_documents: Optional[int] = None,
+        checkpoint_interval_seconds: Optional[float] = None,
+        document_indices: Optional[Iterable[int]] = None,
+        show_progress: bool = True,
+    ) -> None:
+        """
+        Process file contents.
+
+        If a checkpoint path is given, a checkpoint is saved every checkpoint_interval_documents documents and/or
+        every checkpoint_interval_seconds seconds (checked after each document), and once all documents are processed.
+        Documents skipped by the document prefilter are not split into sentences, but are counted as processed. If
+        document_deduplication is "skip", the matches of exact-duplicate documents are replayed instead of matching
+        them again.
+        :param file_contents: Documents to process.
+        :param text_key: Key to extract text from file content.
+        :param save_file_content: If True, the sentences will be saved for the matched facts.
+        :param desc: Description of the progress bar.
+        :param processed_documents: Number of documents processed before file_contents (saved in the checkpoints).
+        :param checkpoint_path: Path to save the checkpoints.
+        :param checkpoint_interval_documents: Number of documents between two checkpoints.
+        :param checkpoint_interval_seconds: Number of seconds between two checkpoints.
+        :param document_indices: Indices of the documents in the dataset (used for the sentence references). If None,
+        the documents are numbered consecutively from processed_documents.
+        :param show_progress: If True, a progress bar is shown.
+        :return:
+        """
+        if document_indices is None:
+            document_indices = count(processed_documents)
+        document_positions = count(processed_documents + 1)
+        profiler = self.profiler
+        num_documents = len(file_contents) if hasattr(file_contents, "__len__") else None
+        texts = tqdm(
+            iter_texts(file_contents, text_key, self.sentencizer_batch_size),
+            desc=desc,
+            total=num_documents,
+            disable=not show_progress,
+        )
+        last_checkpoint = (processed_documents, time.monotonic())
+        profiler.start()
+        for split_doc, (
+            document_position,
+            document_index,
+            candidate_facts,
+            fingerprint,
+            duplicate,
+        ) in self.split_contents(
+            self._iter_filtered_contents(texts, document_indices, document_positions), as_tuples=True
+        ):
+            profiler.lap("read_and_split")
+            profiler.maybe_dump()
+            if duplicate is not None:
+                self._replay_document(
+                    self.document_fingerprints.get(fingerprint), duplicate, save_file_content, document_index
+                )
+            else:
+                self._process_split_document(split_doc, save_file_content, document_index, candidate_facts, fingerprint)
+            if checkpoint_path is not None:
+                last_checkpoint = self._maybe_save_checkpoint(
+                    checkpoint_path,
+                    document_position,
+                    last_checkpoint,
+                    checkpoint_interval_documents,
+                    checkpoint_interval_seconds,
+                )
+        profiler.lap("read_and_split")
+        if checkpoint_path is not None:
+            # The next position is after all read documents (including the ones skipped by the prefilter).
+            self.save_checkpoint(checkpoint_path, next(document_positions) - 1)
+            profiler.lap("checkpoint")
+        profiler.dump()
+        if self.match_event_log is not None:
+            self.match_event_log.flush()
+        if self.document_fingerprints is not None:
+            self.document_fingerprints.flush()
+
+    def _close_logs(self) -> None:
+        """
+        Close the match event log and the document fingerprints of this process.
 
-            if word_in_sentence(obj_label, sentence):
-                if (relation_id, subj_id) in self.match_tracker:
+        The part files are kept open over all chunks of documents processed by this process (see
+        _process_file_contents) and closed once at the end of the run (or when the worker process exits, see
+        scheduler.ChunkScheduler), so every process writes one part file per run.
+        :return:
+        """
+        if self.match_event_log is not None:
+            self.match_event_log.close()
+        if self.document_fingerprints is not None:
+            self.document_fingerprints.close()
+
+    def _iter_filtered_contents(
+        self, texts: Iterable[str], document_indices: Iterable[int], document_positions: Iterator[int]
+    ) -> Iterator[tuple[str, tuple[int, int, Optional[set], Optional[bytes], Optional[str]]]]:
+        """
+        Clean the documents and filter them with the document fingerprints and the document prefilter.
+
+        The contents are read ahead by the sentencizer, so the position of each document is passed along with it.
+        Duplicates are passed along as empty documents with their content, to be replayed in document order.
+        Documents skipped by the prefilter are not passed along.
+        :param texts: Texts of the documents.
+        :param document_indices: Indices of the documents in the dataset.
+        :param document_positions: Positions of the documents (number of read documents, including the document). Only
+        the positions of the read documents are taken.
+        :return: Iterator of (content, (document_position, document_index, candidate_facts, fingerprint,
+        duplicate_content)) tuples.
+        """
+        profiler = self.profiler
+        fingerprints = self.document_fingerprints
+        for text, document_index, document_position in zip(texts, document_indices, document_positions):
+            profiler.lap("read_and_split")
+            profiler.count("documents")
+            content = utility.clean_string(text)
+            profiler.lap("clean_string")
+            fingerprint = None
+            if fingerprints is not None:
+                fingerprint = fingerprints.get_fingerprint(content)
+                is_duplicate = fingerprints.check(fingerprint)
+                profiler.lap("document_fingerprints")
+                if is_duplicate and self.document_deduplication == "skip":
+                    yield "", (document_position, document_index, None, fingerprint, content)
                     continue
-                if sentence in self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"]:
-                    self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"][sentence] += 1
-                else:
-                    self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"][sentence] = 1
+                if is_duplicate:
+                    fingerprint = None
+            candidate_facts = self._get_candidate_facts(content)
+            profiler.lap("prefilter")
+            if candidate_facts is None or candidate_facts:
+                yield content, (document_position, document_index, candidate_facts, fingerprint, None)
+            elif fingerprint is not None:
+                fingerprints.add(fingerprint, [])
+
+    def _maybe_save_checkpoint(
+        self,
+        checkpoint_path: str,
+        processed_documents: int,
+        last_checkpoint: tuple[int, float],
+        checkpoint_interval_documents: Optional[int],
+        checkpoint_interval_seconds: Optional[float],
+    ) -> tuple[int, float]:
+        """
+        Save a checkpoint if the document or time interval since the last checkpoint has passed.
+
+        :param checkpoint_path: Path to save the checkpoint.
+        :param processed_documents: Number of processed documents.
+        :param last_checkpoint: Number of processed documents and time (time.monotonic) of the last checkpoint.
+        :param checkpoint_interval_documents: Number of documents between two checkpoints.
+        :param checkpoint_interval_seconds: Number of seconds between two checkpoints.
+        :return: Number of processed documents and time of the last checkpoint.
+        """
+        last_checkpoint_documents, last_checkpoint_time = last_checkpoint
+        if (
+            checkpoint_interval_documents
+            and processed_documents - last_checkpoint_documents >= checkpoint_interval_documents
+        ) or (checkpoint_interval_seconds and time.monotonic() - last_checkpoint_time >= checkpoint_interval_seconds):
+            self.save_checkpoint(checkpoint_path, processed_documents)
+            self.profiler.lap("checkpoint")
+            return processed_documents, time.monotonic()
+        return last_checkpoint
+
+    def get_fact_statistics(self) -> list[tuple]:
+        """
+        Get fact statistics.
 
-                count = sum(self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"].values())
-                self.entity_relation_occurrence_info_dict[relation_id][subj_id]["occurrences"] = count
-                self.match_tracker.add((relation_id, subj_id))
-                continue
+        Collect the facts with occurrences.
+        :return: List of (relation_id, subj_id, occurrences, sentences, alias_occurrences) tuples, where
+        alias_occurrences are the occurrences by how the fact was found (None if alias_attribution is False).
+        """
+        store = self.occurrence_store
+        return [
+            (
+                store.relation_ids[fact_id],
+                store.subj_ids[fact_id],
+                int(store.occurrences[fact_id]),
+                store.get_sentences(fact_id),
+                store.get_alias_occurrences(fact_id),
+            )
+            for fact_id in store.get_matched_fact_ids()
+        ]
 
-            for alias in obj_aliases:
-                if word_in_sentence(alias, sentence):
-                    if (relation_id, subj_id) in self.match_tracker:
-                        break
-                    if sentence in self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"]:
-                        self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"][sentence] += 1
-                    else:
-                        self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"][sentence] = 1
-
-                    count = sum(self.entity_relation_occurrence_info_dict[relation_id][subj_id]["sentences"].values())
-                    self.entity_relation_occurrence_info_dict[relation_id][subj_id]["occurrences"] = count
-                    self.match_tracker.add((relation_id, subj_id))
-                    break
+    def pop_fact_statistics(self) -> list[tuple]:
+        """
+        Pop fact statistics.
+
+        Collect the facts with occurrences and reset their occurrences and sentences.
+        :return: List of (relation_id, subj_id, occurrences, sentences, alias_occurrences) tuples (see
+        get_fact_statistics).
+        """
+        fact_statistics = self.get_fact_statistics()
+        self.occurrence_store.reset(
+            self.occurrence_store.fact_ids[(relation_id, subj_id)] for relation_id, subj_id, *_ in fact_statistics
+        )
+        return fact_statistics
+
+    def save_checkpoint(self, checkpoint_path: str, processed_documents: int) -> None:
+        """
+        Save checkpoint.
+
+        The checkpoint contains the number of processed documents, the fact statistics (occurrences and sentences) and
+        the run id of the match event log (see MatchEventLog.start_run). The file is written next to the checkpoint
+        path first and then moved, so an interrupted write does not corrupt the previous checkpoint.
+        :param checkpoint_path: Path to the checkpoint file.
+        :param processed_documents: Number of processed documents.
+        :return:
+        """
+        if self.match_event_log is not None:
+            self.match_event_log.flush()
+        checkpoint = {"processed_documents": processed_documents, "fact_statistics": self.get_fact_statistics()}
+        if self.match_event_log is not None:
+            checkpoint["match_event_log_run_id"] = self.match_event_log.run_id
+        utility.save_dict_as_json(checkpoint, f"{checkpoint_path}.tmp")
+        os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+        if self.document_fingerprints is not None:
+            # Written after the checkpoint, so a resumed run does not replay the documents after the checkpoint.
+            self.document_fingerprints.flush()
+        logging.info("Saved checkpoint after %d documents to %s", processed_documents, checkpoint_path)
+
+    def load_checkpoint(self, checkpoint_path: str) -> int:
+        """
+        Load checkpoint.
+
+        The fact statistics in the relation dictionary are replaced by the ones from the checkpoint. The match event
+        log continues the run of the checkpoint, so the events logged again after resuming are deduplicated.
+        :param checkpoint_path: Path to the checkpoint file.
+        :return: Number of processed documents.
+        """
+        checkpoint = load_json_dict(checkpoint_path)
+        self.pop_fact_statistics()
+        self.merge_fact_statistics(checkpoint["fact_statistics"])
+        if self.match_event_log is not None and "match_event_log_run_id" in checkpoint:
+            self.match_event_log.start_run(checkpoint["match_event_log_run_id"])
+        logging.info("Loaded checkpoint after %d documents from %s", checkpoint["processed_documents"], checkpoint_path)
+        return checkpoint["processed_documents"]
+
+    def merge_fact_statistics(self, fact_statistics: list[tuple]) -> None:
+        """
+        Merge fact statistics (see pop_fact_statistics) into the relation dictionary.
 
-    def _process_file_content(self, file_content: str) -> None:
+        :param fact_statistics: List of (relation_id, subj_id, occurrences, sentences, alias_occurrences) tuples.
+        :return:
+        """
+        reference_ids: Optional[dict[str, int]] = {} if self.sentence_references else None
+        for relation_id, subj_id, occurrences, sentences, alias_occurrences in fact_statistics:
+            self.occurrence_store.merge_fact(
+                self.occurrence_store.fact_ids[(relation_id, subj_id)],
+                occurrences,
+                sentences,
+                reference_ids,
+                alias_occurrences,
+            )
+
+    def load_match_event_log(
+        self, log_dirs: Iterable[str], subject_aliases: bool = True, object_aliases: bool = True
+    ) -> dict:
+        """
+        Load the occurrences of the facts from match event logs (see MatchEventLog) instead of matching the documents.
+
+        The occurrences and sentences in the relation dictionary are replaced (the sentences are not logged). If
+        alias_attribution is True, the occurrences are also counted by how the facts were found.
+        :param log_dirs: Directories of the match event logs (e.g. one per dataset slice).
+        :param subject_aliases: If False, only the matches with the subject label are counted.
+        :param object_aliases: If False, only the matches with the object label are counted.
+        :return: Relation info dictionary (see entity_relation_occurrence_info_dict).
         """
-        Process file content.
+        store = self.occurrence_store
+        store.reset()
+        counts = count_match_events(log_dirs, subject_aliases, object_aliases, by_alias=True)
+        for (relation_id, subj_id, subj_via_alias, obj_via_alias), occurrences in counts.items():
+            fact_id = store.fact_ids[(relation_id, subj_id)]
+            store.add_occurrence(fact_id, count=occurrences)
+            store.add_alias_occurrence(fact_id, subj_via_alias, obj_via_alias, count=occurrences)
+        return self.entity_relation_occurrence_info_dict
+
+    def _create_fact_statistics_parallel(
+        self,
+        file_contents: Union[Dataset, IterableDataset, pa.Table, list[dict]],
+        text_key: str,
+        save_file_content: bool,
+        num_workers: int,
+        processed_documents: int = 0,
+        chunks_per_worker: int = 16,
+    ) -> None:
+        """
+        Create fact statistics with a pool of worker processes.
 
-        This method will split the document into sentences and search for entities in the sentences.
-        The occurrences will be updated in the relation dictionary.clea
-        clear
+        The documents are processed in chunks of about the same text size that the workers pull dynamically (see
+        ChunkScheduler). Each chunk returns the statistics of the matched facts only, which are merged in document
+        order, so the result is the same as with a single process. The utilization of the workers is saved in
+        worker_utilization.
+        :param file_contents: Documents to process.
+        :param text_key: Key to extract text from file content.
+        :param save_file_content: If True, the sentences will be saved for the matched facts.
+        :param num_workers: Number of worker processes.
+        :param processed_documents: Number of documents processed before file_contents (offset of the document
+        indices).
+        :param chunks_per_worker: Number of chunks per worker process.
         :return:
         """
-        content = utility.clean_string(file_content)
-        split_doc = self.nlp(content)
-        sentences = [sent.text for sent in split_doc.sents]
-        for sentence in sentences:
-            tokens, tokens_lower = self.get_tokens_from_sentence(sentence, only_lower=False)
-            for ngram_size in range(1, self.max_ngram + 1):
-                for ngram, ngram_lower in zip(windowed(tokens, ngram_size), windowed(tokens_lower, ngram_size)):
-                    try:
-                        joined_ngram = " ".join(ngram_lower)
-                        if len(joined_ngram) < self.min_entity_name_length:
-                            joined_ngram = " ".join(ngram)
-                    except TypeError:
-                        break
-                    if joined_ngram not in self.relation_mapping_dict:
-                        continue
-                    self._add_occurrences(joined_ngram, sentence)
-            self.match_tracker = set()
+        scheduler = ChunkScheduler(num_workers, chunks_per_worker)
+        for fact_statistics in scheduler.run(self, file_contents, text_key, save_file_content, processed_documents):
+            self.merge_fact_statistics(fact_statistics)
+        for counters in scheduler.worker_counters.values():
+            ngram_window_counters, prefilter_counters, profile, cache_counters, fingerprint_counters = counters
+            self.profiler.merge(profile)
+            for counter, value in ngram_window_counters.items():
+                self.ngram_window_counters[counter] += value
+            for counter, value in prefilter_counters.items():
+                self.document_prefilter.counters[counter] += value
+            for counter, value in cache_counters.items():
+                self.sentence_cache.counters[counter] += value
+            for counter, value in fingerprint_counters.items():
+                self.document_fingerprints.counters[counter] += value
+        if self.document_fingerprints is not None:
+            # The fingerprints of the workers are only shared through the fingerprint directory.
+            self.document_fingerprints.load()
+        self.worker_utilization = scheduler.worker_utilization
+        self.profiler.dump()
 
     def create_fact_statistics(
         self,
-        file_contents: Union[DatasetDict, Dataset, IterableDatasetDict, IterableDataset],
+        file_contents: Union[DatasetDict, Dataset, IterableDatasetDict, IterableDataset, pa.Table],
         text_key: str = "text",
         save_file_content: bool = False,
+        num_workers: int = 1,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval_documents: Optional[int] = None,
+        checkpoint_interval_seconds: Optional[float] = None,
+        resume_from: Optional[str] = None,
+        chunks_per_worker: int = 16,
+        document_offset: int = 0,
     ) -> None:
         """
         Create fact statistics.
@@ -297,14 +940,53 @@ class FactMatcherSimple(FactMatcherBase):
         It will search for entities in the sentence.
         The occurrences will be updated in the relation dictionary.
         :param text_key: Key to extract text from file content.
-        :param file_contents: List of dictionaries containing the file contents.
+        :param file_contents: List of dictionaries containing the file contents, Dataset, IterableDataset or Table
+        (e.g. from documents.load_documents). Only the text column of a Dataset, IterableDataset or Table is read, in
+        batches of sentencizer_batch_size documents (see documents.iter_texts).
         :param save_file_content: If True, the content of the file where the entity is found will be saved
         in the relation dictionary.
+        :param num_workers: Number of worker processes. If larger than 1, the documents are processed in parallel
+        (see _create_fact_statistics_parallel). The result is the same as with a single process.
+        :param checkpoint_path: Path to save checkpoints of the fact statistics and the number of processed documents
+        to. Only supported with num_workers=1.
+        :param checkpoint_interval_documents: Number of documents between two checkpoints.
+        :param checkpoint_interval_seconds: Number of seconds between two checkpoints.
+        :param resume_from: Path to a checkpoint to resume from. The fact statistics are loaded from the checkpoint
+        and the already processed documents are skipped (file_contents have to be the same documents in the same
+        order as in the interrupted run).
+        :param chunks_per_worker: Number of document chunks per worker process if num_workers is larger than 1.
+        :param document_offset: Index of the first document of file_contents in the dataset (e.g. the start of a
+        dataset slice), added to the document indices of the sentence references and the match event log.
         :return:
         """
-        for file_content in tqdm(file_contents, desc="Processing dataset"):
-            self._process_file_content(file_content[text_key])
+        if checkpoint_path is not None and num_workers > 1:
+            raise ValueError("Checkpoints are only supported with num_workers=1.")
+        processed_documents = 0
+        if self.match_event_log is not None:
+            self.match_event_log.start_run()
+        if resume_from is not None:
+            processed_documents = self.load_checkpoint(resume_from)
+            file_contents = skip_documents(file_contents, processed_documents)
+        if num_workers > 1:
+            self._create_fact_statistics_parallel(
+                file_contents,
+                text_key,
+                save_file_content,
+                num_workers,
+                document_offset + processed_documents,
+                chunks_per_worker,
+            )
+        else:
+            self._process_file_contents(
+                file_contents,
+                text_key,
+                save_file_content,
+                processed_documents=processed_documents,
+                checkpoint_path=checkpoint_path,
+                checkpoint_interval_documents=checkpoint_interval_documents,
+                checkpoint_interval_seconds=checkpoint_interval_seconds,
+                document_indices=count(document_offset + processed_documents),
+            )
+        self._close_logs()
         if not save_file_content:
-            for _, entities in self.entity_relation_occurrence_info_dict.items():
-                for _, fact in entities.items():
-                    fact["sentences"] = {}
+            self.occurrence_store.clear_sentences()
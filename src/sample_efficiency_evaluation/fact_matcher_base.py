@@ -0,0 +1,301 @@
+from abc import ABC, abstractmethod
+from typing import Container, Iterable, Iterator, Optional, Union
+
+from datasets import DatasetDict, Dataset, IterableDatasetDict, IterableDataset
+from spacy.attrs import IDX, LENGTH  # pylint: disable=no-name-in-module
+from spacy.lang.en import English
+
+from sample_efficiency_evaluation.entity_information import extract_entity_information
+from sample_efficiency_evaluation.index_cache import get_index_cache_path, load_index_cache, save_index_cache
+from sample_efficiency_evaluation.occurrence_store import OccurrenceStore
+from sample_efficiency_evaluation.profiler import StageProfiler
+from utility import utility
+
+
+class FactMatcherBase(ABC):
+    """
+    FactMatcherBase
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initialize FactMatcherBase class.
+        """
+
+        bear_data_path = kwargs.get("bear_data_path")
+
+        self.bear_facts_path = kwargs.get("bear_facts_path", f"{bear_data_path}/BEAR")
+
+        self.bear_relation_info_path = kwargs.get("bear_relation_info_path", f"{bear_data_path}/relation_info.json")
+
+        self.path_to_all_entities = kwargs.get("path_to_all_entities", None)
+
+        self.exclude_aliases = kwargs.get("exclude_aliases", False)
+
+        self.index_cache_dir = kwargs.get("index_cache_dir", None)
+
+        self.cached_index = self._load_index_cache(kwargs)
+
+        self._relation_info_snapshot: Optional[tuple[int, dict]] = None
+
+        if self.cached_index is not None:
+            self.occurrence_store = self.cached_index["occurrence_store"]
+        else:
+            self.occurrence_store = OccurrenceStore.from_relation_info_dict(
+                self.extract_entity_information(
+                    bear_facts_path=self.bear_facts_path,
+                    bear_relation_info_path=self.bear_relation_info_path,
+                    path_to_all_entities=self.path_to_all_entities,
+                    exclude_aliases=self.exclude_aliases,
+                )
+            )
+
+        self.occurrence_store.set_sentence_sampling(
+            kwargs.get("max_sentences_per_fact", None), kwargs.get("sentence_sampling", "reservoir")
+        )
+
+        self.nlp = English()
+
+        self.tokenizer = self.nlp.tokenizer
+
+        self.nlp.add_pipe("sentencizer")
+
+        self.sentencizer_batch_size = kwargs.get("sentencizer_batch_size", 1000)
+
+        self.sentencizer_n_process = kwargs.get("sentencizer_n_process", 1)
+
+        self.sentence_references = kwargs.get("sentence_references", False)
+
+        self.profiler = StageProfiler(
+            enabled=kwargs.get("profile", False),
+            dump_path=kwargs.get("profile_path", None),
+            dump_interval_seconds=kwargs.get("profile_interval_seconds", 60.0),
+        )
+
+    def _load_index_cache(self, kwargs: dict) -> Optional[dict]:
+        """
+        Load the index cache (see index_cache.load_index_cache) for the BEAR files and the constructor kwargs.
+
+        :param kwargs: Constructor kwargs.
+        :return: Cached index or None if no index_cache_dir is set or no cache exists for the inputs.
+        """
+        self.index_cache_path = None
+        if self.index_cache_dir is not None:
+            self.index_cache_path = get_index_cache_path(
+                self.index_cache_dir,
+                self.bear_relation_info_path,
+                self.bear_facts_path,
+                self.path_to_all_entities,
+                kwargs,
+            )
+        return load_index_cache(self.index_cache_path)
+
+    def _save_index_cache(self, index: dict) -> None:
+        """
+        Save the index cache (the occurrence store and the given index) if an index_cache_dir is set.
+
+        :param index: Index to cache in addition to the occurrence store.
+        :return:
+        """
+        if self.index_cache_path is not None:
+            save_index_cache(self.index_cache_path, {"occurrence_store": self.occurrence_store, **index})
+
+    def get_profile(self) -> dict:
+        """
+        Get the profile of the fact matching (see StageProfiler).
+
+        :return: Dictionary with the seconds per stage ("timers") and the counters ("counters"). Both are empty if
+        profiling is disabled.
+        """
+        return self.profiler.get_profile()
+
+    @property
+    def entity_relation_occurrence_info_dict(self) -> dict:
+        """
+        Relation info dictionary (relation_id -> subj_id -> fact) created from the occurrence store.
+
+        The dictionary is created on every access and can be modified. Changes are written back to the occurrence
+        store by assigning the dictionary to the attribute. For repeated reads, use get_relation_info_snapshot.
+        """
+        return self.occurrence_store.to_relation_info_dict()
+
+    @entity_relation_occurrence_info_dict.setter
+    def entity_relation_occurrence_info_dict(self, relation_info_dict: dict) -> None:
+        """
+        Replace the occurrences and sentences in the occurrence store with the ones of a relation info dictionary.
+
+        The facts of the dictionary have to be facts of the fact matcher (their labels and aliases are not changed),
+        facts missing in the dictionary are reset.
+        :param relation_info_dict: Relation info dictionary (relation_id -> subj_id -> fact).
+        :return:
+        """
+        store = self.occurrence_store
+        unknown_facts = [
+            (relation_id, subj_id)
+            for relation_id, facts in relation_info_dict.items()
+            for subj_id in facts
+            if (relation_id, subj_id) not in store.fact_ids
+        ]
+        if unknown_facts:
+            raise ValueError(f"The relation info dictionary contains unknown facts: {unknown_facts[:10]}")
+        store.reset()
+        reference_ids: Optional[dict[str, int]] = {} if self.sentence_references else None
+        alias_keys = utility.ALIAS_OCCURRENCE_KEYS
+        for relation_id, facts in relation_info_dict.items():
+            for subj_id, fact in facts.items():
+                store.merge_fact(
+                    store.fact_ids[(relation_id, subj_id)],
+                    fact.get("occurrences", 0),
+                    fact.get("sentences", {}),
+                    reference_ids,
+                    [fact[key] for key in alias_keys] if alias_keys[0] in fact else None,
+                )
+
+    def get_relation_info_snapshot(self) -> dict:
+        """
+        Get a read-only snapshot of the relation info dictionary.
+
+        The snapshot is cached until the occurrence store changes (see OccurrenceStore.version), so reading it again
+        without matching in between does not create the dictionary again. Writing to it raises a TypeError.
+        :return: Relation info dictionary (see entity_relation_occurrence_info_dict) of ReadOnlyDicts, with the aliases
+        as frozensets.
+        """
+        store = self.occurrence_store
+        if self._relation_info_snapshot is None or self._relation_info_snapshot[0] != store.version:
+            self._relation_info_snapshot = (store.version, store.to_relation_info_dict(read_only=True))
+        return self._relation_info_snapshot[1]
+
+    def split_contents(self, contents: Iterable, as_tuples: bool = False) -> Iterator:
+        """
+        Split contents into sentences.
+
+        The contents are passed through the spaCy pipeline in batches (and in sentencizer_n_process processes), with
+        only the sentencizer enabled.
+        :param contents: Cleaned document contents (or (content, context) tuples if as_tuples is True).
+        :param as_tuples: If True, the contents are (content, context) tuples and (Doc, context) tuples are yielded.
+        :return: Iterator over the split documents (in the order of the contents).
+        """
+        with self.nlp.select_pipes(enable=["sentencizer"]):
+            yield from self.nlp.pipe(
+                contents,
+                as_tuples=as_tuples,
+                batch_size=self.sentencizer_batch_size,
+                n_process=self.sentencizer_n_process,
+            )
+
+    def convert_relation_occurrence_info_dict_to_json(self, json_output_file_path: str) -> None:
+        """
+        Convert relation info dictionary to json file.
+
+        :param json_output_file_path: Path to save the json file.
+        :return:
+        """
+        utility.save_dict_as_json(self.get_relation_info_snapshot(), json_output_file_path)
+
+    def convert_relation_occurrence_info_dict_to_parquet(
+        self, parquet_output_file_path: str, sentences_output_file_path: Optional[str] = None
+    ) -> None:
+        """
+        Convert relation info dictionary to parquet files (see utility.save_relation_occurrence_info_parquet).
+
+        :param parquet_output_file_path: Path to save the facts parquet file.
+        :param sentences_output_file_path: Path to save the sentences parquet file. If None, the sentences are not
+        saved.
+        :return:
+        """
+        utility.save_relation_occurrence_info_parquet(
+            self.get_relation_info_snapshot(), parquet_output_file_path, sentences_output_file_path
+        )
+
+    def get_token_offsets(self, sentence: str) -> list[list[int]]:
+        """
+        Get token offsets from sentence.
+        :param sentence: Sentence
+        :return: List of [start, length] offsets of the tokens in the sentence
+        """
+        return self.tokenizer(sentence).to_array([IDX, LENGTH]).tolist()
+
+    def get_tokens_from_sentence(
+        self, sentence: str, only_lower: bool = True, case_sensitive_tokens: Optional[Container[str]] = None
+    ) -> Union[list[str], tuple[list[str], list[str]]]:
+        """
+        Get tokens from sentence.
+
+        The lower case sentence is tokenized once. If lowercasing keeps the length of the sentence, the original
+        tokens are cut from the sentence at the offsets of the lower case tokens, so both token lists have the same
+        token boundaries. Otherwise, the original sentence is tokenized as well.
+        The tokenizer exceptions and prefix and suffix rules are case-sensitive, so a cut original token is not always
+        a token of the original sentence (e.g. "IT'LL" is cut into "IT" and "'LL", "Dr." into "Dr" and "."). If one of
+        the cut original tokens is in case_sensitive_tokens, the original sentence is tokenized as well and the cut
+        tokens that are not tokens of the original sentence are replaced by empty strings, so they do not match.
+        :param sentence: Sentence
+        :param only_lower: Return only lower case tokens
+        :param case_sensitive_tokens: Original case tokens that entity names searched case-sensitive (names shorter
+        than min_entity_name_length) start with, e.g. the ngram start index.
+        :return: List of tokens
+        """
+        sentence_lower = sentence.lower()
+        if only_lower:
+            return [token.orth_ for token in self.tokenizer(sentence_lower)]
+        if len(sentence_lower) != len(sentence):
+            return [token.orth_ for token in self.tokenizer(sentence)], [
+                token.orth_ for token in self.tokenizer(sentence_lower)
+            ]
+        token_offsets = self.get_token_offsets(sentence_lower)
+        tokens = [sentence[start : start + length] for start, length in token_offsets]
+        tokens_lower = [sentence_lower[start : start + length] for start, length in token_offsets]
+        if case_sensitive_tokens is not None and any(
+            token != token_lower and token in case_sensitive_tokens for token, token_lower in zip(tokens, tokens_lower)
+        ):
+            original_offsets = {(start, length) for start, length in self.get_token_offsets(sentence)}
+            tokens = [
+                token if (start, length) in original_offsets else ""
+                for token, (start, length) in zip(tokens, token_offsets)
+            ]
+        return tokens, tokens_lower
+
+    @staticmethod
+    def extract_entity_information(
+        bear_facts_path: str,
+        bear_relation_info_path: str,
+        path_to_all_entities: Optional[str] = None,
+        exclude_aliases: bool = False,
+        max_loading_threads: int = 8,
+    ) -> dict:
+        """
+        Extract entity information from bear data.
+
+        First, the method will load the relation info dictionary.
+        Then, it will iterate over the relation info dictionary and load the facts for each relation.
+        The entity information will be extracted and stored in a dictionary.
+        If the path to all entities is provided, the method will load the additional aliases for the entities
+         (for both subject and object).
+        Lastly, some more aliases are added to the object aliases by checking if the object id is a subject in another
+        relation (in the BEAR relation files e.g. "P6.jsonl", subjects have aliases provided).
+        This ensures that each entity has all the aliases from the BEAR data. The subject aliases of all relations are
+        collected in one entity_id -> aliases index for this, so each object is looked up once.
+        The relation files are loaded concurrently.
+        :param bear_facts_path: Path to bear facts directory.
+        :param bear_relation_info_path: Path to the BEAR relation info file.
+        :param path_to_all_entities: Path to all entities file.
+        This file contains additional aliases for the entities.
+        :param exclude_aliases: If True, the aliases will not be included in the entity information.
+        :param max_loading_threads: Maximum number of threads loading the relation files.
+        :return: Relation dictionary (relation_id -> subj_id -> EntityFact, a compact, read-only fact of the relation
+        info dictionary schema)
+        """
+        return extract_entity_information(
+            bear_facts_path, bear_relation_info_path, path_to_all_entities, exclude_aliases, max_loading_threads
+        )
+
+    @abstractmethod
+    def create_fact_statistics(
+        self,
+        file_contents: Union[DatasetDict, Dataset, IterableDatasetDict, IterableDataset],
+        text_key: str = "text",
+        save_file_content: bool = False,
+        num_workers: int = 1,
+    ) -> None:
+        """
+        Create fact statistics
+        """
@@ -0,0 +1,100 @@
+from typing import Iterator, Optional
+
+from sample_efficiency_evaluation.fact_matcher import FactMatcherSimple
+
+
+class FactMatcherTrie(FactMatcherSimple):
+    """
+    FactMatcherTrie is a class that uses a token trie to search for entities in the dataset.
+
+    The trie is built from the keys of the relation mapping dictionary (the tokenized subject labels and aliases), so
+    the matches are exactly the same as with FactMatcherSimple. Instead of joining every ngram of length 1 to
+    max_ngram and probing the relation mapping dictionary, the sentence tokens are scanned once and the trie is
+    walked from every token until no entity can continue.
+
+    kwargs:
+        - See FactMatcherSimple.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        if self.shared_index is None:
+            self.subject_trie = self._create_subject_trie()
+
+    def _release_mapping_dicts(self) -> None:
+        """
+        Create the subject trie before the relation mapping dictionary is released (see
+        FactMatcherSimple._release_mapping_dicts).
+
+        :return:
+        """
+        self.subject_trie = self._create_subject_trie()
+        super()._release_mapping_dicts()
+
+    def _create_subject_trie(self) -> dict:
+        """
+        Create subject trie.
+
+        Each key of the relation mapping dictionary is split into its tokens (the key is the space-joined token list)
+        and inserted into a nested dictionary. The node of the last token holds the key under the None entry.
+        :return: Subject trie
+        """
+        subject_trie: dict = {}
+        for joined_ngram in self.relation_mapping_dict:
+            node = subject_trie
+            for token in joined_ngram.split(" "):
+                node = node.setdefault(token, {})
+            node[None] = joined_ngram
+        return subject_trie
+
+    @staticmethod
+    def _advance_node(node: Optional[dict], token: str) -> Optional[dict]:
+        """
+        Advance a trie node by one token.
+
+        Tokens containing whitespace (e.g. spaCy whitespace tokens) are split the same way the trie keys are split.
+        :param node: Current trie node.
+        :param token: Token to advance by.
+        :return: Next trie node or None if no entity continues with the token.
+        """
+        if node is None:
+            return None
+        if " " not in token:
+            return node.get(token)
+        for piece in token.split(" "):
+            node = node.get(piece)
+            if node is None:
+                return None
+        return node
+
+    def _get_subject_ngrams(self, tokens: list[str], tokens_lower: list[str]) -> Iterator[str]:
+        """
+        Get subject ngrams.
+
+        For every start token, the trie is walked along the lower case tokens. As long as the joined lower case ngram
+        is shorter than min_entity_name_length, the trie is walked along the original tokens as well, to keep the
+        case-sensitive search for short entity names. Each trie step is counted as a probed window.
+        :param tokens: Tokens of the sentence.
+        :param tokens_lower: Lower case tokens of the sentence.
+        :return: Iterator over the matched ngrams.
+        """
+        num_tokens = min(len(tokens), len(tokens_lower))
+        probed_windows = 0
+        for start in range(num_tokens):
+            lower_node = self.subject_trie
+            node = self.subject_trie
+            joined_length = -1
+            for index in range(start, min(start + self.max_ngram, num_tokens)):
+                probed_windows += 1
+                joined_length += len(tokens_lower[index]) + 1
+                lower_node = self._advance_node(lower_node, tokens_lower[index])
+                if joined_length < self.min_entity_name_length:
+                    node = self._advance_node(node, tokens[index])
+                    if node is not None and None in node:
+                        yield node[None]
+                elif lower_node is not None and None in lower_node:
+                    yield lower_node[None]
+                if lower_node is None and (node is None or joined_length >= self.min_entity_name_length):
+                    break
+        self._count_ngram_windows(num_tokens, probed_windows)
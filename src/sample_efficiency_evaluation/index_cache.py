@@ -0,0 +1,87 @@
+import hashlib
+import logging
+import os
+import pickle
+from typing import Optional
+
+import spacy
+
+from utility.utility import load_json_dict
+
+INDEX_CACHE_VERSION = 5
+
+
+def get_index_cache_path(
+    index_cache_dir: str,
+    bear_relation_info_path: str,
+    bear_facts_path: str,
+    path_to_all_entities: Optional[str],
+    kwargs: dict,
+) -> str:
+    """
+    Get the path of the index cache file.
+
+    The file name is a hash of the cache version, the spaCy version, the contents of the BEAR files (relation
+    info, relation facts and all entities) and the constructor kwargs that change the index.
+    :param index_cache_dir: Directory of the index cache files.
+    :param bear_relation_info_path: Path to the relation info json file.
+    :param bear_facts_path: Path to the BEAR facts directory.
+    :param path_to_all_entities: Path to the all entities json file (or None).
+    :param kwargs: Constructor kwargs of the fact matcher.
+    :return: Path of the index cache file.
+    """
+    cache_key = hashlib.sha256()
+    cache_key.update(f"{INDEX_CACHE_VERSION}:{spacy.__version__}".encode("utf-8"))
+    input_paths = [bear_relation_info_path]
+    input_paths.extend(
+        f"{bear_facts_path}/{relation_key}.jsonl" for relation_key in load_json_dict(bear_relation_info_path)
+    )
+    if path_to_all_entities:
+        input_paths.append(path_to_all_entities)
+    for input_path in input_paths:
+        cache_key.update(input_path.encode("utf-8"))
+        try:
+            with open(input_path, "rb") as f:
+                chunk = f.read(2**20)
+                while chunk:
+                    cache_key.update(chunk)
+                    chunk = f.read(2**20)
+        except FileNotFoundError:
+            cache_key.update(b"missing")
+    for key in ["exclude_aliases", "min_entity_name_length", "max_allowed_ngram_length"]:
+        cache_key.update(f"{key}={kwargs.get(key)!r}".encode("utf-8"))
+    return os.path.join(index_cache_dir, f"entity_index_v{INDEX_CACHE_VERSION}_{cache_key.hexdigest()}.pkl")
+
+
+def load_index_cache(index_cache_path: Optional[str]) -> Optional[dict]:
+    """
+    Load an index cache (only load caches from trusted directories, the cache is a pickle file).
+
+    :param index_cache_path: Path of the index cache file (or None).
+    :return: Cached index or None if the path is None, the file does not exist or has another cache version.
+    """
+    if index_cache_path is None or not os.path.exists(index_cache_path):
+        return None
+    with open(index_cache_path, "rb") as f:
+        cached_index = pickle.load(f)
+    if cached_index.get("version") != INDEX_CACHE_VERSION:
+        return None
+    logging.info("Loaded index cache from %s", index_cache_path)
+    return cached_index
+
+
+def save_index_cache(index_cache_path: str, index: dict) -> None:
+    """
+    Save an index cache.
+
+    The file is written next to the cache path first and then moved, so an interrupted write does not leave a
+    corrupt cache.
+    :param index_cache_path: Path of the index cache file.
+    :param index: Index to cache.
+    :return:
+    """
+    os.makedirs(os.path.dirname(index_cache_path) or ".", exist_ok=True)
+    with open(f"{index_cache_path}.tmp", "wb") as f:
+        pickle.dump({"version": INDEX_CACHE_VERSION, **index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{index_cache_path}.tmp", index_cache_path)
+    logging.info("Saved index cache to %s", index_cache_path)
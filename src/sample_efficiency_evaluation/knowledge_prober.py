@@ -17,9 +17,13 @@ class KnowledgeProber:
         """
         Initialize the KnowledgeProber.
 
-        :param path_to_relation_occurrence_info_file: Path to the relation occurrence information file.
+        :param path_to_relation_occurrence_info_file: Path to the relation occurrence information file (json or
+        parquet, see utility.save_relation_occurrence_info_parquet). Only the occurrences are loaded from a parquet
+        file.
         """
-        self.entity_relation_occurrence_info_dict = utility.load_json_dict(path_to_relation_occurrence_info_file)
+        self.entity_relation_occurrence_info_dict = utility.load_relation_occurrence_info(
+            path_to_relation_occurrence_info_file, columns=["occurrences"]
+        )
         self.relation_occurrence_buckets = [
             (1, 2),
             (2, 4),
@@ -0,0 +1,220 @@
+import re
+from typing import Optional, Union
+
+from sample_efficiency_evaluation.occurrence_store import OccurrenceStore
+from sample_efficiency_evaluation.shared_index import SharedMatchIndex
+from utility.utility import is_word_character, word_in_lower_sentence, word_in_sentence
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def is_regular_object_name(obj_name: str) -> bool:
+    """
+    Check if an object name can be found by its words (see ObjectMatcher).
+
+    :param obj_name: Object name.
+    :return: True if lowercasing keeps the length of the name and the name starts and ends with a word character.
+    """
+    obj_name_lower = obj_name.lower()
+    return (
+        len(obj_name_lower) == len(obj_name)
+        and bool(obj_name_lower)
+        and is_word_character(obj_name_lower[0])
+        and is_word_character(obj_name_lower[-1])
+    )
+
+
+class ObjectMatcher:
+    """
+    ObjectMatcher finds the object labels and aliases of the facts in sentences.
+
+    The lower case object names are mapped to the facts they belong to (object_mapping_dict). A name is only mapped if
+    it starts and ends with a word character, since such a name can only be found in a sentence from the start of a
+    word to the end of a word. For these names, the first word and the number of words are indexed in
+    object_word_counts. All other names (e.g. "U.S." or "🇳🇵") are kept per fact in irregular_object_names and are
+    searched in the sentence directly.
+
+    If a shared index is set (see SharedMatchIndex), the names are looked up in the shared index instead of the
+    dictionaries and the facts are identified by their fact ids instead of (relation_id, subj_id) tuples.
+    """
+
+    def __init__(self, occurrence_store: OccurrenceStore):
+        """
+        Initialize ObjectMatcher.
+
+        :param occurrence_store: Occurrence store with the facts (object labels and aliases).
+        """
+        self.occurrence_store = occurrence_store
+        self.object_word_counts: dict[str, set[int]] = {}
+        self.irregular_object_names: dict[tuple, list[str]] = {}
+        self.object_mapping_dict = self._create_mapped_objects()
+        self.shared_index: Optional[SharedMatchIndex] = None
+
+    def _create_mapped_objects(self) -> dict:
+        """
+        Create object mapping dictionary.
+
+        :return: Object mapping dictionary (lower case object name -> tuple of (relation_id, subj_id) tuples).
+        """
+        mapped_objects: dict[str, list[tuple[str, str]]] = {}
+        store = self.occurrence_store
+        # The (relation_id, subj_id) tuples of fact_ids are shared with the mapping instead of creating new tuples.
+        for fact, fact_id in store.fact_ids.items():
+            for obj_name in [store.obj_labels[fact_id], *store.obj_aliases[fact_id]]:
+                if not is_regular_object_name(obj_name):
+                    self.irregular_object_names.setdefault(fact, []).append(obj_name)
+                    continue
+                obj_name_lower = obj_name.lower()
+                words = WORD_PATTERN.findall(obj_name_lower)
+                self.object_word_counts.setdefault(words[0], set()).add(len(words))
+                facts = mapped_objects.setdefault(obj_name_lower, [])
+                if not facts or facts[-1] is not fact:
+                    facts.append(fact)
+        return {obj_name_lower: tuple(facts) for obj_name_lower, facts in mapped_objects.items()}
+
+    def get_object_matches(self, sentence_lower: str, object_names: Optional[set[str]] = None) -> set[tuple]:
+        """
+        Get object matches.
+
+        The sentence is split into its words once. Every span from the start of a word to the end of a word that
+        covers the number of words of a mapped object name starting with that word is looked up in the object
+        mapping dictionary.
+        :param sentence_lower: Lower case sentence.
+        :param object_names: If given, the matched object names are added to it.
+        :return: Set of (relation_id, subj_id) tuples (fact ids if a shared index is set) for which an object name is
+        in the sentence.
+        """
+        object_matches: set = set()
+        object_word_counts = self.object_word_counts
+        shared_objects = None
+        if self.shared_index is not None:
+            object_word_counts = self.shared_index.object_word_counts
+            shared_objects = self.shared_index.objects
+        word_spans = [match.span() for match in WORD_PATTERN.finditer(sentence_lower)]
+        for index, (start, end) in enumerate(word_spans):
+            word_counts = object_word_counts.get(sentence_lower[start:end])
+            if word_counts is None:
+                continue
+            for word_count in word_counts:
+                if index + word_count > len(word_spans):
+                    continue
+                obj_name = sentence_lower[start : word_spans[index + word_count - 1][1]]
+                if shared_objects is not None:
+                    object_facts = shared_objects.get(obj_name)
+                elif obj_name in self.object_mapping_dict:
+                    object_facts = self.object_mapping_dict[obj_name]
+                else:
+                    continue
+                if object_facts is not None:
+                    object_matches.update(object_facts)
+                    if object_names is not None:
+                        object_names.add(obj_name)
+        return object_matches
+
+    def get_irregular_object_names(self, fact_id: int, fact: tuple[str, str]) -> list[str]:
+        """
+        Get the irregular object names of a fact.
+
+        :param fact_id: Fact id.
+        :param fact: (relation_id, subj_id) tuple of the fact.
+        :return: Irregular object names of the fact.
+        """
+        if self.shared_index is not None:
+            return self.shared_index.irregular_object_names.get(fact_id, [])
+        return self.irregular_object_names.get(fact, [])
+
+    def get_object_label(self, fact_id: int) -> str:
+        """
+        Get the object label of a fact.
+
+        :param fact_id: Fact id.
+        :return: Object label
+        """
+        if self.shared_index is not None:
+            return self.shared_index.obj_labels[fact_id][0]
+        return self.occurrence_store.obj_labels[fact_id]
+
+    def match_sentence(self, sentence: str, collect_names: bool = False) -> "SentenceObjects":
+        """
+        Find the object names in a sentence.
+
+        :param sentence: Sentence
+        :param collect_names: If True, the matched object names are kept, so SentenceObjects.object_label_in_sentence
+        can be used.
+        :return: SentenceObjects
+        """
+        return SentenceObjects(self, sentence, collect_names)
+
+
+class SentenceObjects:
+    """
+    SentenceObjects holds the object names found in a sentence by an ObjectMatcher.
+
+    If lowercasing changes the length of the sentence, the word spans of the lower case sentence do not match the
+    sentence, so the object names of every fact are searched in the sentence directly.
+    """
+
+    def __init__(self, object_matcher: ObjectMatcher, sentence: str, collect_names: bool = False):
+        """
+        Initialize SentenceObjects.
+
+        :param object_matcher: ObjectMatcher
+        :param sentence: Sentence
+        :param collect_names: If True, the matched object names are kept.
+        """
+        self.object_matcher = object_matcher
+        self.sentence = sentence
+        self.sentence_lower = sentence.lower()
+        self.object_names: Optional[set[str]] = set() if collect_names else None
+        self.object_matches: Optional[set] = None
+        if len(self.sentence_lower) == len(sentence):
+            self.object_matches = object_matcher.get_object_matches(self.sentence_lower, self.object_names)
+        self.irregular_object_matches: dict[str, bool] = {}
+
+    def irregular_object_in_sentence(self, obj_name: str) -> bool:
+        """
+        Check if an irregular object name is in the sentence.
+
+        :param obj_name: Object name that is not in the object mapping dictionary.
+        :return: True if the object name is in the sentence, False otherwise
+        """
+        if obj_name not in self.irregular_object_matches:
+            obj_name_lower = obj_name.lower()
+            if len(obj_name_lower) == len(obj_name):
+                self.irregular_object_matches[obj_name] = word_in_lower_sentence(obj_name_lower, self.sentence_lower)
+            else:
+                self.irregular_object_matches[obj_name] = word_in_sentence(obj_name, self.sentence)
+        return self.irregular_object_matches[obj_name]
+
+    def object_in_sentence(self, fact_id: int, fact: Union[tuple[str, str], int]) -> bool:
+        """
+        Check if the object label or one of the object aliases of a fact is in the sentence.
+
+        :param fact_id: Fact id.
+        :param fact: (relation_id, subj_id) tuple of the fact (the fact id if the object matcher has a shared index).
+        :return: True if an object name is in the sentence, False otherwise
+        """
+        store = self.object_matcher.occurrence_store
+        if self.object_matches is None:
+            return any(
+                word_in_sentence(obj_name, self.sentence)
+                for obj_name in [store.obj_labels[fact_id], *store.obj_aliases[fact_id]]
+            )
+        return fact in self.object_matches or any(
+            self.irregular_object_in_sentence(obj_name)
+            for obj_name in self.object_matcher.get_irregular_object_names(fact_id, fact)
+        )
+
+    def object_label_in_sentence(self, fact_id: int) -> bool:
+        """
+        Check if the object label of a fact is in the sentence (requires collect_names).
+
+        :param fact_id: Fact id.
+        :return: True if the object label is in the sentence, False otherwise
+        """
+        obj_label = self.object_matcher.get_object_label(fact_id)
+        if self.object_matches is None or self.object_names is None:
+            return word_in_sentence(obj_label, self.sentence)
+        if is_regular_object_name(obj_label):
+            return obj_label.lower() in self.object_names
+        return self.irregular_object_in_sentence(obj_label)
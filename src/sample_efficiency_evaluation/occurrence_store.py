@@ -0,0 +1,532 @@
+import heapq
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from utility.utility import (
+    ALIAS_OCCURRENCE_KEYS,
+    format_sentence_reference,
+    get_sentence_priority,
+    parse_sentence_reference,
+)
+
+
+class OccurrenceStore:
+    """
+    OccurrenceStore keeps the fact occurrences in a compact, array-backed form.
+
+    Every fact (relation_id, subj_id) is interned to an integer fact id (the ids, labels and aliases are interned as
+    well, so facts sharing an entity share its strings). The occurrences are kept in a NumPy int64
+    array indexed by the fact id, the labels and aliases are kept in side tables (lists indexed by the fact id) and
+    the sentences are only stored for facts that have any. The relation info dictionary (the schema of the relation
+    occurrence info json files) can be created with to_relation_info_dict.
+
+    Instead of the sentence itself, a fact can store a sentence reference id. The references (document index, start
+    and end character of the sentence) are kept once in a global table of int64 arrays, so a sentence matching several
+    facts is not copied for each of them. In the relation info dictionary, the references are formatted as
+    "document_index:start_char:end_char" (see utility.format_sentence_reference).
+
+    If max_sentences_per_fact is set, at most that many distinct sentences are kept per fact, while the occurrences
+    are still counted exactly. With "reservoir" sentence sampling, the sentences with the lowest priority (a stable
+    hash of the sentence, see utility.get_sentence_priority) are kept in a heap per fact. This is a uniform random
+    sample of the distinct sentences that does not depend on the order of the sentences, so the samples of several
+    workers or slices merge (merge_fact, utility.sample_sentences) into the sample of a single run, and the counts of
+    the kept sentences are exact. With "first" sentence sampling, the first sentences are kept (the counts of a kept
+    sentence only include later workers or slices that kept it as well).
+
+    If alias attribution is enabled (set_alias_attribution), the occurrences of every fact are additionally counted
+    by how the fact was found (see utility.ALIAS_OCCURRENCE_KEYS): with the subject and object labels, only with a
+    subject alias, only with an object alias or only with a subject and an object alias. The label occurrences are
+    the occurrences of a run without aliases, the sum of the four counts are the occurrences.
+
+    The version attribute is incremented by every method that changes the occurrences or sentences, so a read-only
+    relation info dictionary created from the store can be cached until the version changes.
+    """
+
+    def __init__(
+        self, capacity: int = 0, max_sentences_per_fact: Optional[int] = None, sentence_sampling: str = "reservoir"
+    ):
+        """
+        Initialize OccurrenceStore.
+
+        :param capacity: Initial capacity of the occurrences array.
+        :param max_sentences_per_fact: Maximum number of sentences per fact. If None, all sentences are kept.
+        :param sentence_sampling: Sampling method if there are more sentences ("reservoir" or "first").
+        """
+        self.version = 0
+        self.max_sentences_per_fact: Optional[int] = None
+        self.sentence_sampling = "reservoir"
+        self._sentence_heaps: dict[int, list[tuple[int, Union[str, int]]]] = {}
+        self.set_sentence_sampling(max_sentences_per_fact, sentence_sampling)
+        self.relations: dict[str, None] = {}
+        self.fact_ids: dict[tuple[str, str], int] = {}
+        self.relation_ids: list[str] = []
+        self.subj_ids: list[str] = []
+        self.subj_labels: list[str] = []
+        self.subj_aliases: list[tuple[str, ...]] = []
+        self.obj_ids: list[str] = []
+        self.obj_labels: list[str] = []
+        self.obj_aliases: list[tuple[str, ...]] = []
+        self.sentences: dict[int, dict[Union[str, int], int]] = {}
+        self.reference_documents = array("q")
+        self.reference_starts = array("q")
+        self.reference_ends = array("q")
+        self._occurrences = np.zeros(capacity, dtype=np.int64)
+        self._alias_occurrences: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.relation_ids)
+
+    @property
+    def occurrences(self) -> np.ndarray:
+        """
+        Occurrences of the facts indexed by the fact id.
+        """
+        return self._occurrences[: len(self)]
+
+    @property
+    def alias_occurrences(self) -> Optional[np.ndarray]:
+        """
+        Occurrences of the facts by how they were found (one row per fact id, one column per
+        utility.ALIAS_OCCURRENCE_KEYS), or None if alias attribution is disabled.
+        """
+        if self._alias_occurrences is None:
+            return None
+        return self._alias_occurrences[: len(self)]
+
+    @classmethod
+    def from_relation_info_dict(cls, relation_info_dict: dict) -> "OccurrenceStore":
+        """
+        Create OccurrenceStore from a relation info dictionary.
+
+        :param relation_info_dict: Relation info dictionary (relation_id -> subj_id -> fact).
+        :return: OccurrenceStore
+        """
+        store = cls(capacity=sum(len(facts) for facts in relation_info_dict.values()))
+        for relation_id, facts in relation_info_dict.items():
+            store.add_relation(relation_id)
+            for subj_id, fact in facts.items():
+                if len(store) == 0 and ALIAS_OCCURRENCE_KEYS[0] in fact:
+                    store.set_alias_attribution(True)
+                store.add_fact(
+                    relation_id,
+                    subj_id,
+                    subj_label=fact["subj_label"],
+                    subj_aliases=fact["subj_aliases"],
+                    obj_id=fact["obj_id"],
+                    obj_label=fact["obj_label"],
+                    obj_aliases=fact["obj_aliases"],
+                    occurrences=fact.get("occurrences", 0),
+                    sentences=fact.get("sentences"),
+                    alias_occurrences=(
+                        [fact[key] for key in ALIAS_OCCURRENCE_KEYS] if ALIAS_OCCURRENCE_KEYS[0] in fact else None
+                    ),
+                )
+        return store
+
+    def add_relation(self, relation_id: str) -> None:
+        """
+        Add relation (relations without facts are kept in the relation info dictionary as well).
+
+        :param relation_id: Relation id.
+        :return:
+        """
+        self.relations.setdefault(sys.intern(relation_id), None)
+        self.version += 1
+
+    def add_fact(
+        self,
+        relation_id: str,
+        subj_id: str,
+        subj_label: str,
+        subj_aliases: Iterable[str],
+        obj_id: str,
+        obj_label: str,
+        obj_aliases: Iterable[str],
+        occurrences: int = 0,
+        sentences: Optional[dict[str, int]] = None,
+        alias_occurrences: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Add fact.
+
+        :param relation_id: Relation id.
+        :param subj_id: Subject id.
+        :param subj_label: Subject label.
+        :param subj_aliases: Subject aliases (a tuple is kept as it is, so it can be shared with other facts, see
+        entity_information.EntityFact).
+        :param obj_id: Object id.
+        :param obj_label: Object label.
+        :param obj_aliases: Object aliases (a tuple is kept as it is).
+        :param occurrences: Occurrences of the fact.
+        :param sentences: Sentences the fact was found in (sentence -> count).
+        :param alias_occurrences: Occurrences by how the fact was found (see utility.ALIAS_OCCURRENCE_KEYS), only
+        used if alias attribution is enabled.
+        :return: Fact id
+        """
+        relation_id = sys.intern(relation_id)
+        subj_id = sys.intern(subj_id)
+        self.add_relation(relation_id)
+        fact_id = len(self)
+        self.fact_ids[(relation_id, subj_id)] = fact_id
+        self.relation_ids.append(relation_id)
+        self.subj_ids.append(subj_id)
+        self.subj_labels.append(sys.intern(subj_label))
+        self.subj_aliases.append(_intern_aliases(subj_aliases))
+        self.obj_ids.append(sys.intern(obj_id))
+        self.obj_labels.append(sys.intern(obj_label))
+        self.obj_aliases.append(_intern_aliases(obj_aliases))
+        if fact_id >= len(self._occurrences):
+            self._occurrences = np.concatenate([self._occurrences, np.zeros(max(fact_id, 16), dtype=np.int64)])
+        self._occurrences[fact_id] = occurrences
+        if self._alias_occurrences is not None:
+            if fact_id >= len(self._alias_occurrences):
+                self._alias_occurrences = np.concatenate(
+                    [
+                        self._alias_occurrences,
+                        np.zeros(
+                            (len(self._occurrences) - len(self._alias_occurrences), len(ALIAS_OCCURRENCE_KEYS)),
+                            dtype=np.int64,
+                        ),
+                    ]
+                )
+            if alias_occurrences is not None:
+                self._alias_occurrences[fact_id] = list(alias_occurrences)
+        if sentences:
+            self.sentences[fact_id] = dict(sentences)
+        return fact_id
+
+    def set_sentence_sampling(self, max_sentences_per_fact: Optional[int], sentence_sampling: str) -> None:
+        """
+        Set the maximum number of sentences per fact and the sampling method (applies to sentences added afterwards).
+
+        :param max_sentences_per_fact: Maximum number of sentences per fact. If None, all sentences are kept.
+        :param sentence_sampling: Sampling method if there are more sentences ("reservoir" or "first").
+        :return:
+        """
+        if sentence_sampling not in ("reservoir", "first"):
+            raise ValueError(f"Unknown sentence sampling method: {sentence_sampling}")
+        self.max_sentences_per_fact = max_sentences_per_fact
+        self.sentence_sampling = sentence_sampling
+        self._sentence_heaps = {}
+
+    def set_alias_attribution(self, enabled: bool) -> None:
+        """
+        Enable or disable alias attribution (enabling it resets the occurrences by how the facts were found).
+
+        :param enabled: If True, the occurrences are counted by how the facts were found (see add_alias_occurrence).
+        :return:
+        """
+        self.version += 1
+        self._alias_occurrences = None
+        if enabled:
+            self._alias_occurrences = np.zeros((len(self._occurrences), len(ALIAS_OCCURRENCE_KEYS)), dtype=np.int64)
+
+    def iter_facts(self) -> Iterator[tuple[int, str, str]]:
+        """
+        Iterate over the facts.
+
+        :return: Iterator over (fact_id, relation_id, subj_id) tuples in insertion order.
+        """
+        yield from zip(range(len(self)), self.relation_ids, self.subj_ids)
+
+    def add_sentence_reference(self, document_index: int, start_char: int, end_char: int) -> int:
+        """
+        Add sentence reference to the reference table.
+
+        :param document_index: Index of the document in the dataset.
+        :param start_char: Start character offset of the sentence in the document.
+        :param end_char: End character offset of the sentence in the document.
+        :return: Sentence reference id
+        """
+        self.reference_documents.append(document_index)
+        self.reference_starts.append(start_char)
+        self.reference_ends.append(end_char)
+        return len(self.reference_documents) - 1
+
+    def get_sentence_reference(self, reference_id: int) -> str:
+        """
+        Get formatted sentence reference.
+
+        :param reference_id: Sentence reference id.
+        :return: Sentence reference ("document_index:start_char:end_char")
+        """
+        return format_sentence_reference(
+            self.reference_documents[reference_id],
+            self.reference_starts[reference_id],
+            self.reference_ends[reference_id],
+        )
+
+    def get_sentences(self, fact_id: int) -> dict[str, int]:
+        """
+        Get the sentences of a fact, with the sentence reference ids formatted as sentence references.
+
+        :param fact_id: Fact id.
+        :return: Sentences (sentence or sentence reference -> count).
+        """
+        return {
+            self.get_sentence_reference(sentence) if isinstance(sentence, int) else sentence: count
+            for sentence, count in self.sentences.get(fact_id, {}).items()
+        }
+
+    def add_occurrence(
+        self, fact_id: int, sentence: Optional[Union[str, int, tuple[int, int, int]]] = None, count: int = 1
+    ) -> Optional[Union[str, int, tuple[int, int, int]]]:
+        """
+        Add occurrences of a fact.
+
+        :param fact_id: Fact id.
+        :param sentence: Sentence (or sentence reference id) the fact was found in. If None, only the occurrences are
+        updated. A (document_index, start_char, end_char) tuple is added to the reference table only if the fact keeps
+        the sentence (see max_sentences_per_fact), so the table does not grow with the sentences that are not kept.
+        :param count: Number of occurrences to add.
+        :return: Sentence to add to the other facts found in the sentence (the sentence reference id once the
+        reference is added).
+        """
+        self.version += 1
+        self._occurrences[fact_id] += count
+        if sentence is None:
+            return None
+        if isinstance(sentence, tuple):
+            if not self._keeps_new_sentence(fact_id, format_sentence_reference(*sentence)):
+                return sentence
+            sentence = self.add_sentence_reference(*sentence)
+        self._add_sentence(fact_id, sentence, count)
+        return sentence
+
+    def add_alias_occurrence(self, fact_id: int, subj_via_alias: bool, obj_via_alias: bool, count: int = 1) -> None:
+        """
+        Count occurrences of a fact by how the fact was found (the occurrences themselves are added with
+        add_occurrence). Does nothing if alias attribution is disabled.
+
+        :param fact_id: Fact id.
+        :param subj_via_alias: True if the subject was only found by an alias.
+        :param obj_via_alias: True if the object was only found by an alias.
+        :param count: Number of occurrences to add.
+        :return:
+        """
+        if self._alias_occurrences is not None:
+            self.version += 1
+            self._alias_occurrences[fact_id, int(subj_via_alias) + 2 * int(obj_via_alias)] += count
+
+    def _add_sentence(self, fact_id: int, sentence: Union[str, int], count: int) -> None:
+        """
+        Add a sentence of a fact, respecting max_sentences_per_fact.
+
+        :param fact_id: Fact id.
+        :param sentence: Sentence (or sentence reference id).
+        :param count: Number of occurrences in the sentence.
+        :return:
+        """
+        fact_sentences = self.sentences.setdefault(fact_id, {})
+        if sentence in fact_sentences:
+            fact_sentences[sentence] += count
+            return
+        if not self._keeps_new_sentence(fact_id, sentence):
+            return
+        if self.max_sentences_per_fact is not None and len(fact_sentences) >= self.max_sentences_per_fact:
+            heap = self._get_sentence_heap(fact_id)
+            _, evicted_sentence = heapq.heapreplace(heap, (-self._get_sentence_priority(sentence), sentence))
+            del fact_sentences[evicted_sentence]
+        fact_sentences[sentence] = count
+
+    def _keeps_new_sentence(self, fact_id: int, sentence: Union[str, int]) -> bool:
+        """
+        Check whether a fact keeps a sentence it does not have yet, respecting max_sentences_per_fact.
+
+        :param fact_id: Fact id.
+        :param sentence: Sentence (or sentence reference id, or formatted sentence reference).
+        :return: True if the sentence is kept (with reservoir sampling, possibly by evicting another sentence).
+        """
+        if self.max_sentences_per_fact is None or len(self.sentences.get(fact_id, ())) < self.max_sentences_per_fact:
+            return True
+        if self.sentence_sampling == "first" or self.max_sentences_per_fact == 0:
+            return False
+        return self._get_sentence_priority(sentence) < -self._get_sentence_heap(fact_id)[0][0]
+
+    def _get_sentence_priority(self, sentence: Union[str, int]) -> int:
+        """
+        Get the sampling priority of a sentence (see utility.get_sentence_priority).
+
+        :param sentence: Sentence (or sentence reference id, whose formatted reference is hashed).
+        :return: Priority
+        """
+        return get_sentence_priority(self.get_sentence_reference(sentence) if isinstance(sentence, int) else sentence)
+
+    def _get_sentence_heap(self, fact_id: int) -> list[tuple[int, Union[str, int]]]:
+        """
+        Get the max-heap of the (negated) sentence priorities of a fact, creating it from the sentences once the fact
+        has max_sentences_per_fact sentences.
+
+        :param fact_id: Fact id.
+        :return: Heap of (-priority, sentence) tuples.
+        """
+        heap = self._sentence_heaps.get(fact_id)
+        if heap is None:
+            heap = [(-self._get_sentence_priority(sentence), sentence) for sentence in self.sentences[fact_id]]
+            heapq.heapify(heap)
+            self._sentence_heaps[fact_id] = heap
+        return heap
+
+    def merge_fact(
+        self,
+        fact_id: int,
+        occurrences: int,
+        sentences: dict[str, int],
+        reference_ids: Optional[dict[str, int]] = None,
+        alias_occurrences: Optional[Iterable[int]] = None,
+    ) -> None:
+        """
+        Merge occurrences and sentences (e.g. from another worker) into a fact.
+
+        :param fact_id: Fact id.
+        :param occurrences: Occurrences to add.
+        :param sentences: Sentences to add (sentence -> count).
+        :param reference_ids: If given, the sentences are sentence references, which are added to the reference table
+        if the fact keeps them. The dictionary maps the already added references to their ids, so references shared
+        by several facts are added once.
+        :param alias_occurrences: Occurrences by how the fact was found to add (see utility.ALIAS_OCCURRENCE_KEYS),
+        only used if alias attribution is enabled.
+        :return:
+        """
+        self.version += 1
+        self._occurrences[fact_id] += occurrences
+        if alias_occurrences is not None and self._alias_occurrences is not None:
+            self._alias_occurrences[fact_id] += np.asarray(list(alias_occurrences), dtype=np.int64)
+        if not sentences:
+            return
+        for sentence, count in sentences.items():
+            if reference_ids is not None:
+                if sentence not in reference_ids:
+                    if not self._keeps_new_sentence(fact_id, sentence):
+                        continue
+                    reference_ids[sentence] = self.add_sentence_reference(*parse_sentence_reference(sentence))
+                sentence = reference_ids[sentence]
+            self._add_sentence(fact_id, sentence, count)
+
+    def clear_sentences(self) -> None:
+        """
+        Remove all sentences and sentence references.
+
+        :return:
+        """
+        self.version += 1
+        self.sentences = {}
+        self._sentence_heaps = {}
+        self.reference_documents = array("q")
+        self.reference_starts = array("q")
+        self.reference_ends = array("q")
+
+    def reset(self, fact_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Reset occurrences and sentences.
+
+        :param fact_ids: Fact ids to reset. If None, all facts are reset.
+        :return:
+        """
+        self.version += 1
+        if fact_ids is None:
+            self._occurrences[:] = 0
+            if self._alias_occurrences is not None:
+                self._alias_occurrences[:] = 0
+            self.clear_sentences()
+            return
+        for fact_id in fact_ids:
+            self._occurrences[fact_id] = 0
+            if self._alias_occurrences is not None:
+                self._alias_occurrences[fact_id] = 0
+            self.sentences.pop(fact_id, None)
+            self._sentence_heaps.pop(fact_id, None)
+
+    def get_matched_fact_ids(self) -> list[int]:
+        """
+        Get the ids of the facts with occurrences or sentences.
+
+        :return: Sorted list of fact ids.
+        """
+        return sorted(set(np.flatnonzero(self.occurrences).tolist()).union(self.sentences))
+
+    def get_alias_occurrences(self, fact_id: int) -> Optional[list[int]]:
+        """
+        Get the occurrences of a fact by how the fact was found.
+
+        :param fact_id: Fact id.
+        :return: Occurrences in the order of utility.ALIAS_OCCURRENCE_KEYS, or None if alias attribution is disabled.
+        """
+        if self._alias_occurrences is None:
+            return None
+        return self._alias_occurrences[fact_id].tolist()
+
+    def get_fact(self, fact_id: int) -> dict:
+        """
+        Get fact in the relation info dictionary schema.
+
+        :param fact_id: Fact id.
+        :return: Fact dictionary (with the occurrences by how the fact was found, see utility.ALIAS_OCCURRENCE_KEYS,
+        if alias attribution is enabled).
+        """
+        fact = {
+            "subj_label": self.subj_labels[fact_id],
+            "subj_aliases": set(self.subj_aliases[fact_id]),
+            "obj_id": self.obj_ids[fact_id],
+            "obj_label": self.obj_labels[fact_id],
+            "obj_aliases": set(self.obj_aliases[fact_id]),
+            "occurrences": int(self._occurrences[fact_id]),
+            "sentences": self.get_sentences(fact_id),
+        }
+        alias_occurrences = self.get_alias_occurrences(fact_id)
+        if alias_occurrences is not None:
+            fact.update(zip(ALIAS_OCCURRENCE_KEYS, alias_occurrences))
+        return fact
+
+    def to_relation_info_dict(self, read_only: bool = False) -> dict:
+        """
+        Convert to relation info dictionary.
+
+        :param read_only: If True, the dictionaries are ReadOnlyDicts and the aliases are frozensets.
+        :return: Relation info dictionary (relation_id -> subj_id -> fact), as created by
+        FactMatcherBase.extract_entity_information.
+        """
+        relation_info_dict: dict = {relation_id: {} for relation_id in self.relations}
+        for fact_id, relation_id, subj_id in self.iter_facts():
+            fact = self.get_fact(fact_id)
+            if read_only:
+                fact["subj_aliases"] = frozenset(fact["subj_aliases"])
+                fact["obj_aliases"] = frozenset(fact["obj_aliases"])
+                fact["sentences"] = ReadOnlyDict(fact["sentences"])
+                fact = ReadOnlyDict(fact)
+            relation_info_dict[relation_id][subj_id] = fact
+        if read_only:
+            return ReadOnlyDict((relation_id, ReadOnlyDict(facts)) for relation_id, facts in relation_info_dict.items())
+        return relation_info_dict
+
+
+class ReadOnlyDict(dict):
+    """
+    ReadOnlyDict is a dictionary that raises a TypeError on every write.
+
+    Copies (copy.deepcopy, pickle) are plain dictionaries, so a copy can be modified.
+    """
+
+    def _raise_read_only(self, *args, **kwargs):
+        raise TypeError("The dictionary is read-only, modify a copy (e.g. copy.deepcopy) instead.")
+
+    __setitem__ = __delitem__ = __ior__ = _raise_read_only
+    clear = pop = popitem = setdefault = update = _raise_read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _intern_aliases(aliases: Iterable[str]) -> tuple[str, ...]:
+    """
+    Intern aliases.
+
+    :param aliases: Aliases.
+    :return: Tuple of interned aliases (aliases itself if it is a tuple already, see entity_information.EntityFact).
+    """
+    if isinstance(aliases, tuple):
+        return aliases
+    return tuple(sys.intern(alias) for alias in aliases)
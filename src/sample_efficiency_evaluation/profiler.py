@@ -0,0 +1,152 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from utility import utility
+
+
+class StageProfiler:
+    """
+    StageProfiler attributes the wall time of the fact matching to stages and counts events (sentences, ngram windows,
+    subject hits, ...).
+
+    The time is measured with laps: lap(stage) adds the time since the previous lap to the stage, so the stages
+    partition the profiled time and a lap costs one perf_counter call. A disabled profiler returns from lap and count
+    immediately.
+
+    The profile can be dumped periodically (see maybe_dump) as json or, if the dump path ends with .prom, in the
+    Prometheus textfile exporter format.
+    """
+
+    def __init__(
+        self, enabled: bool = False, dump_path: Optional[str] = None, dump_interval_seconds: Optional[float] = 60.0
+    ):
+        """
+        Initialize StageProfiler.
+
+        :param enabled: If False, nothing is measured.
+        :param dump_path: Path to dump the profile to (json or, if it ends with .prom, Prometheus textfile format).
+        :param dump_interval_seconds: Minimum number of seconds between two dumps of maybe_dump.
+        """
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.dump_interval_seconds = dump_interval_seconds
+        self.timers: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._mark = time.perf_counter()
+        self._last_dump_time = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Start a lap without attributing the time since the previous lap to a stage.
+
+        :return:
+        """
+        if self.enabled:
+            self._mark = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """
+        Add the time since the previous lap to a stage.
+
+        :param stage: Name of the stage.
+        :return:
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.timers[stage] = self.timers.get(stage, 0.0) + now - self._mark
+        self._mark = now
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """
+        Increment a counter.
+
+        :param counter: Name of the counter.
+        :param value: Value to add.
+        :return:
+        """
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def get_profile(self) -> dict:
+        """
+        Get the profile.
+
+        :return: Dictionary with the seconds per stage ("timers") and the counters ("counters").
+        """
+        return {"timers": dict(self.timers), "counters": dict(self.counters)}
+
+    def merge(self, profile: dict) -> None:
+        """
+        Merge a profile (e.g. from another worker) into this profiler.
+
+        :param profile: Profile (see get_profile).
+        :return:
+        """
+        for stage, seconds in profile["timers"].items():
+            self.timers[stage] = self.timers.get(stage, 0.0) + seconds
+        for counter, value in profile["counters"].items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def reset(self) -> None:
+        """
+        Reset the timers and counters.
+
+        :return:
+        """
+        self.timers = {}
+        self.counters = {}
+        self._mark = time.perf_counter()
+
+    def to_prometheus(self, prefix: str = "fact_matcher") -> str:
+        """
+        Format the profile in the Prometheus text format.
+
+        :param prefix: Prefix of the metric names.
+        :return: Profile in the Prometheus text format.
+        """
+        lines = [f"# TYPE {prefix}_stage_seconds_total counter"]
+        lines.extend(
+            f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds}' for stage, seconds in self.timers.items()
+        )
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        lines.extend(
+            f'{prefix}_events_total{{counter="{counter}"}} {value}' for counter, value in self.counters.items()
+        )
+        return "\n".join(lines) + "\n"
+
+    def dump(self, dump_path: Optional[str] = None) -> None:
+        """
+        Dump the profile.
+
+        The file is written next to the dump path first and then moved, so readers never see a partial profile.
+        :param dump_path: Path to dump the profile to. If None, dump_path of the profiler is used.
+        :return:
+        """
+        dump_path = dump_path if dump_path is not None else self.dump_path
+        if not self.enabled or dump_path is None:
+            return
+        if dump_path.endswith(".prom"):
+            with open(f"{dump_path}.tmp", "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        else:
+            utility.save_dict_as_json(self.get_profile(), f"{dump_path}.tmp")
+        os.replace(f"{dump_path}.tmp", dump_path)
+        self._last_dump_time = time.monotonic()
+        logging.debug("Dumped profile to %s", dump_path)
+
+    def maybe_dump(self) -> None:
+        """
+        Dump the profile if dump_interval_seconds have passed since the last dump.
+
+        :return:
+        """
+        if (
+            self.enabled
+            and self.dump_path is not None
+            and self.dump_interval_seconds is not None
+            and time.monotonic() - self._last_dump_time >= self.dump_interval_seconds
+        ):
+            self.dump()
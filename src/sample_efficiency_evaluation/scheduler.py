@@ -0,0 +1,247 @@
+import gc
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import count, islice
+from typing import Iterable, Iterator, Optional, Union
+
+import pyarrow as pa
+from datasets import Dataset, IterableDataset
+from tqdm import tqdm
+
+from sample_efficiency_evaluation.documents import get_chunk, get_text_sizes, iter_texts, split_into_chunks
+
+_worker_context: Optional[tuple] = None
+
+
+class ChunkScheduler:
+    """
+    ChunkScheduler processes documents with a pool of forked worker processes that pull chunks of documents.
+
+    Documents that can be indexed (Dataset, Table or list) are split into num_workers * chunks_per_worker contiguous
+    chunks of about the same text size (see documents.split_into_chunks), so skewed document lengths do not leave
+    workers idle. The chunks are queued and every worker takes the next chunk once it is done with the previous one.
+    Other documents (e.g. an IterableDataset) are read once by this process and sent to the workers in chunks of
+    stream_chunk_size documents, of which at most max_pending_chunks are queued at a time, so the stream is neither
+    read by every worker nor loaded into memory.
+
+    After run, worker_counters holds the counters of the fact matcher of every worker process (ngram window counters,
+    document prefilter counters, profile, sentence cache counters and document fingerprint counters) and
+    worker_utilization holds the processed chunks, text size, busy seconds and utilization (busy seconds / wall time
+    of the run) of every worker.
+    """
+
+    def __init__(self, num_workers: int, chunks_per_worker: int = 16, stream_chunk_size: int = 1000):
+        """
+        Initialize ChunkScheduler.
+
+        :param num_workers: Number of worker processes.
+        :param chunks_per_worker: Number of chunks per worker process.
+        :param stream_chunk_size: Number of documents per chunk of documents that cannot be indexed.
+        """
+        self.num_workers = num_workers
+        self.chunks_per_worker = chunks_per_worker
+        self.stream_chunk_size = stream_chunk_size
+        self.max_pending_chunks = 2 * num_workers
+        self.worker_counters: dict[int, tuple[dict, dict, dict, dict, dict]] = {}
+        self.worker_utilization: dict[int, dict] = {}
+
+    def get_tasks(
+        self, file_contents: Union[Dataset, IterableDataset, pa.Table, list[dict]], text_key: str
+    ) -> Union[list[tuple[range, int, None]], Iterator[tuple[range, int, list[dict]]]]:
+        """
+        Get the tasks of the workers.
+
+        :param file_contents: Documents to process.
+        :param text_key: Key to extract text from file content.
+        :return: List of (document range, text size, None) tuples if the documents can be indexed (the workers read
+        the range from the inherited documents), iterator over (document range, text size, documents) tuples of the
+        streamed chunks otherwise.
+        """
+        text_sizes = get_text_sizes(file_contents, text_key)
+        if text_sizes is None:
+            return self._stream_tasks(file_contents, text_key)
+        return [
+            (chunk, int(text_sizes[chunk.start : chunk.stop].sum()), None)
+            for chunk in split_into_chunks(text_sizes, self.num_workers * self.chunks_per_worker)
+        ]
+
+    def _stream_tasks(
+        self, file_contents: Union[IterableDataset, Iterable[dict]], text_key: str
+    ) -> Iterator[tuple[range, int, list[dict]]]:
+        """
+        Read the documents once and split them into chunks of stream_chunk_size documents.
+
+        :param file_contents: Documents to process.
+        :param text_key: Key to extract text from file content.
+        :return: Iterator over (document range, text size, documents) tuples (only the texts of the documents).
+        """
+        texts = iter_texts(file_contents, text_key, self.stream_chunk_size)
+        for start in count(0, self.stream_chunk_size):
+            chunk_texts = list(islice(texts, self.stream_chunk_size))
+            if not chunk_texts:
+                return
+            yield (
+                range(start, start + len(chunk_texts)),
+                sum(len(text) for text in chunk_texts),
+                [{text_key: text} for text in chunk_texts],
+            )
+
+    def run(
+        self,
+        fact_matcher,
+        file_contents: Union[Dataset, IterableDataset, pa.Table, list[dict]],
+        text_key: str,
+        save_file_content: bool,
+        processed_documents: int = 0,
+    ) -> Iterator[list[tuple]]:
+        """
+        Process the documents with the worker processes.
+
+        The workers are forked from this process, so they share the fact matcher (entity information and mapping
+        dictionaries) instead of rebuilding it. The objects of this process are moved to the permanent generation of
+        the garbage collector (gc.freeze) while the workers run, so the garbage collection of the workers does not
+        write to (and copy) the pages of the inherited objects. If a worker fails (raises or dies), the error is raised
+        here (concurrent.futures.process.BrokenProcessPool if the worker process died).
+        :param fact_matcher: Fact matcher (FactMatcherSimple) to process the documents with.
+        :param file_contents: Documents to process.
+        :param text_key: Key to extract text from file content.
+        :param save_file_content: If True, the sentences will be saved for the matched facts.
+        :param processed_documents: Number of documents processed before file_contents (offset of the document
+        indices).
+        :return: Iterator over the fact statistics of the chunks (see FactMatcherSimple.pop_fact_statistics) in
+        document order.
+        """
+        global _worker_context  # pylint: disable=global-statement
+        tasks = self.get_tasks(file_contents, text_key)
+        _worker_context = (
+            fact_matcher,
+            file_contents,
+            text_key,
+            save_file_content,
+            processed_documents,
+        )
+        self.worker_counters = {}
+        worker_stats: dict[int, dict] = {}
+        start = time.perf_counter()
+        gc.freeze()
+        try:
+            with ProcessPoolExecutor(
+                self.num_workers, mp_context=multiprocessing.get_context("fork"), initializer=_init_worker
+            ) as executor:
+                for pid, fact_statistics, counters, busy_seconds, text_size in tqdm(
+                    _map_bounded(executor, tasks, self.max_pending_chunks),
+                    total=len(tasks) if isinstance(tasks, list) else None,
+                    desc="Processing chunks",
+                ):
+                    self.worker_counters[pid] = counters
+                    stats = worker_stats.setdefault(pid, {"chunks": 0, "text_size": 0, "busy_seconds": 0.0})
+                    stats["chunks"] += 1
+                    stats["text_size"] += text_size
+                    stats["busy_seconds"] += busy_seconds
+                    yield fact_statistics
+        finally:
+            gc.unfreeze()
+            _worker_context = None
+        wall_seconds = time.perf_counter() - start
+        self.worker_utilization = {
+            worker: {**stats, "utilization": stats["busy_seconds"] / wall_seconds if wall_seconds else 0.0}
+            for worker, stats in enumerate(worker_stats.values())
+        }
+        for worker, stats in self.worker_utilization.items():
+            logging.info(
+                "Worker %d: %d chunks, text size %d, %.1f s busy (%.1f%% utilization)",
+                worker,
+                stats["chunks"],
+                stats["text_size"],
+                stats["busy_seconds"],
+                100 * stats["utilization"],
+            )
+
+
+def _map_bounded(executor: Executor, tasks: Iterable[tuple], max_pending: int) -> Iterator[tuple]:
+    """
+    Process the tasks with the executor, with at most max_pending tasks submitted at a time.
+
+    Unlike Executor.map, the tasks are not all submitted (and read) at once.
+    :param executor: Executor to process the tasks with.
+    :param tasks: Tasks to process (see _process_task).
+    :param max_pending: Maximum number of submitted tasks whose results are not yet returned.
+    :return: Iterator over the results of the tasks in task order.
+    """
+    pending: deque[Future] = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(_process_task, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _init_worker() -> None:
+    """
+    Initialize a worker process (reset the fact statistics and counters inherited from the parent process).
+
+    The match event log and the document fingerprints of the worker are closed when the worker process exits, so
+    every worker writes one part file per run instead of one per chunk.
+    :return:
+    """
+    fact_matcher = _worker_context[0]
+    multiprocessing.util.Finalize(
+        fact_matcher, fact_matcher._close_logs, exitpriority=0  # pylint: disable=protected-access
+    )
+    fact_matcher.sentencizer_n_process = 1
+    fact_matcher.pop_fact_statistics()
+    fact_matcher.ngram_window_counters = {"probed": 0, "skipped": 0}
+    if fact_matcher.document_prefilter is not None:
+        fact_matcher.document_prefilter.counters = {"documents": 0, "skipped": 0}
+    if fact_matcher.sentence_cache is not None:
+        fact_matcher.sentence_cache.reset_counters()
+    if fact_matcher.document_fingerprints is not None:
+        fact_matcher.document_fingerprints.reset_counters()
+    fact_matcher.profiler.reset()
+    if fact_matcher.profiler.dump_path is not None:
+        dump_root, dump_extension = os.path.splitext(fact_matcher.profiler.dump_path)
+        fact_matcher.profiler.dump_path = f"{dump_root}.{os.getpid()}{dump_extension}"
+
+
+def _process_task(
+    task: tuple[range, int, Optional[list[dict]]],
+) -> tuple[int, list[tuple], tuple[dict, dict, dict, dict, dict], float, int]:
+    """
+    Process a chunk of the documents in a worker process (see ChunkScheduler.run).
+
+    The fact matcher and the documents that can be indexed are inherited from the parent process (_worker_context).
+    :param task: (document range, text size, documents of a streamed chunk or None) tuple.
+    :return: Process id of the worker, fact statistics of the chunk (see FactMatcherSimple.pop_fact_statistics), the
+    counters of the worker (ngram window counters, document prefilter counters, profile, sentence cache counters and
+    document fingerprint counters, accumulated over all chunks of the worker), busy seconds and text size of the chunk.
+    """
+    start = time.perf_counter()
+    fact_matcher, file_contents, text_key, save_file_content, processed_documents = _worker_context
+    chunk, text_size, chunk_contents = task
+    fact_matcher._process_file_contents(  # pylint: disable=protected-access
+        get_chunk(file_contents, chunk) if chunk_contents is None else chunk_contents,
+        text_key,
+        save_file_content,
+        document_indices=(processed_documents + document_index for document_index in chunk),
+        show_progress=False,
+    )
+    prefilter_counters = {} if fact_matcher.document_prefilter is None else fact_matcher.document_prefilter.counters
+    cache_counters = {} if fact_matcher.sentence_cache is None else fact_matcher.sentence_cache.counters
+    fingerprint_counters = (
+        {} if fact_matcher.document_fingerprints is None else fact_matcher.document_fingerprints.counters
+    )
+    counters = (
+        fact_matcher.ngram_window_counters,
+        prefilter_counters,
+        fact_matcher.profiler.get_profile(),
+        cache_counters,
+        fingerprint_counters,
+    )
+    fact_statistics = fact_matcher.pop_fact_statistics()
+    return os.getpid(), fact_statistics, counters, time.perf_counter() - start, text_size
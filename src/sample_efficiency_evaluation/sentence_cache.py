@@ -0,0 +1,81 @@
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+
+class SentenceMatchCache:
+    """
+    SentenceMatchCache is a bounded LRU cache of the matches of sentences.
+
+    Corpora repeat many sentences verbatim (navigation text, infobox phrases, templated stubs). The matches of a
+    sentence only depend on its text, so the matches of a repeated sentence can be replayed into the counters instead
+    of tokenizing and matching the sentence again. The sentences are keyed by a 128-bit BLAKE2b hash, so the cache
+    does not keep the sentences themselves. The value of a sentence is a tuple of (fact_id, subj_via_alias,
+    obj_via_alias) tuples of its matched facts (empty for the many sentences without matches).
+
+    The counters attribute counts the hits, misses and evictions, so the size of the cache can be chosen by the hit
+    rate (hits / (hits + misses)) and the number of evictions.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize SentenceMatchCache.
+
+        :param max_size: Maximum number of cached sentences. The least recently used sentence is evicted if the cache
+        is full.
+        """
+        if max_size < 1:
+            raise ValueError(f"The sentence cache size has to be positive, got {max_size}.")
+        self.max_size = max_size
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._matches: OrderedDict[bytes, tuple[tuple[int, bool, bool], ...]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    @staticmethod
+    def get_key(sentence: str) -> bytes:
+        """
+        Get the cache key of a sentence.
+
+        :param sentence: Sentence.
+        :return: BLAKE2b hash (16 bytes) of the sentence.
+        """
+        return hashlib.blake2b(sentence.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[tuple[tuple[int, bool, bool], ...]]:
+        """
+        Get the matches of a sentence (counted as a hit or a miss).
+
+        :param key: Cache key of the sentence (see get_key).
+        :return: Tuple of (fact_id, subj_via_alias, obj_via_alias) tuples or None if the sentence is not cached.
+        """
+        matches = self._matches.get(key)
+        if matches is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        self._matches.move_to_end(key)
+        return matches
+
+    def put(self, key: bytes, matches: tuple[tuple[int, bool, bool], ...]) -> None:
+        """
+        Cache the matches of a sentence.
+
+        :param key: Cache key of the sentence (see get_key).
+        :param matches: Tuple of (fact_id, subj_via_alias, obj_via_alias) tuples.
+        :return:
+        """
+        self._matches[key] = matches
+        self._matches.move_to_end(key)
+        if len(self._matches) > self.max_size:
+            self._matches.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def reset_counters(self) -> None:
+        """
+        Reset the hit, miss and eviction counters (the cached sentences are kept).
+
+        :return:
+        """
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,367 @@
+import json
+import logging
+import mmap
+import os
+import zlib
+from array import array
+from typing import Iterable, Optional, Union
+
+from sample_efficiency_evaluation.occurrence_store import OccurrenceStore
+
+FLAT_BUFFER_MAGIC = b"SEEFLAT1"
+
+
+def _get_data_offset(header_size: int) -> int:
+    """
+    Get the offset of the sections of a flat buffer.
+
+    :param header_size: Size of the header in bytes.
+    :return: Offset of the first section (the end of the header, aligned to 8 bytes).
+    """
+    return (16 + header_size + 7) // 8 * 8
+
+
+class FlatBuffer:
+    """
+    FlatBuffer holds named sections of typed arrays (array typecodes) in one flat, read-only buffer.
+
+    The buffer starts with a magic number, the size of the header and the header, a json dictionary of the sections
+    (name -> [offset after the header, size in bytes, typecode]). The sections follow, aligned to 8 bytes. The arrays
+    are stored in the native byte order. The sections are read as memoryviews of the buffer, so a buffer that is a
+    bytes object, a memory map of a file or a shared memory segment is never copied.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap, memoryview]):
+        """
+        Initialize FlatBuffer.
+
+        :param buffer: Serialized flat buffer (see serialize).
+        """
+        self.buffer = buffer
+        self._view = memoryview(buffer)
+        if bytes(self._view[: len(FLAT_BUFFER_MAGIC)]) != FLAT_BUFFER_MAGIC:
+            raise ValueError("The buffer is not a flat buffer.")
+        header_size = int.from_bytes(self._view[8:16], "little")
+        self.sections: dict[str, list] = json.loads(bytes(self._view[16 : 16 + header_size]))
+        self._data_offset = _get_data_offset(header_size)
+
+    def get(self, name: str) -> memoryview:
+        """
+        Get a section.
+
+        :param name: Name of the section.
+        :return: Memoryview of the section, cast to the typecode of the section.
+        """
+        offset, size, typecode = self.sections[name]
+        return self._view[self._data_offset + offset : self._data_offset + offset + size].cast(typecode)
+
+    @staticmethod
+    def serialize(sections: dict[str, array]) -> bytes:
+        """
+        Serialize sections to a flat buffer.
+
+        :param sections: Arrays by section name.
+        :return: Flat buffer
+        """
+        header: dict[str, list] = {}
+        size = 0
+        for name, values in sections.items():
+            header[name] = [size, len(values) * values.itemsize, values.typecode]
+            size += (header[name][1] + 7) // 8 * 8
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_offset = _get_data_offset(len(header_bytes))
+        buffer = bytearray(data_offset + size)
+        buffer[:16] = FLAT_BUFFER_MAGIC + len(header_bytes).to_bytes(8, "little")
+        buffer[16 : 16 + len(header_bytes)] = header_bytes
+        for name, values in sections.items():
+            offset, section_size, _ = header[name]
+            buffer[data_offset + offset : data_offset + offset + section_size] = values.tobytes()
+        return bytes(buffer)
+
+
+class FlatStringMap:
+    """
+    FlatStringMap is a read-only hash map from strings to tuples of integers, stored in a FlatBuffer.
+
+    The keys are UTF-8 encoded and concatenated, the values are concatenated int32 arrays (both with an offsets
+    array). The hash table uses open addressing with linear probing and the CRC-32 of the encoded key, which is the
+    same in every process (unlike the hash of a str), so the table can be saved to a file and shared between
+    processes. The table has at least twice as many slots as keys.
+    """
+
+    def __init__(self, flat_buffer: FlatBuffer, name: str):
+        """
+        Initialize FlatStringMap.
+
+        :param flat_buffer: Flat buffer with the sections of the map (see to_sections).
+        :param name: Name of the map (prefix of its sections).
+        """
+        self._slots = flat_buffer.get(f"{name}.slots")
+        self._slot_hashes = flat_buffer.get(f"{name}.slot_hashes")
+        self._key_offsets = flat_buffer.get(f"{name}.key_offsets")
+        self._keys = flat_buffer.get(f"{name}.keys")
+        self._value_offsets = flat_buffer.get(f"{name}.value_offsets")
+        self._values = flat_buffer.get(f"{name}.values")
+        self._mask = len(self._slots) - 1
+        self._last_key: Optional[str] = None
+        self._last_index = -1
+
+    @staticmethod
+    def to_sections(name: str, mapping: dict[str, Iterable[int]]) -> dict[str, array]:
+        """
+        Create the sections of a map.
+
+        :param name: Name of the map (prefix of its sections).
+        :param mapping: Mapping to store (key -> integers).
+        :return: Arrays by section name.
+        """
+        encoded_keys = [key.encode("utf-8") for key in mapping]
+        num_slots = 1
+        while num_slots < 2 * len(encoded_keys):
+            num_slots *= 2
+        slots = array("i", [-1]) * num_slots
+        slot_hashes = array("I", [0]) * num_slots
+        key_offsets = array("q", [0])
+        value_offsets = array("q", [0])
+        values = array("i")
+        for index, (key_bytes, key_values) in enumerate(zip(encoded_keys, mapping.values())):
+            key_hash = zlib.crc32(key_bytes)
+            slot = key_hash & (num_slots - 1)
+            while slots[slot] >= 0:
+                slot = (slot + 1) & (num_slots - 1)
+            slots[slot] = index
+            slot_hashes[slot] = key_hash
+            key_offsets.append(key_offsets[-1] + len(key_bytes))
+            values.extend(key_values)
+            value_offsets.append(len(values))
+        return {
+            f"{name}.slots": slots,
+            f"{name}.slot_hashes": slot_hashes,
+            f"{name}.key_offsets": key_offsets,
+            f"{name}.keys": array("B", b"".join(encoded_keys)),
+            f"{name}.value_offsets": value_offsets,
+            f"{name}.values": values,
+        }
+
+    def _find(self, key: str) -> int:
+        """
+        Find the index of a key.
+
+        The last key is remembered, so a membership test followed by a lookup of the same key probes the table once.
+        :param key: Key
+        :return: Index of the key or -1 if the key is not in the map.
+        """
+        if key is self._last_key:
+            return self._last_index
+        key_bytes = key.encode("utf-8")
+        key_hash = zlib.crc32(key_bytes)
+        slot = key_hash & self._mask
+        index = self._slots[slot]
+        while index >= 0:
+            if (
+                self._slot_hashes[slot] == key_hash
+                and self._keys[self._key_offsets[index] : self._key_offsets[index + 1]] == key_bytes
+            ):
+                break
+            slot = (slot + 1) & self._mask
+            index = self._slots[slot]
+        self._last_key = key
+        self._last_index = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self._key_offsets) - 1
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def __getitem__(self, key: str) -> tuple[int, ...]:
+        index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+        return tuple(self._values[self._value_offsets[index] : self._value_offsets[index + 1]])
+
+    def get(self, key: str, default=None):
+        """
+        Get the integers of a key.
+
+        :param key: Key
+        :param default: Value to return if the key is not in the map.
+        :return: Tuple of the integers of the key or default.
+        """
+        index = self._find(key)
+        if index < 0:
+            return default
+        return tuple(self._values[self._value_offsets[index] : self._value_offsets[index + 1]])
+
+
+class FlatStringLists:
+    """
+    FlatStringLists is a read-only list of string lists (e.g. one list per fact id), stored in a FlatBuffer.
+    """
+
+    def __init__(self, flat_buffer: FlatBuffer, name: str):
+        """
+        Initialize FlatStringLists.
+
+        :param flat_buffer: Flat buffer with the sections of the lists (see to_sections).
+        :param name: Name of the lists (prefix of its sections).
+        """
+        self._list_offsets = flat_buffer.get(f"{name}.list_offsets")
+        self._string_offsets = flat_buffer.get(f"{name}.string_offsets")
+        self._strings = flat_buffer.get(f"{name}.strings")
+
+    @staticmethod
+    def to_sections(name: str, string_lists: Iterable[Iterable[str]]) -> dict[str, array]:
+        """
+        Create the sections of the lists.
+
+        :param name: Name of the lists (prefix of its sections).
+        :param string_lists: String lists to store.
+        :return: Arrays by section name.
+        """
+        list_offsets = array("q", [0])
+        string_offsets = array("q", [0])
+        encoded_strings = []
+        for strings in string_lists:
+            for string in strings:
+                encoded_strings.append(string.encode("utf-8"))
+                string_offsets.append(string_offsets[-1] + len(encoded_strings[-1]))
+            list_offsets.append(len(encoded_strings))
+        return {
+            f"{name}.list_offsets": list_offsets,
+            f"{name}.string_offsets": string_offsets,
+            f"{name}.strings": array("B", b"".join(encoded_strings)),
+        }
+
+    def __len__(self) -> int:
+        return len(self._list_offsets) - 1
+
+    def __getitem__(self, index: int) -> list[str]:
+        return [
+            str(self._strings[self._string_offsets[string_index] : self._string_offsets[string_index + 1]], "utf-8")
+            for string_index in range(self._list_offsets[index], self._list_offsets[index + 1])
+        ]
+
+    def get(self, index: int, default=None):
+        """
+        Get a string list, or default if it is empty.
+
+        :param index: Index of the list.
+        :param default: Value to return if the list is empty.
+        :return: String list or default.
+        """
+        if self._list_offsets[index] == self._list_offsets[index + 1]:
+            return default
+        return self[index]
+
+
+class SharedMatchIndex:
+    """
+    SharedMatchIndex is a flat, read-only form of the subject and object matching index of FactMatcherSimple.
+
+    The index holds the subject names (keys of the relation mapping dictionary) and the lower case object names
+    (keys of the object mapping dictionary) with the ids of their facts, the ngram start index, the object word
+    counts, the irregular object names, the subject label keys and the object labels per fact id. Everything is
+    stored in one FlatBuffer, so the index holds no Python objects per entry: worker processes forked from the
+    process that created the index share its memory (reference counting does not write to the buffer, so the pages
+    are not copied), and processes that open the same index file (see open) share the page cache instead of building
+    their own copy. The mutable counters (the occurrences of the facts) stay in the OccurrenceStore of each process.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        """
+        Initialize SharedMatchIndex.
+
+        :param buffer: Flat buffer of the index (see build and open).
+        """
+        self.flat_buffer = FlatBuffer(buffer)
+        self.subjects = FlatStringMap(self.flat_buffer, "subjects")
+        self.ngram_starts = FlatStringMap(self.flat_buffer, "ngram_starts")
+        self.objects = FlatStringMap(self.flat_buffer, "objects")
+        self.object_word_counts = FlatStringMap(self.flat_buffer, "object_word_counts")
+        self.irregular_object_names = FlatStringLists(self.flat_buffer, "irregular_object_names")
+        self.subj_label_keys = FlatStringLists(self.flat_buffer, "subj_label_keys")
+        self.obj_labels = FlatStringLists(self.flat_buffer, "obj_labels")
+
+    @classmethod
+    def build(
+        cls,
+        occurrence_store: OccurrenceStore,
+        relation_mapping_dict: dict,
+        ngram_start_index: dict[str, tuple[int, ...]],
+        object_mapping_dict: dict,
+        object_word_counts: dict[str, set[int]],
+        irregular_object_names: dict[tuple, list[str]],
+        subj_label_keys: list[str],
+    ) -> "SharedMatchIndex":
+        """
+        Build the index from the matching index of a fact matcher.
+
+        :param occurrence_store: Occurrence store of the facts (fact ids).
+        :param relation_mapping_dict: Relation mapping dictionary (subject name -> facts).
+        :param ngram_start_index: Ngram start index (first token -> ngram sizes).
+        :param object_mapping_dict: Object mapping dictionary (lower case object name -> facts).
+        :param object_word_counts: Object word counts (first word -> numbers of words).
+        :param irregular_object_names: Irregular object names per fact.
+        :param subj_label_keys: Subject label key per fact id.
+        :return: SharedMatchIndex
+        """
+        fact_ids = occurrence_store.fact_ids
+        sections: dict[str, array] = {}
+        sections.update(
+            FlatStringMap.to_sections(
+                "subjects",
+                {key: sorted(fact_ids[fact] for fact in facts) for key, facts in relation_mapping_dict.items()},
+            )
+        )
+        sections.update(FlatStringMap.to_sections("ngram_starts", ngram_start_index))
+        sections.update(
+            FlatStringMap.to_sections(
+                "objects",
+                {key: sorted(fact_ids[fact] for fact in facts) for key, facts in object_mapping_dict.items()},
+            )
+        )
+        sections.update(
+            FlatStringMap.to_sections(
+                "object_word_counts", {word: sorted(counts) for word, counts in object_word_counts.items()}
+            )
+        )
+        sections.update(
+            FlatStringLists.to_sections(
+                "irregular_object_names",
+                (
+                    irregular_object_names.get(fact, [])
+                    for fact in zip(occurrence_store.relation_ids, occurrence_store.subj_ids)
+                ),
+            )
+        )
+        sections.update(FlatStringLists.to_sections("subj_label_keys", ([key] for key in subj_label_keys)))
+        sections.update(FlatStringLists.to_sections("obj_labels", ([label] for label in occurrence_store.obj_labels)))
+        return cls(FlatBuffer.serialize(sections))
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a file (written next to the path first and then moved).
+
+        :param path: Path of the index file.
+        :return:
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(self.flat_buffer.buffer)
+        os.replace(f"{path}.tmp", path)
+        logging.info("Saved shared match index to %s", path)
+
+    @classmethod
+    def open(cls, path: str) -> "SharedMatchIndex":
+        """
+        Open an index file as a read-only memory map.
+
+        :param path: Path of the index file.
+        :return: SharedMatchIndex
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        logging.info("Opened shared match index %s", path)
+        return cls(buffer)
@@ -1,16 +1,55 @@
+import hashlib
+import heapq
 import json
 import logging
 import os
 import re
-from typing import Optional
+from contextlib import ExitStack
+from itertools import zip_longest
+from typing import Iterable, Iterator, Optional, TextIO
 
 from tqdm import tqdm
+import numpy as np
 import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+RELATION_OCCURRENCE_INFO_SCHEMA = pa.schema(
+    [
+        ("relation_id", pa.string()),
+        ("subj_id", pa.string()),
+        ("subj_label", pa.string()),
+        ("subj_aliases", pa.list_(pa.string())),
+        ("obj_id", pa.string()),
+        ("obj_label", pa.string()),
+        ("obj_aliases", pa.list_(pa.string())),
+        ("occurrences", pa.int64()),
+    ]
+)
+
+ALIAS_OCCURRENCE_KEYS = (
+    "label_occurrences",
+    "subj_alias_occurrences",
+    "obj_alias_occurrences",
+    "subj_obj_alias_occurrences",
+)
+
+RELATION_IDS_METADATA_KEY = b"relation_ids"
+
+RELATION_OCCURRENCE_SENTENCES_SCHEMA = pa.schema(
+    [
+        ("relation_id", pa.string()),
+        ("subj_id", pa.string()),
+        ("sentence", pa.string()),
+        ("count", pa.int64()),
+    ]
+)
 
 
 class SetEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, set):
+        if isinstance(o, (set, frozenset)):
             return list(o)
         return json.JSONEncoder.default(self, o)
 
@@ -49,6 +88,303 @@ def save_dict_as_json(dictionary: dict, json_output_file_path: str):
         json.dump(dictionary, f, indent=4, ensure_ascii=False, cls=SetEncoder)
 
 
+def save_relation_occurrence_info_parquet(
+    relation_info_dict: dict, output_file_path: str, sentences_output_file_path: Optional[str] = None
+) -> None:
+    """
+    Save relation occurrence info dictionary as parquet files.
+
+    The facts are saved with one row per fact (see RELATION_OCCURRENCE_INFO_SCHEMA). The sentences are saved in a
+    separate file with one row per fact and sentence (see RELATION_OCCURRENCE_SENTENCES_SCHEMA), so the facts can be
+    loaded without them. Every relation is saved as a separate row group, so the files can be merged relation by
+    relation. The relation ids (including the relations without facts) are saved in the schema metadata. If the facts
+    have the occurrences by how they were found (see ALIAS_OCCURRENCE_KEYS), these are saved as additional int64
+    columns.
+    :param relation_info_dict: Relation occurrence info dictionary.
+    :param output_file_path: Path to the facts parquet file.
+    :param sentences_output_file_path: Path to the sentences parquet file. If None, the sentences are not saved.
+    """
+    schema = RELATION_OCCURRENCE_INFO_SCHEMA
+    if any(ALIAS_OCCURRENCE_KEYS[0] in fact for entities in relation_info_dict.values() for fact in entities.values()):
+        for key in ALIAS_OCCURRENCE_KEYS:
+            schema = schema.append(pa.field(key, pa.int64()))
+    schema = schema.with_metadata({RELATION_IDS_METADATA_KEY: json.dumps(list(relation_info_dict))})
+    with ExitStack() as stack:
+        writer = stack.enter_context(pq.ParquetWriter(output_file_path, schema))
+        sentences_writer = None
+        if sentences_output_file_path is not None:
+            sentences_writer = stack.enter_context(
+                pq.ParquetWriter(sentences_output_file_path, RELATION_OCCURRENCE_SENTENCES_SCHEMA)
+            )
+        for relation_id, entities in relation_info_dict.items():
+            columns: dict[str, list] = {name: [] for name in schema.names}
+            sentence_columns: dict[str, list] = {name: [] for name in RELATION_OCCURRENCE_SENTENCES_SCHEMA.names}
+            for subj_id, fact in entities.items():
+                columns["relation_id"].append(relation_id)
+                columns["subj_id"].append(subj_id)
+                columns["subj_label"].append(fact["subj_label"])
+                columns["subj_aliases"].append(sorted(fact["subj_aliases"]))
+                columns["obj_id"].append(fact["obj_id"])
+                columns["obj_label"].append(fact["obj_label"])
+                columns["obj_aliases"].append(sorted(fact["obj_aliases"]))
+                columns["occurrences"].append(fact["occurrences"])
+                for key in schema.names[len(RELATION_OCCURRENCE_INFO_SCHEMA) :]:
+                    columns[key].append(fact.get(key, 0))
+                for sentence, count in fact.get("sentences", {}).items():
+                    sentence_columns["relation_id"].append(relation_id)
+                    sentence_columns["subj_id"].append(subj_id)
+                    sentence_columns["sentence"].append(sentence)
+                    sentence_columns["count"].append(count)
+            _write_row_group(writer, pa.table(columns, schema=schema))
+            if sentences_writer is not None:
+                _write_row_group(
+                    sentences_writer, pa.table(sentence_columns, schema=RELATION_OCCURRENCE_SENTENCES_SCHEMA)
+                )
+
+
+def _write_row_group(writer: pq.ParquetWriter, table: pa.Table) -> None:
+    """
+    Write a table as a single row group (nothing is written for an empty table).
+
+    :param writer: Parquet writer.
+    :param table: Table to write.
+    :return:
+    """
+    if len(table) > 0:
+        writer.write_table(table, row_group_size=len(table))
+
+
+def _get_relation_ids(parquet_file: pq.ParquetFile) -> list[str]:
+    """
+    Get the relation ids of a facts parquet file.
+
+    :param parquet_file: Facts parquet file (see save_relation_occurrence_info_parquet).
+    :return: Relation ids from the schema metadata. For files without them, the relation ids of the facts.
+    """
+    metadata = parquet_file.schema_arrow.metadata or {}
+    if RELATION_IDS_METADATA_KEY in metadata:
+        return json.loads(metadata[RELATION_IDS_METADATA_KEY])
+    return list(dict.fromkeys(parquet_file.read(columns=["relation_id"])["relation_id"].to_pylist()))
+
+
+def _get_row_group_relation_ranges(parquet_file: pq.ParquetFile) -> list[Optional[tuple[str, str]]]:
+    """
+    Get the range of the relation ids in every row group of a parquet file from the column statistics.
+
+    :param parquet_file: Facts or sentences parquet file.
+    :return: (min, max) relation id of every row group or None if the row group has no statistics.
+    """
+    column_index = parquet_file.schema_arrow.get_field_index("relation_id")
+    ranges: list[Optional[tuple[str, str]]] = []
+    for row_group in range(parquet_file.num_row_groups):
+        statistics = parquet_file.metadata.row_group(row_group).column(column_index).statistics
+        ranges.append((statistics.min, statistics.max) if statistics is not None and statistics.has_min_max else None)
+    return ranges
+
+
+def _read_relation_rows(
+    parquet_file: pq.ParquetFile,
+    row_group_relation_ranges: list[Optional[tuple[str, str]]],
+    relation_id: str,
+    columns: Optional[list[str]] = None,
+) -> pa.Table:
+    """
+    Read the rows of a relation from the row groups that can contain it.
+
+    :param parquet_file: Facts or sentences parquet file.
+    :param row_group_relation_ranges: Relation id ranges of the row groups (see _get_row_group_relation_ranges).
+    :param relation_id: Id of the relation.
+    :param columns: Columns to read. If None, all columns are read.
+    :return: Rows of the relation, in file order.
+    """
+    row_groups = [
+        row_group
+        for row_group, relation_range in enumerate(row_group_relation_ranges)
+        if relation_range is None or relation_range[0] <= relation_id <= relation_range[1]
+    ]
+    if all(row_group_relation_ranges[row_group] == (relation_id, relation_id) for row_group in row_groups):
+        return parquet_file.read_row_groups(row_groups, columns=columns)
+    # A row group with several relations (e.g. written by pq.write_table) is filtered.
+    table = parquet_file.read_row_groups(row_groups, columns=None if columns is None else ["relation_id", *columns])
+    table = table.filter(pc.equal(table["relation_id"], relation_id))  # pylint: disable=no-member
+    return table if columns is None else table.select(columns)
+
+
+def load_relation_occurrence_info(
+    file_path: str, columns: Optional[list[str]] = None, sentences_file_path: Optional[str] = None
+) -> dict:
+    """
+    Load relation occurrence info dictionary from a json or parquet file.
+
+    :param file_path: Path to the json file or the facts parquet file (see save_relation_occurrence_info_parquet).
+    :param columns: Fact columns to load from a parquet file (relation_id and subj_id are always loaded). If None,
+    all columns are loaded. The columns are read memory-mapped, so only the requested columns are read from disk.
+    :param sentences_file_path: Path to the sentences parquet file. If given, the sentences are added to the facts.
+    :return: Relation occurrence info dictionary (relation_id -> subj_id -> fact).
+    """
+    if not file_path.endswith(".parquet"):
+        return load_json_dict(file_path)
+    if columns is not None:
+        columns = [
+            "relation_id",
+            "subj_id",
+            *[column for column in columns if column not in ("relation_id", "subj_id")],
+        ]
+    parquet_file = pq.ParquetFile(file_path, memory_map=True)
+    relation_info_dict: dict = {relation_id: {} for relation_id in _get_relation_ids(parquet_file)}
+    for fact in parquet_file.read(columns=columns).to_pylist():
+        relation_info_dict.setdefault(fact.pop("relation_id"), {})[fact.pop("subj_id")] = fact
+    if sentences_file_path is not None:
+        for entities in relation_info_dict.values():
+            for fact in entities.values():
+                fact["sentences"] = {}
+        for row in pq.read_table(sentences_file_path, memory_map=True).to_pylist():
+            relation_info_dict[row["relation_id"]][row["subj_id"]]["sentences"][row["sentence"]] = row["count"]
+    return relation_info_dict
+
+
+def _sample_sentences_table(sentences_table: pa.Table, max_sentences: int, sentence_sampling: str) -> pa.Table:
+    """
+    Sample the sentences of every fact in a sentences table (see sample_sentences).
+
+    :param sentences_table: Sentences table (one row per relation_id, subj_id and sentence, in the order the sentences
+    were found).
+    :param max_sentences: Maximum number of sentences per fact.
+    :param sentence_sampling: Sampling method ("reservoir" or "first").
+    :return: Sampled sentences table, sorted by fact.
+    """
+    if sentence_sampling == "first":
+        sort_key = np.arange(len(sentences_table), dtype=np.uint64)
+    else:
+        sort_key = np.fromiter(
+            (get_sentence_priority(sentence) for sentence in sentences_table["sentence"].to_pylist()),
+            dtype=np.uint64,
+            count=len(sentences_table),
+        )
+    sentences_table = sentences_table.append_column("sort_key", pa.array(sort_key, type=pa.uint64()))
+    sentences_table = sentences_table.take(
+        pc.sort_indices(  # pylint: disable=no-member
+            sentences_table,
+            sort_keys=[("relation_id", "ascending"), ("subj_id", "ascending"), ("sort_key", "ascending")],
+        )
+    )
+    relation_ids = sentences_table["relation_id"].to_numpy(zero_copy_only=False)
+    subj_ids = sentences_table["subj_id"].to_numpy(zero_copy_only=False)
+    positions = np.arange(len(sentences_table))
+    group_starts = np.ones(len(sentences_table), dtype=bool)
+    group_starts[1:] = (relation_ids[1:] != relation_ids[:-1]) | (subj_ids[1:] != subj_ids[:-1])
+    ranks = positions - np.maximum.accumulate(np.where(group_starts, positions, 0))
+    sentences_table = sentences_table.filter(pa.array(ranks < max_sentences))
+    return sentences_table.remove_column(sentences_table.schema.get_field_index("sort_key"))
+
+
+def merge_relation_occurrence_info_parquet_files(
+    file_paths: list[str],
+    output_file_path: str,
+    sentences_file_paths: Optional[list[str]] = None,
+    sentences_output_file_path: Optional[str] = None,
+    max_sentences_per_fact: Optional[int] = None,
+    sentence_sampling: str = "reservoir",
+) -> None:
+    """
+    Merge relation occurrence info parquet files (e.g. of the slices of a dataset).
+
+    The files are merged relation by relation (one row group of every file at a time, like
+    merge_relation_occurrence_info_json_files), so only the facts and sentences of one relation are kept in memory.
+    Only the occurrences columns (see ALIAS_OCCURRENCE_KEYS) are read from all but the first file. The files have to
+    contain the same relations and facts in the same order, which is the case for files created from the same BEAR
+    data. The merged file contains the same relations as the files, including the relations without facts.
+    :param file_paths: Paths to the facts parquet files.
+    :param output_file_path: Path to the merged facts parquet file.
+    :param sentences_file_paths: Paths to the sentences parquet files. If given, the sentences are merged (the counts
+    of the same sentence are summed).
+    :param sentences_output_file_path: Path to the merged sentences parquet file.
+    :param max_sentences_per_fact: Maximum number of merged sentences per fact (see sample_sentences). If None, all
+    sentences are kept.
+    :param sentence_sampling: Sampling method of the merged sentences ("reservoir" or "first", see sample_sentences).
+    With "first", the files have to be given in document order.
+    :return:
+    """
+    with ExitStack() as stack:
+        files = [pq.ParquetFile(file_path, memory_map=True) for file_path in file_paths]
+        relation_ids = _get_relation_ids(files[0])
+        if any(_get_relation_ids(parquet_file) != relation_ids for parquet_file in files[1:]):
+            raise ValueError("The relation occurrence info files do not contain the same relations in the same order.")
+        schema = files[0].schema_arrow.with_metadata({RELATION_IDS_METADATA_KEY: json.dumps(relation_ids)})
+        occurrence_columns = ["occurrences", *[key for key in ALIAS_OCCURRENCE_KEYS if key in schema.names]]
+        row_group_ranges = [_get_row_group_relation_ranges(parquet_file) for parquet_file in files]
+        writer = stack.enter_context(pq.ParquetWriter(output_file_path, schema))
+        sentences_writer = None
+        sentences_files: list[pq.ParquetFile] = []
+        sentences_row_group_ranges: list[list[Optional[tuple[str, str]]]] = []
+        if sentences_file_paths is not None and sentences_output_file_path is not None:
+            sentences_files = [pq.ParquetFile(file_path, memory_map=True) for file_path in sentences_file_paths]
+            sentences_row_group_ranges = [
+                _get_row_group_relation_ranges(parquet_file) for parquet_file in sentences_files
+            ]
+            sentences_writer = stack.enter_context(
+                pq.ParquetWriter(sentences_output_file_path, RELATION_OCCURRENCE_SENTENCES_SCHEMA)
+            )
+        for relation_id in tqdm(relation_ids, desc="Merging relation info files"):
+            merged_table = _read_relation_rows(files[0], row_group_ranges[0], relation_id)
+            occurrences = {column: merged_table[column].to_numpy() for column in occurrence_columns}
+            for parquet_file, ranges in zip(files[1:], row_group_ranges[1:]):
+                table = _read_relation_rows(
+                    parquet_file, ranges, relation_id, columns=["relation_id", "subj_id", *occurrence_columns]
+                )
+                if not (
+                    table["relation_id"].equals(merged_table["relation_id"])
+                    and table["subj_id"].equals(merged_table["subj_id"])
+                ):
+                    raise ValueError(
+                        "The relation occurrence info files do not contain the same facts in the same order."
+                    )
+                for column in occurrence_columns:
+                    occurrences[column] = occurrences[column] + table[column].to_numpy()
+            for column in occurrence_columns:
+                merged_table = merged_table.set_column(
+                    merged_table.schema.get_field_index(column), column, pa.array(occurrences[column], type=pa.int64())
+                )
+            _write_row_group(writer, merged_table)
+            if sentences_writer is not None:
+                _write_row_group(
+                    sentences_writer,
+                    _merge_relation_sentences(
+                        [
+                            _read_relation_rows(parquet_file, ranges, relation_id)
+                            for parquet_file, ranges in zip(sentences_files, sentences_row_group_ranges)
+                        ],
+                        max_sentences_per_fact,
+                        sentence_sampling,
+                    ),
+                )
+    logging.info("Merged %d relation info files into %s.", len(file_paths), output_file_path)
+
+
+def _merge_relation_sentences(
+    sentences_tables: list[pa.Table], max_sentences: Optional[int], sentence_sampling: str
+) -> pa.Table:
+    """
+    Merge the sentences tables of a relation (the counts of the same sentence are summed).
+
+    :param sentences_tables: Sentences tables of the relation (see RELATION_OCCURRENCE_SENTENCES_SCHEMA).
+    :param max_sentences: Maximum number of merged sentences per fact. If None, all sentences are kept.
+    :param sentence_sampling: Sampling method ("reservoir" or "first", see _sample_sentences_table).
+    :return: Merged sentences table.
+    """
+    sentences_table = (
+        pa.concat_tables(sentences_tables)
+        .group_by(["relation_id", "subj_id", "sentence"], use_threads=False)
+        .aggregate([("count", "sum")])
+    )
+    sentences_table = sentences_table.rename_columns(
+        ["count" if name == "count_sum" else name for name in sentences_table.column_names]
+    )
+    if max_sentences is not None:
+        sentences_table = _sample_sentences_table(sentences_table, max_sentences, sentence_sampling)
+    return sentences_table.select(RELATION_OCCURRENCE_SENTENCES_SCHEMA.names).cast(RELATION_OCCURRENCE_SENTENCES_SCHEMA)
+
+
 def clean_string(text: str) -> str:
     """
     Clean string.
@@ -73,6 +409,93 @@ def word_in_sentence(word: str, sentence: str) -> bool:
     return bool(pattern.search(sentence))
 
 
+def is_word_character(character: str) -> bool:
+    """
+    Check if character is a word character (same as the regex \\w).
+
+    :param character: character to check
+    :return: True if character is a word character, False otherwise
+    """
+    return character.isalnum() or character == "_"
+
+
+def word_in_lower_sentence(word_lower: str, sentence_lower: str) -> bool:
+    """
+    Check if lower case word is in lower case sentence.
+
+    This is the same check as word_in_sentence, but the case-insensitivity is handled by the caller (both strings
+    have to be lower case already) and no regex is compiled.
+    :param word_lower: lower case word to check
+    :param sentence_lower: lower case sentence to check
+    :return: True if word is in sentence, False otherwise
+    """
+    start = sentence_lower.find(word_lower)
+    while start != -1:
+        end = start + len(word_lower)
+        if (start == 0 or not is_word_character(sentence_lower[start - 1])) and (
+            end == len(sentence_lower) or not is_word_character(sentence_lower[end])
+        ):
+            return True
+        start = sentence_lower.find(word_lower, start + 1)
+    return False
+
+
+def format_sentence_reference(document_index: int, start_char: int, end_char: int) -> str:
+    """
+    Format sentence reference.
+
+    :param document_index: Index of the document in the dataset.
+    :param start_char: Start character offset of the sentence in the document.
+    :param end_char: End character offset of the sentence in the document.
+    :return: Sentence reference ("document_index:start_char:end_char")
+    """
+    return f"{document_index}:{start_char}:{end_char}"
+
+
+def get_sentence_priority(sentence: str) -> int:
+    """
+    Get the sampling priority of a sentence (see sample_sentences).
+
+    The priority is a stable 64-bit hash of the sentence, so it is the same in every process and every run.
+    :param sentence: Sentence or sentence reference.
+    :return: Priority (lower priorities are kept).
+    """
+    return int.from_bytes(hashlib.blake2b(sentence.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def sample_sentences(sentences: dict[str, int], max_sentences: Optional[int], sentence_sampling: str) -> dict[str, int]:
+    """
+    Sample the sentences of a fact.
+
+    With "reservoir" sampling, the sentences with the lowest priority (see get_sentence_priority) are kept, which is a
+    uniform random sample of the distinct sentences. As the priority of a sentence does not depend on the order of the
+    sentences, sampling the merged sentences of several samples gives the same sentences as sampling all sentences at
+    once. With "first" sampling, the first sentences (in dictionary order) are kept.
+    :param sentences: Sentences (sentence -> count).
+    :param max_sentences: Maximum number of sentences. If None, all sentences are kept.
+    :param sentence_sampling: Sampling method ("reservoir" or "first").
+    :return: Sampled sentences (sentence -> count).
+    """
+    if max_sentences is None or len(sentences) <= max_sentences:
+        return sentences
+    if sentence_sampling == "first":
+        kept_sentences = list(sentences)[:max_sentences]
+    else:
+        kept_sentences = heapq.nsmallest(max_sentences, sentences, key=get_sentence_priority)
+    return {sentence: sentences[sentence] for sentence in kept_sentences}
+
+
+def parse_sentence_reference(sentence_reference: str) -> tuple[int, int, int]:
+    """
+    Parse sentence reference (see format_sentence_reference).
+
+    :param sentence_reference: Sentence reference
+    :return: (document_index, start_char, end_char) tuple
+    """
+    document_index, start_char, end_char = sentence_reference.split(":")
+    return int(document_index), int(start_char), int(end_char)
+
+
 def create_fact_occurrence_histogram(
     path_to_rel_info_file: str,
     output_diagram_name: str = "occurrence_statistics",
@@ -89,7 +512,7 @@ def create_fact_occurrence_histogram(
     out = output_path
     if output_path is None:
         out = os.path.dirname(path_to_rel_info_file)
-    relation_info_dict: dict = load_json_dict(path_to_rel_info_file)
+    relation_info_dict: dict = load_relation_occurrence_info(path_to_rel_info_file, columns=["occurrences"])
     occurrence_buckets = [
         (1, 2),
         (2, 4),
@@ -136,15 +559,21 @@ def create_fact_occurrence_histogram(
 def count_increasing_occurrences_in_slices(path_to_files: str) -> dict:
     """
     Count increasing occurrences in relation occurrences info files
-    :param path_to_files: Path to relation info occurrences files.
+    :param path_to_files: Path to relation info occurrences files (json or parquet facts files).
     :return: Dictionary containing increasing occurrences in for each slice
     """
-    files: list = os.listdir(path_to_files)
+    files: list = [
+        file
+        for file in os.listdir(path_to_files)
+        if file.endswith(".json") or file.endswith("_relation_occurrence_info.parquet")
+    ]
     files.sort()
     increasing_occurrences_in_slices = {}
     for file in tqdm(files, desc="Counting increasing occurrences in slices"):
-        if file.endswith(".json"):
-            for relation_id, entities in load_json_dict(f"{path_to_files}/{file}").items():
+        if file.endswith(".json") or file.endswith(".parquet"):
+            for relation_id, entities in load_relation_occurrence_info(
+                f"{path_to_files}/{file}", columns=["occurrences"]
+            ).items():
                 for entity_id, fact in entities.items():
                     if relation_id not in increasing_occurrences_in_slices:
                         increasing_occurrences_in_slices[relation_id] = {}
@@ -160,23 +589,333 @@ def count_increasing_occurrences_in_slices(path_to_files: str) -> dict:
     return increasing_occurrences_in_slices
 
 
+def _load_relation_occurrence_info_table(file_path: str, columns: list[str]) -> pa.Table:
+    """
+    Load columns of a relation occurrence info json or parquet file as a table with one row per fact.
+
+    :param file_path: Path to the json file or the facts parquet file (see save_relation_occurrence_info_parquet).
+    :param columns: Columns to load (relation_id, subj_id or fact keys).
+    :return: Table of the columns.
+    """
+    if file_path.endswith(".parquet"):
+        return pq.read_table(file_path, columns=columns, memory_map=True)
+    table_columns: dict[str, list] = {column: [] for column in columns}
+    for relation_id, entities in load_json_dict(file_path).items():
+        for subj_id, fact in entities.items():
+            row = {**fact, "relation_id": relation_id, "subj_id": subj_id}
+            for column in columns:
+                table_columns[column].append(row.get(column))
+    return pa.table(table_columns)
+
+
+def measure_alias_importance(path_to_rel_info_file: str) -> dict:
+    """
+    Measure how much the subject and object aliases add to the fact occurrences.
+
+    The measures are computed from the occurrences by how the facts were found (see ALIAS_OCCURRENCE_KEYS, created by
+    matching with alias_attribution), so a single matching run is needed instead of a run with and one without
+    aliases. The label occurrences of a fact are the occurrences of a run without aliases.
+    :param path_to_rel_info_file: Path to the relation occurrence info file (json or facts parquet file).
+    :return: Dictionary of the measures:
+        - subjects_with_aliases / objects_with_aliases: Fraction of the (distinct) subjects and objects with aliases.
+        - facts_with_matches: Number of facts with occurrences.
+        - facts_with_alias_matches: Number of facts with more occurrences than label occurrences.
+        - facts_with_label_matches_only: Number of facts with occurrences that are all label occurrences.
+        - facts_without_matches / facts_without_label_matches: Number of facts without occurrences and without label
+          occurrences.
+        - alias_matches_by_alias_type: Fraction of the facts with alias matches whose additional occurrences are due
+          to subject and object aliases ("subj_and_obj"), only subject aliases ("subj") or only object aliases ("obj").
+        - alias_importance: Fraction of the facts with occurrences that have alias matches.
+        - average_alias_increase: Average number of additional occurrences of the facts with alias matches.
+        - occurrences: Sum of the occurrences for each key of ALIAS_OCCURRENCE_KEYS.
+    """
+    table = _load_relation_occurrence_info_table(
+        path_to_rel_info_file,
+        ["subj_id", "subj_aliases", "obj_id", "obj_aliases", "occurrences", *ALIAS_OCCURRENCE_KEYS],
+    )
+    if any(table[key].null_count > 0 for key in ALIAS_OCCURRENCE_KEYS):
+        raise ValueError(f"{path_to_rel_info_file} does not contain the occurrences by how the facts were found.")
+    occurrences = table["occurrences"].to_numpy()
+    alias_occurrences = np.stack([table[key].to_numpy() for key in ALIAS_OCCURRENCE_KEYS], axis=1)
+    label_occurrences = alias_occurrences[:, 0]
+    alias_increase = occurrences - label_occurrences
+    with_alias_matches = alias_increase > 0
+    subj_alias_matches = with_alias_matches & ((alias_occurrences[:, 1] + alias_occurrences[:, 3]) > 0)
+    obj_alias_matches = with_alias_matches & ((alias_occurrences[:, 2] + alias_occurrences[:, 3]) > 0)
+    facts_with_matches = int(np.count_nonzero(occurrences))
+    facts_with_alias_matches = int(np.count_nonzero(with_alias_matches))
+
+    def fraction(numerator: int, denominator: int) -> float:
+        return numerator / denominator if denominator else 0.0
+
+    def entities_with_aliases(ids_column: str, aliases_column: str) -> float:
+        ids = table[ids_column].to_numpy(zero_copy_only=False)
+        alias_counts = pc.list_value_length(table[aliases_column])  # pylint: disable=no-member
+        has_aliases = pc.fill_null(alias_counts, 0).to_numpy() > 0
+        with_aliases = len(np.unique(ids[has_aliases]))
+        return fraction(with_aliases, with_aliases + len(np.unique(ids[~has_aliases])))
+
+    return {
+        "subjects_with_aliases": entities_with_aliases("subj_id", "subj_aliases"),
+        "objects_with_aliases": entities_with_aliases("obj_id", "obj_aliases"),
+        "facts_with_matches": facts_with_matches,
+        "facts_with_alias_matches": facts_with_alias_matches,
+        "facts_with_label_matches_only": facts_with_matches - facts_with_alias_matches,
+        "facts_without_matches": int(np.count_nonzero(occurrences == 0)),
+        "facts_without_label_matches": int(np.count_nonzero(label_occurrences == 0)),
+        "alias_matches_by_alias_type": {
+            "subj_and_obj": fraction(
+                int(np.count_nonzero(subj_alias_matches & obj_alias_matches)), facts_with_alias_matches
+            ),
+            "subj": fraction(int(np.count_nonzero(subj_alias_matches & ~obj_alias_matches)), facts_with_alias_matches),
+            "obj": fraction(int(np.count_nonzero(obj_alias_matches & ~subj_alias_matches)), facts_with_alias_matches),
+        },
+        "alias_importance": fraction(facts_with_alias_matches, facts_with_matches),
+        "average_alias_increase": float(alias_increase[with_alias_matches].mean()) if facts_with_alias_matches else 0.0,
+        "occurrences": dict(zip(ALIAS_OCCURRENCE_KEYS, alias_occurrences.sum(axis=0).tolist())),
+    }
+
+
 def join_relation_occurrences_info_json_files(path_to_files: str) -> None:
     """
     Join relation occurrences info files
     :param path_to_files: Path to relation info files.
-    This is useful when final-joined JSON is too large to store in memory.
+    The files are merged with bounded memory (see merge_relation_occurrence_info_json_files), the sentences are removed.
     :return:
     """
-    files: list = os.listdir(path_to_files)
-    files.sort()
-    first_file = load_json_dict(f"{path_to_files}/{files[0]}")
-    for file in tqdm(files[1:], desc="Joining relation info files"):
-        if file.endswith(".json"):
-            for relation_id, entities in load_json_dict(f"{path_to_files}/{file}").items():
-                for entity_id, fact in entities.items():
-                    first_file[relation_id][entity_id]["occurrences"] += fact["occurrences"]
-    for _, entities in first_file.items():
+    output_file_name = "joined_relation_occurrence_info.json"
+    files = sorted(file for file in os.listdir(path_to_files) if file.endswith(".json") and file != output_file_name)
+    merge_relation_occurrence_info_json_files(
+        [os.path.join(path_to_files, file) for file in files], os.path.join(path_to_files, output_file_name)
+    )
+
+
+_JSON_STRUCTURE_PATTERN = re.compile(r'["\\{}\[\]]')
+
+
+class _JsonStreamReader:
+    """
+    Reader for the JSON values of a file that is read in chunks.
+
+    Only strings and objects are decoded (their end is unambiguous), so a value is only decoded once the buffer
+    contains all of it. The end of a value is found by scanning the structural characters (quotes, escapes and
+    brackets) of each chunk once, so a value that spans many chunks is decoded once instead of once per chunk.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\n\r":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                raise ValueError(f"Unexpected end of file: {self.file.name}")
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(f"Expected one of {characters!r} but found {character!r} in {self.file.name}")
+        self.position += 1
+        return character
+
+    def value(self):
+        if self.peek() not in '"{':
+            raise ValueError(f"Expected a string or an object but found {self.peek()!r} in {self.file.name}")
+        scan, depth, in_string = self.position, 0, False
+        while True:
+            match = _JSON_STRUCTURE_PATTERN.search(self.buffer, scan)
+            if match is None:
+                # An escape at the end of the buffer skips the first character of the next chunk.
+                scanned = max(scan, len(self.buffer)) - self.position
+                if not self._fill():
+                    raise ValueError(f"Unexpected end of file: {self.file.name}")
+                scan = self.position + scanned
+                continue
+            scan = match.end()
+            character = match.group()
+            if character == "\\":
+                scan += 1
+            elif character == '"':
+                in_string = not in_string
+            elif not in_string:
+                depth += 1 if character in "{[" else -1
+            if not in_string and depth == 0:
+                value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                return value
+
+
+def iter_relation_occurrence_info_json_file(
+    file: TextIO, chunk_size: int = 2**20
+) -> Iterator[tuple[str, Optional[str], Optional[dict]]]:
+    """
+    Iterate over a relation occurrence info json file without loading it completely.
+
+    The file is read in chunks of chunk_size characters, only one fact is decoded at a time.
+    :param file: Opened relation occurrence info json file.
+    :param chunk_size: Number of characters to read at once.
+    :return: Iterator over (relation_id, None, None) tuples at the start of each relation and
+    (relation_id, subj_id, fact) tuples for the facts of the relation, in file order.
+    """
+    reader = _JsonStreamReader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        relation_id = reader.value()
+        reader.expect(":")
+        reader.expect("{")
+        yield relation_id, None, None
+        if reader.peek() == "}":
+            reader.expect("}")
+        else:
+            while True:
+                subj_id = reader.value()
+                reader.expect(":")
+                yield relation_id, subj_id, reader.value()
+                if reader.expect(",}") == "}":
+                    break
+        if reader.expect(",}") == "}":
+            return
+
+
+def _merge_facts(
+    facts: list[dict],
+    merge_sentences: bool,
+    max_sentences_per_fact: Optional[int] = None,
+    sentence_sampling: str = "reservoir",
+) -> dict:
+    """
+    Merge the same fact from several relation occurrence info files (the occurrences are summed).
+
+    :param facts: Facts to merge.
+    :param merge_sentences: If True, the sentences are merged (counts are summed), otherwise they are removed.
+    :param max_sentences_per_fact: Maximum number of merged sentences (see sample_sentences).
+    :param sentence_sampling: Sampling method of the merged sentences (see sample_sentences).
+    :return: Merged fact
+    """
+    merged_fact = dict(facts[0])
+    merged_fact["occurrences"] = sum(fact["occurrences"] for fact in facts)
+    for key in ALIAS_OCCURRENCE_KEYS:
+        if key in merged_fact:
+            merged_fact[key] = sum(fact.get(key, 0) for fact in facts)
+    if not merge_sentences:
+        merged_fact.pop("sentences", None)
+        return merged_fact
+    sentences: dict[str, int] = {}
+    for fact in facts:
+        for sentence, count in fact.get("sentences", {}).items():
+            sentences[sentence] = sentences.get(sentence, 0) + count
+    merged_fact["sentences"] = sample_sentences(sentences, max_sentences_per_fact, sentence_sampling)
+    return merged_fact
+
+
+def merge_relation_occurrence_info_json_files(
+    file_paths: list[str],
+    output_file_path: str,
+    merge_sentences: bool = False,
+    chunk_size: int = 2**20,
+    max_sentences_per_fact: Optional[int] = None,
+    sentence_sampling: str = "reservoir",
+) -> None:
+    """
+    Merge relation occurrence info json files (e.g. of the slices of a dataset) with bounded memory.
+
+    All files are read incrementally at the same time (see iter_relation_occurrence_info_json_file) and the merged
+    facts are written to the output file one by one, in the same format as save_dict_as_json. The files have to
+    contain the same facts in the same order, which is the case for files created from the same BEAR data.
+    :param file_paths: Paths to the relation occurrence info json files.
+    :param output_file_path: Path to the merged json file.
+    :param merge_sentences: If True, the sentences of the facts are merged (the counts of the same sentence are
+    summed), otherwise they are removed.
+    :param chunk_size: Number of characters to read at once from each file.
+    :param max_sentences_per_fact: Maximum number of merged sentences per fact (see sample_sentences). If None, all
+    sentences are kept.
+    :param sentence_sampling: Sampling method of the merged sentences ("reservoir" or "first", see sample_sentences).
+    With "first", the files have to be given in document order.
+    :return:
+    """
+    with ExitStack() as stack:
+        streams = [
+            iter_relation_occurrence_info_json_file(stack.enter_context(open(path, "r", encoding="utf-8")), chunk_size)
+            for path in file_paths
+        ]
+        output = stack.enter_context(open(output_file_path, "w", encoding="utf-8"))
+        output.write("{")
+        relation_separator = ""
+        fact_separator: Optional[str] = None
+        for entries in tqdm(zip_longest(*streams), desc="Merging relation info files"):
+            if any(entry is None for entry in entries) or len({entry[:2] for entry in entries}) != 1:
+                raise ValueError("The relation occurrence info files do not contain the same facts in the same order.")
+            relation_id, subj_id, _ = entries[0]
+            if subj_id is None:
+                if fact_separator is not None:
+                    output.write("\n    }" if fact_separator else "}")
+                output.write(f"{relation_separator}\n    {json.dumps(relation_id, ensure_ascii=False)}: {{")
+                relation_separator = ","
+                fact_separator = ""
+                continue
+            fact_json = json.dumps(
+                _merge_facts(
+                    [entry[2] for entry in entries], merge_sentences, max_sentences_per_fact, sentence_sampling
+                ),
+                indent=4,
+                ensure_ascii=False,
+            ).replace("\n", "\n        ")
+            output.write(f"{fact_separator}\n        {json.dumps(subj_id, ensure_ascii=False)}: {fact_json}")
+            fact_separator = ","
+        if fact_separator is not None:
+            output.write("\n    }" if fact_separator else "}")
+        output.write("\n}" if relation_separator else "}")
+    logging.info("Merged %d relation info files into %s.", len(file_paths), output_file_path)
+
+
+def expand_sentence_references(relation_info_dict: dict, file_contents: Iterable[dict], text_key: str = "text") -> dict:
+    """
+    Expand sentence references to sentences.
+
+    The sentence references (see format_sentence_reference) of a relation info dictionary created with
+    sentence_references=True are replaced by the sentences they refer to. file_contents have to be the same documents
+    in the same order as the ones the fact statistics were created from. The documents are iterated once, so
+    streamed datasets are supported as well.
+    :param relation_info_dict: Relation info dictionary with sentence references.
+    :param file_contents: Documents the fact statistics were created from.
+    :param text_key: Key to extract text from file content.
+    :return: Relation info dictionary with sentences (the input dictionary is modified in place).
+    """
+    references_by_document: dict[int, list[tuple[int, int, dict, int]]] = {}
+    for _, entities in relation_info_dict.items():
         for _, fact in entities.items():
-            fact.pop("sentences")
-    save_dict_as_json(first_file, f"{path_to_files}/joined_relation_occurrence_info.json")
-    logging.info("Joined relation info files.")
+            references = fact["sentences"]
+            fact["sentences"] = {}
+            for sentence_reference, count in references.items():
+                document_index, start_char, end_char = parse_sentence_reference(sentence_reference)
+                references_by_document.setdefault(document_index, []).append(
+                    (start_char, end_char, fact["sentences"], count)
+                )
+    for document_index, file_content in enumerate(file_contents):
+        if not references_by_document:
+            break
+        if document_index not in references_by_document:
+            continue
+        text = clean_string(file_content[text_key])
+        for start_char, end_char, sentences, count in references_by_document.pop(document_index):
+            sentence = text[start_char:end_char]
+            sentences[sentence] = sentences.get(sentence, 0) + count
+    if references_by_document:
+        logging.warning("%d referenced documents not found in file contents.", len(references_by_document))
+    return relation_info_dict
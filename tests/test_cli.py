@@ -0,0 +1,223 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datasets import Dataset
+
+from sample_efficiency_evaluation import FactMatcherSimple
+from sample_efficiency_evaluation.cli import get_slice_range, main
+from utility import utility
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.test_resources_abs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "test_resources"))
+        self.data = [
+            {"text": "Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan blah."},
+            {"text": "Nepal blah blah blah Khadga Prasad Sharma Oli. Armenia blah blah blah Nikol Pashinyan."},
+            {"text": "Blah blah blah."},
+            {"text": "Nikol Pashinyan blah blah blah Republic of Armenia. Abudhabi blah Khalifa bin Zayed Al Nahyan."},
+            {"text": "Free State of Fiume blah blah blah Gabriele D'Annunzio."},
+        ]
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_get_slice_range_good(self):
+        self.assertEqual(
+            [get_slice_range(10, 3, slice_num) for slice_num in range(3)], [range(0, 3), range(3, 6), range(6, 10)]
+        )
+
+    def test_match_good(self):
+        fact_matcher = FactMatcherSimple(bear_data_path=self.test_resources_abs_path)
+        fact_matcher.create_fact_statistics(self.data, text_key="text")
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            patch("datasets.load_dataset", return_value=Dataset.from_list(self.data)),
+        ):
+            exit_code = main(
+                [
+                    "match",
+                    "--dataset_path",
+                    "dataset",
+                    "--bear_data_path",
+                    self.test_resources_abs_path,
+                    "--rel_info_output_dir",
+                    tmp_dir,
+                    "--total_slices",
+                    "2",
+                    "--num_workers",
+                    "2",
+                    "--shared_index",
+                    "True",
+                    "--sentence_cache_size",
+                    "100",
+                    "--document_deduplication",
+                    "skip",
+                    "--document_fingerprint_dir",
+                    os.path.join(tmp_dir, "fingerprints"),
+                ]
+            )
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(
+                utility.load_json_dict(os.path.join(tmp_dir, "0_relation_occurrence_info.json"))["P6"]["Q1519"][
+                    "sentences"
+                ],
+                {"Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan blah.": 1},
+            )
+            joined_relation_info_dict = utility.load_json_dict(
+                os.path.join(tmp_dir, "joined_relation_occurrence_info.json")
+            )
+            self.assertEqual(
+                {
+                    subj_id: fact["occurrences"]
+                    for subj_id, fact in joined_relation_info_dict["P6"].items()
+                    if fact["occurrences"]
+                },
+                {"Q1519": 2, "Q837": 1, "Q399": 2, "Q548114": 1},
+            )
+            self.assertEqual(
+                {
+                    relation_id: {subj_id: fact["occurrences"] for subj_id, fact in facts.items()}
+                    for relation_id, facts in joined_relation_info_dict.items()
+                },
+                {
+                    relation_id: {subj_id: fact["occurrences"] for subj_id, fact in facts.items()}
+                    for relation_id, facts in fact_matcher.entity_relation_occurrence_info_dict.items()
+                },
+            )
+
+    def test_match_local_file_good(self):
+        fact_matcher = FactMatcherSimple(bear_data_path=self.test_resources_abs_path)
+        fact_matcher.create_fact_statistics(self.data, text_key="text")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dataset_path = os.path.join(tmp_dir, "documents.parquet")
+            pq.write_table(
+                pa.Table.from_pylist([{"id": i, **document} for i, document in enumerate(self.data)]), dataset_path
+            )
+            exit_code = main(
+                [
+                    "match",
+                    "--dataset_path",
+                    dataset_path,
+                    "--bear_data_path",
+                    self.test_resources_abs_path,
+                    "--rel_info_output_dir",
+                    tmp_dir,
+                    "--total_slices",
+                    "2",
+                ]
+            )
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(
+                utility.load_json_dict(os.path.join(tmp_dir, "joined_relation_occurrence_info.json"))["P6"]["Q399"][
+                    "occurrences"
+                ],
+                fact_matcher.entity_relation_occurrence_info_dict["P6"]["Q399"]["occurrences"],
+            )
+
+    def test_aggregate_good(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            patch("datasets.load_dataset", return_value=Dataset.from_list(self.data)),
+        ):
+            log_dir = os.path.join(tmp_dir, "match_event_logs")
+            match_args = ["--bear_data_path", self.test_resources_abs_path, "--rel_info_output_dir", tmp_dir]
+            match_args += ["--total_slices", "2", "--match_event_log_dir", log_dir, "--alias_attribution", "True"]
+            self.assertEqual(main(["match", "--dataset_path", "dataset", *match_args]), 0)
+            output_file = os.path.join(tmp_dir, "aggregated.json")
+            aggregate_args = ["--output_file", output_file, "--bear_data_path", self.test_resources_abs_path]
+
+            self.assertEqual(sorted(os.listdir(log_dir)), ["slice_0", "slice_1"])
+            self.assertEqual(main(["aggregate", log_dir, *aggregate_args]), 0)
+            self.assertEqual(
+                {
+                    relation_id: {subj_id: fact["occurrences"] for subj_id, fact in facts.items()}
+                    for relation_id, facts in utility.load_json_dict(output_file).items()
+                },
+                {
+                    relation_id: {subj_id: fact["occurrences"] for subj_id, fact in facts.items()}
+                    for relation_id, facts in utility.load_json_dict(
+                        os.path.join(tmp_dir, "joined_relation_occurrence_info.json")
+                    ).items()
+                },
+            )
+            self.assertEqual(main(["aggregate", log_dir, *aggregate_args, "--subject_aliases", "False"]), 0)
+            self.assertEqual(utility.load_json_dict(output_file)["P6"]["Q1519"]["occurrences"], 1)
+            self.assertEqual(main(["aggregate", log_dir, *aggregate_args, "--alias_attribution", "True"]), 0)
+            joined = utility.load_json_dict(os.path.join(tmp_dir, "joined_relation_occurrence_info.json"))
+            self.assertEqual(
+                utility.load_json_dict(output_file),
+                {
+                    relation_id: {subj_id: {**fact, "sentences": {}} for subj_id, fact in facts.items()}
+                    for relation_id, facts in joined.items()
+                },
+            )
+            self.assertEqual(joined["P6"]["Q1519"]["label_occurrences"], 1)
+            self.assertEqual(joined["P6"]["Q1519"]["subj_alias_occurrences"], 1)
+
+    def test_match_worker_failure(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            patch("datasets.load_dataset", return_value=Dataset.from_list(self.data)),
+            patch.object(FactMatcherSimple, "_process_file_contents", side_effect=RuntimeError("worker failed")),
+        ):
+            exit_code = main(
+                [
+                    "match",
+                    "--dataset_path",
+                    "dataset",
+                    "--bear_data_path",
+                    self.test_resources_abs_path,
+                    "--rel_info_output_dir",
+                    tmp_dir,
+                    "--num_workers",
+                    "2",
+                ]
+            )
+
+            self.assertEqual(exit_code, 1)
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "0_relation_occurrence_info.json")))
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "joined_relation_occurrence_info.json")))
+
+    def test_merge_good(self):
+        relation_info_dict = {
+            "P_00": {
+                "Q30": {
+                    "subj_label": "United States of America",
+                    "subj_aliases": ["USA"],
+                    "obj_id": "Q61",
+                    "obj_label": "Washington, D.C.",
+                    "obj_aliases": [],
+                    "occurrences": 2,
+                    "sentences": {},
+                }
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_files = [
+                os.path.join(tmp_dir, f"{slice_num}_relation_occurrence_info.json") for slice_num in range(2)
+            ]
+            for input_file in input_files:
+                utility.save_dict_as_json(relation_info_dict, input_file)
+            output_file = os.path.join(tmp_dir, "joined_relation_occurrence_info.json")
+
+            self.assertEqual(main(["merge", *input_files, "--output_file", output_file]), 0)
+            self.assertEqual(utility.load_json_dict(output_file)["P_00"]["Q30"]["occurrences"], 4)
+            self.assertEqual(main(["merge", os.path.join(tmp_dir, "missing.json"), "--output_file", output_file]), 1)
+
+    def test_histogram_good(self):
+        with patch.object(utility, "create_fact_occurrence_histogram") as create_fact_occurrence_histogram:
+            self.assertEqual(main(["histogram", "joined_relation_occurrence_info.json", "--output_path", "out"]), 0)
+
+        create_fact_occurrence_histogram.assert_called_once_with(
+            "joined_relation_occurrence_info.json", output_diagram_name="occurrence_statistics", output_path="out"
+        )
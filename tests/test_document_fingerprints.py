@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from sample_efficiency_evaluation.document_fingerprints import DocumentFingerprintSet
+
+
+class DocumentFingerprintSetTest(unittest.TestCase):
+
+    def test_document_fingerprint_set_good(self):
+        fingerprints = [
+            DocumentFingerprintSet.get_fingerprint(content) for content in ["Blah blah.", "Blah  blah.", "🇳🇵 \udc80."]
+        ]
+        matches = [(3, 0, 0, 10, False, True), (1, 2, 20, 35, True, False), (2, 2, 20, 35, False, False)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fingerprint_set = DocumentFingerprintSet(tmp_dir)
+
+            self.assertEqual(len(set(fingerprints)), 3)
+            self.assertFalse(fingerprint_set.check(fingerprints[0]))
+            self.assertTrue(fingerprint_set.check(fingerprints[0]))
+            self.assertIsNone(fingerprint_set.get(fingerprints[0]))
+            fingerprint_set.add(fingerprints[0], matches)
+            fingerprint_set.add(fingerprints[1], [])
+            self.assertEqual(fingerprint_set.get(fingerprints[0]), matches)
+            self.assertEqual(os.listdir(tmp_dir), [])
+            fingerprint_set.close()
+            self.assertEqual(fingerprint_set.counters, {"documents": 2, "duplicates": 1})
+
+            loaded_fingerprint_set = DocumentFingerprintSet(tmp_dir)
+            self.assertEqual(len(loaded_fingerprint_set), 2)
+            self.assertTrue(loaded_fingerprint_set.check(fingerprints[1]))
+            self.assertFalse(loaded_fingerprint_set.check(fingerprints[2]))
+            self.assertEqual(loaded_fingerprint_set.get(fingerprints[0]), matches)
+            self.assertEqual(loaded_fingerprint_set.get(fingerprints[1]), [])
+            loaded_fingerprint_set.add(fingerprints[2], matches[1:])
+            loaded_fingerprint_set.flush()
+
+            fingerprint_set.load()
+            self.assertEqual(len(fingerprint_set), 3)
+            self.assertEqual(fingerprint_set.get(fingerprints[2]), matches[1:])
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+
+    def test_document_fingerprint_set_incomplete_part(self):
+        fingerprints = [DocumentFingerprintSet.get_fingerprint(content) for content in ["Blah.", "Blah blah."]]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fingerprint_set = DocumentFingerprintSet(tmp_dir)
+            fingerprint_set.add(fingerprints[0], [(3, 0, 0, 5, False, False)])
+            fingerprint_set.add(fingerprints[1], [(4, 0, 0, 10, False, False)])
+            fingerprint_set.close()
+            part_path = os.path.join(tmp_dir, os.listdir(tmp_dir)[0])
+            with open(part_path, "rb+") as f:
+                f.truncate(os.path.getsize(part_path) - 1)
+
+            with self.assertLogs(level="WARNING"):
+                loaded_fingerprint_set = DocumentFingerprintSet(tmp_dir)
+            self.assertEqual(len(loaded_fingerprint_set), 1)
+            self.assertEqual(loaded_fingerprint_set.get(fingerprints[0]), [(3, 0, 0, 5, False, False)])
+            self.assertIsNone(loaded_fingerprint_set.get(fingerprints[1]))
+
+    def test_document_fingerprint_set_flush_in_memory(self):
+        fingerprints = [DocumentFingerprintSet.get_fingerprint(str(i)) for i in range(20)]
+        fingerprint_set = DocumentFingerprintSet()
+        for i, fingerprint in enumerate(fingerprints):
+            fingerprint_set.add(fingerprint, [(i, 0, 0, i, bool(i % 2), False)] * (i % 3))
+            if i % 7 == 0:
+                fingerprint_set.flush()
+        fingerprint_set.close()
+
+        self.assertEqual(len(fingerprint_set), 20)
+        for i, fingerprint in enumerate(fingerprints):
+            self.assertTrue(fingerprint_set.check(fingerprint))
+            self.assertEqual(fingerprint_set.get(fingerprint), [(i, 0, 0, i, bool(i % 2), False)] * (i % 3))
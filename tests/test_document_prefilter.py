@@ -0,0 +1,63 @@
+import unittest
+
+from sample_efficiency_evaluation.document_prefilter import AnchorIndex, DocumentPrefilter
+
+
+class AnchorIndexTest(unittest.TestCase):
+
+    def test_add_good(self):
+        anchor_index = AnchorIndex()
+        anchor_index.add("washington, d.c.", {("P_00", "Q30")})
+        anchor_index.add("george washington", {("P_01", "Q23")})
+        anchor_index.add("🇦🇲", {("P6", "Q399")})
+
+        self.assertEqual(anchor_index.facts, {"washington": {("P_00", "Q30"), ("P_01", "Q23")}})
+        self.assertEqual(anchor_index.unanchored_facts, {("P6", "Q399")})
+
+    def test_get_facts_good(self):
+        anchor_index = AnchorIndex()
+        anchor_index.add("usa", {("P_00", "Q178903")})
+        anchor_index.add("washington, d.c.", {("P_00", "Q30")})
+        anchor_index.add("rome", {("P_01", "Q38")})
+
+        self.assertEqual(anchor_index.find_anchors("ausa"), ("usa",))
+        self.assertEqual(anchor_index.get_facts({"the", "usa"}), {("P_00", "Q178903")})
+        self.assertEqual(anchor_index.get_facts({"washington", "rome"}), {("P_00", "Q30"), ("P_01", "Q38")})
+        self.assertEqual(anchor_index.get_facts({"washingto", "d", "c"}), set())
+        self.assertEqual(anchor_index.get_facts(set()), set())
+
+
+class DocumentPrefilterTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.relation_mapping_dict = {
+            "united states of america": (("P_00", "Q30"),),
+            "usa": (("P_00", "Q30"),),
+            "alexander hamilton": (("P_00", "Q178903"),),
+            "hamilton": (("P_00", "Q178903"),),
+            "IT": (("P_01", "Q38"),),
+        }
+        self.object_mapping_dict = {
+            "washington, d.c.": (("P_00", "Q30"),),
+            "united states of america": (("P_00", "Q178903"),),
+            "rome": (("P_01", "Q38"),),
+        }
+        self.irregular_object_names = {("P_00", "Q178903"): ["USA"]}
+
+    def test_get_candidate_facts_good(self):
+        document_prefilter = DocumentPrefilter(
+            self.relation_mapping_dict, self.object_mapping_dict, self.irregular_object_names, 4
+        )
+
+        self.assertEqual(
+            document_prefilter.get_candidate_facts("United States of America blah. Blah Washington, D.C. blah."),
+            {("P_00", "Q30")},
+        )
+        self.assertEqual(
+            document_prefilter.get_candidate_facts("Hamilton blah blah blah the USA."), {("P_00", "Q178903")}
+        )
+        self.assertEqual(document_prefilter.get_candidate_facts("IT blah Rome."), {("P_01", "Q38")})
+        self.assertEqual(document_prefilter.get_candidate_facts("It blah Rome."), set())
+        self.assertEqual(document_prefilter.get_candidate_facts("Washington, D.C. blah blah blah."), set())
+        self.assertIsNone(document_prefilter.get_candidate_facts("İstanbul blah blah blah."))
+        self.assertEqual(document_prefilter.counters, {"documents": 6, "skipped": 2})
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datasets import Dataset
+
+from sample_efficiency_evaluation.documents import (
+    get_chunk,
+    get_text_sizes,
+    iter_texts,
+    load_documents,
+    skip_documents,
+    split_into_chunks,
+)
+
+
+class DocumentsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.documents = [{"text": "Abū Dhabi"}, {"text": ""}, {"text": "Nepal blah."}, {"text": "A" * 40}]
+
+    def test_get_text_sizes_good(self):
+        self.assertEqual(get_text_sizes(self.documents, "text").tolist(), [9, 0, 11, 40])
+        self.assertEqual(get_text_sizes(Dataset.from_list(self.documents), "text").tolist(), [10, 0, 11, 40])
+        self.assertEqual(get_text_sizes(Dataset.from_list(self.documents).select([3, 0]), "text").tolist(), [40, 10])
+        self.assertIsNone(get_text_sizes(Dataset.from_list(self.documents).to_iterable_dataset(), "text"))
+        self.assertIsNone(get_text_sizes(iter(self.documents), "text"))
+        self.assertEqual(get_text_sizes(pa.Table.from_pylist(self.documents), "text").tolist(), [10, 0, 11, 40])
+
+    def test_split_into_chunks_good(self):
+        self.assertEqual(split_into_chunks(np.array([9, 9, 9, 9]), 2), [range(0, 2), range(2, 4)])
+        self.assertEqual(split_into_chunks(np.array([9, 9, 9, 9]), 8), [range(i, i + 1) for i in range(4)])
+        self.assertEqual(split_into_chunks(np.array([1000, 1, 1, 1, 1]), 4), [range(0, 1), range(1, 5)])
+        self.assertEqual(split_into_chunks(np.array([1, 1, 1, 1, 1000]), 4), [range(0, 4), range(4, 5)])
+        self.assertEqual(split_into_chunks(np.array([0, 0, 0]), 3), [range(0, 1), range(1, 2), range(2, 3)])
+        self.assertEqual(split_into_chunks(np.array([], dtype=np.int64), 3), [])
+
+    def test_get_chunk_good(self):
+        self.assertEqual(get_chunk(self.documents, range(1, 3)), self.documents[1:3])
+        self.assertEqual(get_chunk(Dataset.from_list(self.documents), range(1, 3)).to_list(), self.documents[1:3])
+        self.assertEqual(get_chunk(pa.Table.from_pylist(self.documents), range(1, 3)).to_pylist(), self.documents[1:3])
+
+    def test_iter_texts_good(self):
+        documents = [{**document, "id": i} for i, document in enumerate(self.documents)] + [{"text": None, "id": 4}]
+        texts = ["Abū Dhabi", "", "Nepal blah.", "A" * 40, ""]
+        dataset = Dataset.from_list(documents)
+
+        self.assertEqual(list(iter_texts(documents, "text")), texts)
+        self.assertEqual(list(iter_texts(dataset, "text", batch_size=2)), texts)
+        self.assertEqual(list(iter_texts(dataset.select([3, 0]), "text", batch_size=1)), [texts[3], texts[0]])
+        self.assertEqual(list(iter_texts(dataset.to_iterable_dataset(), "text", batch_size=2)), texts)
+        self.assertEqual(list(iter_texts(pa.Table.from_pylist(documents), "text", batch_size=2)), texts)
+        self.assertEqual(list(iter_texts(skip_documents(pa.Table.from_pylist(documents), 3), "text")), texts[3:])
+
+    def test_load_documents_good(self):
+        documents = [{**document, "id": i} for i, document in enumerate(self.documents)]
+        table = pa.Table.from_pylist(documents)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pq.write_table(table, os.path.join(tmp_dir, "documents.parquet"))
+            with open(os.path.join(tmp_dir, "documents.jsonl"), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(document) + "\n" for document in documents)
+            with pa.OSFile(os.path.join(tmp_dir, "documents.arrow"), "wb") as sink:
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+            with pa.OSFile(os.path.join(tmp_dir, "documents_file.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            for file_name in ["documents.parquet", "documents.jsonl", "documents.arrow", "documents_file.arrow"]:
+                loaded = load_documents(os.path.join(tmp_dir, file_name), "text")
+                self.assertEqual(loaded.column_names, ["text"])
+                self.assertEqual(loaded.to_pylist(), self.documents)
+            with self.assertRaises(ValueError):
+                load_documents(os.path.join(tmp_dir, "documents.csv"), "text")
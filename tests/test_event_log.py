@@ -0,0 +1,78 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from sample_efficiency_evaluation.event_log import MatchEventLog, count_match_events, read_match_events
+
+
+class MatchEventLogTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.events = [
+            (0, 0, "P6", "Q1519", False, False),
+            (0, 2, "P6", "Q399", True, False),
+            (1, 0, "P6", "Q399", False, True),
+            (4, 1, "P2", "Q837", True, True),
+        ]
+
+    def test_match_event_log_good(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            match_event_log = MatchEventLog(tmp_dir, batch_size=3)
+            for event in self.events:
+                match_event_log.add(*event)
+
+            self.assertEqual(len(os.listdir(tmp_dir)), 1)
+
+            match_event_log.close()
+            match_event_log.add(*self.events[1])
+            match_event_log.close()
+            events = read_match_events(tmp_dir)
+
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+            self.assertEqual(sorted(zip(*[events[name].to_pylist() for name in events.column_names])), self.events)
+            self.assertEqual(count_match_events([tmp_dir]), {("P6", "Q1519"): 1, ("P6", "Q399"): 2, ("P2", "Q837"): 1})
+            self.assertEqual(
+                count_match_events([tmp_dir], subject_aliases=False), {("P6", "Q1519"): 1, ("P6", "Q399"): 1}
+            )
+            self.assertEqual(
+                count_match_events([tmp_dir], object_aliases=False), {("P6", "Q1519"): 1, ("P6", "Q399"): 1}
+            )
+            self.assertEqual(count_match_events([tmp_dir, tmp_dir])[("P6", "Q399")], 4)
+
+    def test_match_event_log_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(2):
+                match_event_log = MatchEventLog(tmp_dir)
+                for event in self.events:
+                    match_event_log.add(*event)
+                match_event_log.close()
+            resumed_match_event_log = MatchEventLog(tmp_dir, run_id=match_event_log.run_id)
+            resumed_match_event_log.add(*self.events[1])
+            resumed_match_event_log.close()
+            events = read_match_events(tmp_dir)
+
+        self.assertEqual(
+            sorted(zip(*[events[name].to_pylist() for name in events.column_names])),
+            sorted(self.events + self.events),
+        )
+
+    def test_match_event_log_incomplete_part(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            match_event_log = MatchEventLog(tmp_dir, batch_size=2)
+            for event in self.events:
+                match_event_log.add(*event)
+            match_event_log.close()
+            part_path = os.path.join(tmp_dir, os.listdir(tmp_dir)[0])
+            with open(part_path, "rb") as f:
+                content = f.read()
+            with open(part_path, "wb") as f:
+                f.write(content[: len(content) - 100])
+
+            logging.disable(logging.CRITICAL)
+            try:
+                events = read_match_events(tmp_dir)
+            finally:
+                logging.disable(logging.NOTSET)
+
+        self.assertEqual(sorted(zip(*[events[name].to_pylist() for name in events.column_names])), self.events[:2])
@@ -1,9 +1,18 @@
+import copy
 import logging
 import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
+import pyarrow as pa
+from datasets import Dataset
+
 from sample_efficiency_evaluation import FactMatcherSimple
+from sample_efficiency_evaluation.entity_information import EntityFact
+from sample_efficiency_evaluation.event_log import read_match_events
+from sample_efficiency_evaluation.shared_index import SharedMatchIndex
+from utility import utility
 
 
 class FactMatcherSimpleTest(unittest.TestCase):
@@ -140,27 +149,27 @@ class FactMatcherSimpleTest(unittest.TestCase):
             },
         }
         self.test_relation_mapping_dict = {
-            "italy": {"relations": {("P_01", "Q38")}},
-            "IT": {"relations": {("P_01", "Q38")}},
-            "ITA": {"relations": {("P_01", "Q38")}},
-            "italia": {"relations": {("P_01", "Q38")}},
-            "italian republic": {"relations": {("P_01", "Q38")}},
-            "a. ham": {"relations": {("P_00", "Q178903")}},
-            "alexander hamilton": {"relations": {("P_00", "Q178903")}},
-            "alexander hamilton , us treasury secretary": {"relations": {("P_00", "Q178903")}},
-            "america": {"relations": {("P_00", "Q30")}},
-            "bernhardt": {"relations": {("P_01", "Q2127993")}},
-            "hamilton": {"relations": {("P_00", "Q178903")}},
-            "publius": {"relations": {("P_00", "Q178903")}},
-            "rainer bernhardt": {"relations": {("P_01", "Q2127993")}},
-            "rainer herbert georg bernhardt": {"relations": {("P_01", "Q2127993")}},
-            "RB": {"relations": {("P_00", "Q178903"), ("P_01", "Q2127993")}},
-            "the united states of america": {"relations": {("P_00", "Q30")}},
-            "u.s .": {"relations": {("P_00", "Q30")}},
-            "u.s.a .": {"relations": {("P_00", "Q30")}},
-            "united states of america": {"relations": {("P_00", "Q30")}},
-            "US": {"relations": {("P_00", "Q30")}},
-            "USA": {"relations": {("P_00", "Q30")}},
+            "italy": (("P_01", "Q38"),),
+            "IT": (("P_01", "Q38"),),
+            "ITA": (("P_01", "Q38"),),
+            "italia": (("P_01", "Q38"),),
+            "italian republic": (("P_01", "Q38"),),
+            "a. ham": (("P_00", "Q178903"),),
+            "alexander hamilton": (("P_00", "Q178903"),),
+            "alexander hamilton , us treasury secretary": (("P_00", "Q178903"),),
+            "america": (("P_00", "Q30"),),
+            "bernhardt": (("P_01", "Q2127993"),),
+            "hamilton": (("P_00", "Q178903"),),
+            "publius": (("P_00", "Q178903"),),
+            "rainer bernhardt": (("P_01", "Q2127993"),),
+            "rainer herbert georg bernhardt": (("P_01", "Q2127993"),),
+            "RB": (("P_00", "Q178903"), ("P_01", "Q2127993")),
+            "the united states of america": (("P_00", "Q30"),),
+            "u.s .": (("P_00", "Q30"),),
+            "u.s.a .": (("P_00", "Q30"),),
+            "united states of america": (("P_00", "Q30"),),
+            "US": (("P_00", "Q30"),),
+            "USA": (("P_00", "Q30"),),
         }
         self.test_entity_relation_occurrence_info_dict_small = {
             "P_00": {
@@ -176,13 +185,37 @@ class FactMatcherSimpleTest(unittest.TestCase):
             }
         }
         self.test_relation_mapping_dict_small = {
-            "limpopo river": {"relations": {("P_00", "Q173017")}},
-            "limpopo": {"relations": {("P_00", "Q173017")}},
+            "limpopo river": (("P_00", "Q173017"),),
+            "limpopo": (("P_00", "Q173017"),),
         }
 
+        self.test_documents = [
+            {"text": "United States of America blah blah blah Washington, D.C. blah."},
+            {"text": "Alexander Hamilton blah blah blah the United States of America."},
+            {"text": "Publius blah blah blah the USA based in Washington, D.C. blah."},
+            {"text": "United States of America blah blah blah Washington, D.C. blah.\nHamilton blah blah blah USA."},
+            {
+                "text": "Rainer Herbert Georg Bernhardt blah blah blah the USA blah. The Italian (IT) blah blah blah team."
+            },
+        ]
+        self.test_alias_documents = [
+            {"text": "United States of America blah blah blah Washington, D.C. blah."},
+            {"text": "Alexander Hamilton blah blah blah the USA."},
+            {"text": "Publius blah blah blah the United States of America."},
+            {"text": "Publius blah blah blah the USA. The USA blah blah Washington, D.C. blah."},
+        ]
+
         self.maxDiff = None
         self.test_resources_abs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "test_resources"))
 
+    def create_fact_matcher(self, **kwargs) -> FactMatcherSimple:
+        with patch.object(
+            FactMatcherSimple,
+            "extract_entity_information",
+            return_value=copy.deepcopy(self.test_entity_relation_occurrence_info_dict_obj_aliases_extended),
+        ):
+            return FactMatcherSimple(bear_data_path=f"{self.test_resources_abs_path}", **kwargs)
+
     def test_extract_entity_information_good(self):
         with (patch.object(logging, "error") as mock_error,):
             fact_matcher = FactMatcherSimple(
@@ -270,6 +303,107 @@ class FactMatcherSimpleTest(unittest.TestCase):
             )
             mock_error.assert_not_called()
 
+    def test_extract_entity_information_good_compact_facts(self):
+        entity_information = FactMatcherSimple.extract_entity_information(
+            bear_facts_path=f"{self.test_resources_abs_path}/BEAR",
+            bear_relation_info_path=f"{self.test_resources_abs_path}/relation_info_obj_aliases.json",
+        )
+        hamilton = entity_information["P_00"]["Q178903"]
+        bernhardt = entity_information["P_01"]["Q2127993"]
+
+        self.assertIsInstance(hamilton, EntityFact)
+        self.assertFalse(hasattr(hamilton, "__dict__"))
+        self.assertEqual(hamilton["subj_label"], "Alexander Hamilton")
+        self.assertEqual(
+            set(hamilton["obj_aliases"]), {"the United States of America", "America", "U.S.A.", "USA", "U.S.", "US"}
+        )
+        self.assertNotIn("occurrences", hamilton)
+        self.assertEqual(hamilton.get("occurrences", 0), 0)
+        with self.assertRaises(KeyError):
+            _ = hamilton["sentences"]
+        self.assertIs(hamilton.obj_aliases, bernhardt.obj_aliases)
+        self.assertIs(hamilton.obj_aliases, entity_information["P_00"]["Q30"].subj_aliases)
+
+        fact_matcher = FactMatcherSimple(
+            bear_facts_path=f"{self.test_resources_abs_path}/BEAR",
+            bear_relation_info_path=f"{self.test_resources_abs_path}/relation_info_obj_aliases.json",
+        )
+        store = fact_matcher.occurrence_store
+        hamilton_id = store.fact_ids[("P_00", "Q178903")]
+        self.assertIs(store.obj_aliases[hamilton_id], store.obj_aliases[store.fact_ids[("P_01", "Q2127993")]])
+        for facts in fact_matcher.relation_mapping_dict.values():
+            for fact in facts:
+                self.assertIs(fact, next(key for key in store.fact_ids if key == fact))
+
+    def test_index_cache_good(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fact_matcher = FactMatcherSimple(
+                bear_data_path=f"{self.test_resources_abs_path}",
+                path_to_all_entities=f"{self.test_resources_abs_path}/all_entities.json",
+                index_cache_dir=tmp_dir,
+            )
+            self.assertEqual(len(os.listdir(tmp_dir)), 1)
+            with patch.object(FactMatcherSimple, "extract_entity_information") as extract_entity_information:
+                cached_fact_matcher = FactMatcherSimple(
+                    bear_data_path=f"{self.test_resources_abs_path}",
+                    path_to_all_entities=f"{self.test_resources_abs_path}/all_entities.json",
+                    index_cache_dir=tmp_dir,
+                )
+                extract_entity_information.assert_not_called()
+            FactMatcherSimple(
+                bear_data_path=f"{self.test_resources_abs_path}",
+                path_to_all_entities=f"{self.test_resources_abs_path}/all_entities.json",
+                index_cache_dir=tmp_dir,
+                max_allowed_ngram_length=2,
+            )
+
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+            self.assertEqual(
+                cached_fact_matcher.entity_relation_occurrence_info_dict,
+                fact_matcher.entity_relation_occurrence_info_dict,
+            )
+            self.assertEqual(cached_fact_matcher.relation_mapping_dict, fact_matcher.relation_mapping_dict)
+            self.assertEqual(cached_fact_matcher.max_ngram, fact_matcher.max_ngram)
+            self.assertEqual(cached_fact_matcher.object_mapping_dict, fact_matcher.object_mapping_dict)
+
+    def test_get_tokens_from_sentence_good(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict_small,
+            ),
+        ):
+            fact_matcher = FactMatcherSimple(bear_data_path=f"{self.test_resources_abs_path}")
+
+        tokens, tokens_lower = fact_matcher.get_tokens_from_sentence("The U.S.A.  and Mr. Smith (US) can't.", False)
+        self.assertEqual(tokens_lower, fact_matcher.get_tokens_from_sentence("The U.S.A.  and Mr. Smith (US) can't."))
+        self.assertEqual(len(tokens), len(tokens_lower))
+        self.assertEqual([token.lower() for token in tokens], tokens_lower)
+        self.assertIn("US", tokens)
+
+        tokens, tokens_lower = fact_matcher.get_tokens_from_sentence("İstanbul blah Italy.", only_lower=False)
+        self.assertEqual(tokens, ["İstanbul", "blah", "Italy", "."])
+        self.assertEqual(tokens_lower, ["i̇stanbul", "blah", "italy", "."])
+
+    def test_get_tokens_from_sentence_case_sensitive_good(self):
+        fact_matcher = self.create_fact_matcher()
+        sentence = "IT'LL blah Dr. Italian. The U.S. blah Washington, D.C."
+
+        tokens, tokens_lower = fact_matcher.get_tokens_from_sentence(sentence, False)
+        self.assertEqual(tokens[:3], ["IT", "'LL", "blah"])
+        tokens, tokens_lower = fact_matcher.get_tokens_from_sentence(sentence, False, fact_matcher.ngram_start_index)
+        self.assertEqual(tokens[:5], ["", "", "blah", "", ""])
+        self.assertEqual(tokens_lower[:5], ["it", "'ll", "blah", "dr", "."])
+        self.assertIn("Italian", tokens)
+
+        # "IT" is only searched case-sensitive, "U.S." is searched as its lower case tokens.
+        fact_matcher.create_fact_statistics(
+            [{"text": sentence}, {"text": "IT blah Italian. The U.S. blah Washington, D.C."}], text_key="text"
+        )
+        self.assertEqual(fact_matcher.entity_relation_occurrence_info_dict["P_01"]["Q38"]["occurrences"], 1)
+        self.assertEqual(fact_matcher.entity_relation_occurrence_info_dict["P_00"]["Q30"]["occurrences"], 2)
+
     def test_create_mapped_relations_good(self):
         with (
             patch.object(
@@ -285,6 +419,90 @@ class FactMatcherSimpleTest(unittest.TestCase):
             self.assertEqual(fact_matcher.relation_mapping_dict, self.test_relation_mapping_dict)
             self.assertEqual(fact_matcher.max_ngram, 6)
 
+    def test_create_ngram_start_index_good(self):
+        test_entity_relation_occurrence_info_dict = copy.deepcopy(
+            self.test_entity_relation_occurrence_info_dict_obj_aliases_extended
+        )
+        test_entity_relation_occurrence_info_dict["P_01"]["Q38"]["subj_aliases"].add("Italian  Republic")
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=test_entity_relation_occurrence_info_dict,
+            ),
+        ):
+            fact_matcher = FactMatcherSimple(bear_data_path=f"{self.test_resources_abs_path}")
+
+        self.assertEqual(fact_matcher.ngram_start_index["united"], (4,))
+        self.assertEqual(fact_matcher.ngram_start_index["alexander"], (2, 6))
+        self.assertEqual(fact_matcher.ngram_start_index["italian"], (2, 3))
+        self.assertEqual(fact_matcher.ngram_start_index["US"], (1,))
+        self.assertNotIn("us", fact_matcher.ngram_start_index)
+        self.assertEqual(len(fact_matcher.get_tokens_from_sentence("Italian  Republic")), 3)
+
+        sentence = "Italian  Republic and the United States of America (US) blah."
+        tokens, tokens_lower = fact_matcher.get_tokens_from_sentence(sentence, only_lower=False)
+        self.assertEqual(
+            sorted(fact_matcher._get_subject_ngrams(tokens, tokens_lower)),
+            ["US", "america", "italian   republic", "the united states of america", "united states of america"],
+        )
+        num_windows = sum(len(tokens) - ngram_size + 1 for ngram_size in range(1, fact_matcher.max_ngram + 1))
+        self.assertEqual(fact_matcher.ngram_window_counters["probed"], 6)
+        self.assertEqual(
+            fact_matcher.ngram_window_counters["probed"] + fact_matcher.ngram_window_counters["skipped"], num_windows
+        )
+
+    def test_create_mapped_objects_good(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict_obj_aliases_extended,
+            ),
+        ):
+
+            fact_matcher = FactMatcherSimple(
+                bear_data_path=f"{self.test_resources_abs_path}",
+            )
+            us_facts = (("P_00", "Q178903"), ("P_01", "Q2127993"))
+            self.assertEqual(
+                fact_matcher.object_mapping_dict,
+                {
+                    "united states of america": us_facts,
+                    "the united states of america": us_facts,
+                    "america": us_facts,
+                    "usa": us_facts,
+                    "us": us_facts,
+                    "italian": (("P_01", "Q38"),),
+                },
+            )
+            self.assertEqual(
+                fact_matcher.object_word_counts,
+                {"united": {4}, "the": {5}, "america": {1}, "usa": {1}, "us": {1}, "italian": {1}},
+            )
+            self.assertEqual(fact_matcher.irregular_object_names[("P_00", "Q30")], ["Washington, D.C."])
+            self.assertEqual(sorted(fact_matcher.irregular_object_names[("P_00", "Q178903")]), ["U.S.", "U.S.A."])
+
+    def test_get_object_matches_good(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict_obj_aliases_extended,
+            ),
+        ):
+
+            fact_matcher = FactMatcherSimple(
+                bear_data_path=f"{self.test_resources_abs_path}",
+            )
+            us_facts = {("P_00", "Q178903"), ("P_01", "Q2127993")}
+            self.assertEqual(fact_matcher.object_matcher.get_object_matches("the usa's capital."), us_facts)
+            self.assertEqual(fact_matcher.object_matcher.get_object_matches("the united states of americas."), set())
+            self.assertEqual(fact_matcher.object_matcher.get_object_matches("the italians and the us_army."), set())
+            self.assertEqual(
+                fact_matcher.object_matcher.get_object_matches("italian-us relations"), us_facts | {("P_01", "Q38")}
+            )
+
     def test_create_fact_statistics_good(self):
         with (
             patch.object(
@@ -550,3 +768,466 @@ class FactMatcherSimpleTest(unittest.TestCase):
                     },
                 },
             )
+
+    def test_entity_relation_occurrence_info_dict_good(self):
+        fact_matcher = self.create_fact_matcher()
+        relation_info_dict = fact_matcher.entity_relation_occurrence_info_dict
+        relation_info_dict["P_00"]["Q30"]["occurrences"] = 2
+        relation_info_dict["P_00"]["Q30"]["sentences"]["Blah."] = 2
+
+        fact_matcher.entity_relation_occurrence_info_dict = relation_info_dict
+
+        self.assertEqual(fact_matcher.entity_relation_occurrence_info_dict, relation_info_dict)
+        with self.assertRaises(ValueError):
+            fact_matcher.entity_relation_occurrence_info_dict = {"P_02": {"Q30": relation_info_dict["P_00"]["Q30"]}}
+
+        snapshot = fact_matcher.get_relation_info_snapshot()
+        self.assertEqual(snapshot, relation_info_dict)
+        self.assertIs(fact_matcher.get_relation_info_snapshot(), snapshot)
+        for write in [
+            lambda: snapshot.update({"P_02": {}}),
+            lambda: snapshot["P_00"].pop("Q30"),
+            lambda: snapshot["P_00"]["Q30"].__setitem__("occurrences", 1),
+            lambda: snapshot["P_00"]["Q30"]["sentences"].setdefault("Blah.", 1),
+        ]:
+            with self.assertRaises(TypeError):
+                write()
+
+        fact_matcher.create_fact_statistics(self.test_documents[:1], text_key="text")
+        self.assertIsNot(fact_matcher.get_relation_info_snapshot(), snapshot)
+        self.assertEqual(fact_matcher.get_relation_info_snapshot()["P_00"]["Q30"]["occurrences"], 3)
+        snapshot_copy = copy.deepcopy(fact_matcher.get_relation_info_snapshot())
+        snapshot_copy["P_00"]["Q30"]["occurrences"] = 4
+        self.assertEqual(snapshot_copy["P_00"]["Q30"]["occurrences"], 4)
+
+    def test_split_contents_good(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict_small,
+            ),
+        ):
+            fact_matcher = FactMatcherSimple(bear_data_path=f"{self.test_resources_abs_path}", sentencizer_batch_size=2)
+            contents = ["First sentence. Second sentence.", "Third sentence!", "Fourth sentence? Fifth sentence."]
+
+            split_docs = list(fact_matcher.split_contents(iter(contents)))
+
+            self.assertEqual(fact_matcher.sentencizer_batch_size, 2)
+            self.assertEqual(fact_matcher.sentencizer_n_process, 1)
+            self.assertEqual(
+                [[sent.text for sent in split_doc.sents] for split_doc in split_docs],
+                [["First sentence.", "Second sentence."], ["Third sentence!"], ["Fourth sentence?", "Fifth sentence."]],
+            )
+
+    def test_create_fact_statistics_num_workers_good(self):
+        data = self.test_documents
+        fact_matcher = self.create_fact_matcher()
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+        fact_matcher_parallel = self.create_fact_matcher()
+        fact_matcher_parallel.create_fact_statistics(
+            Dataset.from_list(data), text_key="text", save_file_content=True, num_workers=3
+        )
+        fact_matcher_table = self.create_fact_matcher()
+        fact_matcher_table.create_fact_statistics(
+            pa.Table.from_pylist(data), text_key="text", save_file_content=True, num_workers=2
+        )
+
+        self.assertEqual(
+            fact_matcher_parallel.entity_relation_occurrence_info_dict,
+            fact_matcher.entity_relation_occurrence_info_dict,
+        )
+        self.assertEqual(
+            fact_matcher_table.entity_relation_occurrence_info_dict,
+            fact_matcher.entity_relation_occurrence_info_dict,
+        )
+        self.assertEqual(fact_matcher.entity_relation_occurrence_info_dict["P_00"]["Q30"]["occurrences"], 3)
+        self.assertEqual(
+            fact_matcher.entity_relation_occurrence_info_dict["P_00"]["Q30"]["sentences"],
+            {
+                "United States of America blah blah blah Washington, D.C. blah.": 2,
+                "Publius blah blah blah the USA based in Washington, D.C. blah.": 1,
+            },
+        )
+
+    def test_create_fact_statistics_resume_from_checkpoint_good(self):
+        data = self.test_documents
+        fact_matcher = self.create_fact_matcher()
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+
+        for file_contents in [data, Dataset.from_list(data), Dataset.from_list(data).to_iterable_dataset()]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+                log_dir = os.path.join(tmp_dir, "match_event_log")
+                interrupted_fact_matcher = self.create_fact_matcher(match_event_log_dir=log_dir)
+                interrupted_fact_matcher.create_fact_statistics(
+                    data[:3],
+                    text_key="text",
+                    save_file_content=True,
+                    checkpoint_path=checkpoint_path,
+                    checkpoint_interval_documents=2,
+                )
+                self.assertEqual(utility.load_json_dict(checkpoint_path)["processed_documents"], 3)
+                # The second resumed run processes the documents after the checkpoint again in the same run.
+                for _ in range(2):
+                    resumed_fact_matcher = self.create_fact_matcher(match_event_log_dir=log_dir)
+                    resumed_fact_matcher.create_fact_statistics(
+                        file_contents, text_key="text", save_file_content=True, resume_from=checkpoint_path
+                    )
+
+                self.assertEqual(
+                    resumed_fact_matcher.entity_relation_occurrence_info_dict,
+                    fact_matcher.entity_relation_occurrence_info_dict,
+                )
+                self.assertEqual(
+                    {
+                        subj_id: fact["occurrences"]
+                        for subj_id, fact in resumed_fact_matcher.load_match_event_log([log_dir])["P_00"].items()
+                    },
+                    {
+                        subj_id: fact["occurrences"]
+                        for subj_id, fact in fact_matcher.entity_relation_occurrence_info_dict["P_00"].items()
+                    },
+                )
+
+    def test_create_fact_statistics_sentence_references_good(self):
+        data = self.test_documents
+        fact_matcher = self.create_fact_matcher()
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+
+        for num_workers in [1, 2]:
+            reference_fact_matcher = self.create_fact_matcher(sentence_references=True)
+            reference_fact_matcher.create_fact_statistics(
+                data, text_key="text", save_file_content=True, num_workers=num_workers
+            )
+            relation_info_dict = reference_fact_matcher.entity_relation_occurrence_info_dict
+
+            self.assertEqual(relation_info_dict["P_00"]["Q30"]["sentences"], {"0:0:62": 1, "2:0:62": 1, "3:0:62": 1})
+            self.assertEqual(
+                relation_info_dict["P_00"]["Q178903"]["sentences"], {"1:0:63": 1, "2:0:62": 1, "3:63:91": 1}
+            )
+            self.assertEqual(len(reference_fact_matcher.occurrence_store.reference_documents), 7)
+            self.assertEqual(
+                utility.expand_sentence_references(relation_info_dict, Dataset.from_list(data)),
+                fact_matcher.entity_relation_occurrence_info_dict,
+            )
+
+    def test_create_fact_statistics_document_offset_good(self):
+        data = self.test_documents
+        for num_workers in [1, 2]:
+            reference_fact_matcher = self.create_fact_matcher(sentence_references=True)
+            reference_fact_matcher.create_fact_statistics(
+                data[2:], text_key="text", save_file_content=True, num_workers=num_workers, document_offset=2
+            )
+            relation_info_dict = reference_fact_matcher.entity_relation_occurrence_info_dict
+
+            self.assertEqual(relation_info_dict["P_00"]["Q30"]["sentences"], {"2:0:62": 1, "3:0:62": 1})
+            self.assertEqual(relation_info_dict["P_00"]["Q178903"]["sentences"], {"2:0:62": 1, "3:63:91": 1})
+            self.assertEqual(
+                utility.expand_sentence_references(relation_info_dict, Dataset.from_list(data))["P_00"]["Q30"],
+                relation_info_dict["P_00"]["Q30"] | {"sentences": {data[2]["text"][:62]: 1, data[3]["text"][:62]: 1}},
+            )
+
+    def test_create_fact_statistics_document_prefilter_good(self):
+        data = self.test_documents + [
+            {"text": "Nothing to see here. Blah blah blah."},
+            {"text": "Washington, D.C. blah blah blah."},
+            {"text": "Blah blah blah."},
+        ]
+        for sentence_references in [False, True]:
+            fact_matcher = self.create_fact_matcher(sentence_references=sentence_references)
+            fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+            self.assertIsNone(fact_matcher.document_prefilter)
+
+            for num_workers in [1, 2]:
+                prefilter_fact_matcher = self.create_fact_matcher(
+                    sentence_references=sentence_references, document_prefilter=True
+                )
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+                    prefilter_fact_matcher.create_fact_statistics(
+                        data,
+                        text_key="text",
+                        save_file_content=True,
+                        num_workers=num_workers,
+                        checkpoint_path=checkpoint_path if num_workers == 1 else None,
+                    )
+                    if num_workers == 1:
+                        self.assertEqual(utility.load_json_dict(checkpoint_path)["processed_documents"], 8)
+
+                self.assertEqual(
+                    prefilter_fact_matcher.entity_relation_occurrence_info_dict,
+                    fact_matcher.entity_relation_occurrence_info_dict,
+                )
+                self.assertEqual(prefilter_fact_matcher.document_prefilter.counters, {"documents": 8, "skipped": 3})
+
+    def test_create_fact_statistics_shared_index_good(self):
+        data = self.test_documents + [{"text": "Blah blah blah."}]
+        kwargs = {"alias_attribution": True, "sentence_references": True}
+        fact_matcher = self.create_fact_matcher(**kwargs)
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+        self.assertIsNone(fact_matcher.shared_index)
+
+        for num_workers, document_prefilter in [(1, False), (2, False), (2, True)]:
+            shared_fact_matcher = self.create_fact_matcher(
+                shared_index=True, document_prefilter=document_prefilter, **kwargs
+            )
+            shared_fact_matcher.create_fact_statistics(
+                data, text_key="text", save_file_content=True, num_workers=num_workers
+            )
+
+            self.assertEqual(
+                shared_fact_matcher.entity_relation_occurrence_info_dict,
+                fact_matcher.entity_relation_occurrence_info_dict,
+            )
+        self.assertEqual(len(shared_fact_matcher.shared_index.subjects), len(fact_matcher.relation_mapping_dict))
+        self.assertEqual(shared_fact_matcher.relation_mapping_dict, {})
+        self.assertEqual(shared_fact_matcher.object_mapping_dict, {})
+
+    def test_shared_index_index_cache_good(self):
+        kwargs = {
+            "bear_data_path": f"{self.test_resources_abs_path}",
+            "path_to_all_entities": f"{self.test_resources_abs_path}/all_entities.json",
+            "alias_attribution": True,
+        }
+        fact_matcher = FactMatcherSimple(**kwargs)
+        store = fact_matcher.occurrence_store
+        data = [
+            {"text": f"{subj_name} blah blah {obj_name}. {store.subj_labels[fact_id - 1]} {obj_name}."}
+            for fact_id in range(1, len(store))
+            for subj_name, obj_name in zip(
+                [store.subj_labels[fact_id], *store.subj_aliases[fact_id]],
+                [*store.obj_aliases[fact_id], store.obj_labels[fact_id]],
+            )
+        ]
+        fact_matcher.create_fact_statistics(data, text_key="text")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            FactMatcherSimple(**kwargs, index_cache_dir=tmp_dir, shared_index=True)
+            self.assertEqual(len([name for name in os.listdir(tmp_dir) if name.endswith(".idx")]), 1)
+            with patch.object(SharedMatchIndex, "build") as build:
+                shared_fact_matcher = FactMatcherSimple(**kwargs, index_cache_dir=tmp_dir, shared_index=True)
+                build.assert_not_called()
+            shared_fact_matcher.create_fact_statistics(data, text_key="text")
+
+        self.assertGreater(int(store.occurrences.sum()), 0)
+        self.assertEqual(
+            shared_fact_matcher.entity_relation_occurrence_info_dict, fact_matcher.entity_relation_occurrence_info_dict
+        )
+
+    def test_create_fact_statistics_sentence_cache_good(self):
+        data = [
+            {"text": "United States of America blah blah blah Washington, D.C. blah. Blah blah blah."},
+            {"text": "Publius blah blah blah the USA. Blah blah blah."},
+            {"text": "United States of America blah blah blah Washington, D.C. blah. Publius blah blah blah the USA."},
+            {"text": "Blah blah blah. Publius blah blah blah the USA."},
+        ]
+        kwargs = {"alias_attribution": True, "sentence_references": True}
+        fact_matcher = self.create_fact_matcher(**kwargs)
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+        self.assertIsNone(fact_matcher.sentence_cache)
+
+        for num_workers, sentence_cache_size, document_prefilter, counters in [
+            (1, 10, False, {"hits": 5, "misses": 3, "evictions": 0}),
+            (1, 2, True, {"hits": 2, "misses": 6, "evictions": 4}),
+            (2, 10, False, None),
+        ]:
+            cached_fact_matcher = self.create_fact_matcher(
+                sentence_cache_size=sentence_cache_size, document_prefilter=document_prefilter, **kwargs
+            )
+            cached_fact_matcher.create_fact_statistics(
+                data, text_key="text", save_file_content=True, num_workers=num_workers
+            )
+
+            self.assertEqual(
+                cached_fact_matcher.entity_relation_occurrence_info_dict,
+                fact_matcher.entity_relation_occurrence_info_dict,
+            )
+            if counters is not None:
+                self.assertEqual(cached_fact_matcher.sentence_cache.counters, counters)
+                self.assertEqual(len(cached_fact_matcher.sentence_cache), min(3, sentence_cache_size))
+                self.assertLess(
+                    cached_fact_matcher.ngram_window_counters["probed"], fact_matcher.ngram_window_counters["probed"]
+                )
+            else:
+                self.assertEqual(sum(cached_fact_matcher.sentence_cache.counters.values()), 8)
+
+    def test_create_fact_statistics_document_deduplication_good(self):
+        data = [
+            {"text": "United States of America blah blah blah Washington, D.C. blah. Blah blah blah."},
+            {"text": "Publius blah blah blah the USA. Blah blah blah."},
+            {"text": "United States of America blah blah blah Washington, D.C. blah. Blah blah blah."},
+            {"text": "Blah blah blah."},
+            {"text": "Publius blah blah blah the USA.  Blah blah blah."},
+            {"text": "Blah blah blah."},
+        ]
+        for sentence_references in [False, True]:
+            kwargs = {"alias_attribution": True, "sentence_references": sentence_references}
+            fact_matcher = self.create_fact_matcher(**kwargs)
+            fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+            self.assertIsNone(fact_matcher.document_fingerprints)
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for num_workers, document_deduplication, document_prefilter, counters in [
+                    (1, "skip", False, {"documents": 6, "duplicates": 2}),
+                    (1, "report", True, {"documents": 6, "duplicates": 2}),
+                    (2, "skip", True, None),
+                    (1, "skip", True, {"documents": 6, "duplicates": 6}),
+                ]:
+                    deduplicated_fact_matcher = self.create_fact_matcher(
+                        document_deduplication=document_deduplication,
+                        document_fingerprint_dir=tmp_dir if counters is None or counters["duplicates"] == 6 else None,
+                        document_prefilter=document_prefilter,
+                        **kwargs,
+                    )
+                    deduplicated_fact_matcher.create_fact_statistics(
+                        data, text_key="text", save_file_content=True, num_workers=num_workers, chunks_per_worker=1
+                    )
+
+                    self.assertEqual(
+                        deduplicated_fact_matcher.entity_relation_occurrence_info_dict,
+                        fact_matcher.entity_relation_occurrence_info_dict,
+                    )
+                    if counters is not None:
+                        self.assertEqual(deduplicated_fact_matcher.document_fingerprints.counters, counters)
+                    else:
+                        self.assertEqual(deduplicated_fact_matcher.document_fingerprints.counters["documents"], 6)
+                        self.assertEqual(len(deduplicated_fact_matcher.document_fingerprints), 4)
+
+        with self.assertRaises(ValueError):
+            self.create_fact_matcher(document_deduplication="drop")
+
+    def test_create_fact_statistics_max_sentences_per_fact_good(self):
+        data = [
+            {"text": f"United States of America blah {i} blah Washington, D.C. blah. Blah {i}."} for i in range(12)
+        ] + [{"text": "United States of America blah 0 blah Washington, D.C. blah."}]
+        sentences = [f"United States of America blah {i} blah Washington, D.C. blah." for i in range(12)]
+        for sentence_references in [False, True]:
+            results = []
+            for num_workers in [1, 3]:
+                fact_matcher = self.create_fact_matcher(
+                    sentence_references=sentence_references, max_sentences_per_fact=3
+                )
+                fact_matcher.create_fact_statistics(
+                    data, text_key="text", save_file_content=True, num_workers=num_workers, chunks_per_worker=2
+                )
+                results.append(fact_matcher.entity_relation_occurrence_info_dict["P_00"]["Q30"])
+
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(results[0]["occurrences"], 13)
+            self.assertEqual(len(results[0]["sentences"]), 3)
+            if not sentence_references:
+                expected_sentences = sorted(sentences, key=utility.get_sentence_priority)[:3]
+                self.assertEqual(
+                    results[0]["sentences"],
+                    {sentence: 2 if sentence == sentences[0] else 1 for sentence in expected_sentences},
+                )
+
+    def test_create_fact_statistics_match_event_log_good(self):
+        data = self.test_alias_documents
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for num_workers in [1, 2]:
+                log_dir = os.path.join(tmp_dir, str(num_workers))
+                fact_matcher = self.create_fact_matcher(match_event_log_dir=log_dir)
+                fact_matcher.create_fact_statistics(data, text_key="text", num_workers=num_workers)
+                occurrences = fact_matcher.entity_relation_occurrence_info_dict
+                events = read_match_events(log_dir)
+
+                # Every process writes one part file per run, not one per chunk of documents.
+                self.assertLessEqual(len(os.listdir(log_dir)), num_workers)
+                self.assertEqual(
+                    sorted(zip(*[events[name].to_pylist() for name in events.column_names])),
+                    [
+                        (0, 0, "P_00", "Q30", False, False),
+                        (1, 0, "P_00", "Q178903", False, True),
+                        (2, 0, "P_00", "Q178903", True, False),
+                        (3, 0, "P_00", "Q178903", True, True),
+                        (3, 1, "P_00", "Q30", True, False),
+                    ],
+                )
+                self.assertEqual(fact_matcher.load_match_event_log([log_dir]), occurrences)
+                self.assertEqual(
+                    {
+                        subj_id: fact["occurrences"]
+                        for subj_id, fact in fact_matcher.load_match_event_log([log_dir], subject_aliases=False)[
+                            "P_00"
+                        ].items()
+                    },
+                    {"Q30": 1, "Q178903": 1},
+                )
+                self.assertEqual(
+                    {
+                        subj_id: fact["occurrences"]
+                        for subj_id, fact in fact_matcher.load_match_event_log([log_dir], object_aliases=False)[
+                            "P_00"
+                        ].items()
+                    },
+                    {"Q30": 2, "Q178903": 1},
+                )
+
+            # A second run into the same directory starts again at document index 0, its events are counted as well.
+            fact_matcher.create_fact_statistics(data, text_key="text")
+            self.assertEqual(
+                fact_matcher.load_match_event_log([os.path.join(tmp_dir, "2")])["P_00"]["Q30"]["occurrences"], 4
+            )
+            self.assertEqual(
+                fact_matcher.load_match_event_log([os.path.join(tmp_dir, "1"), os.path.join(tmp_dir, "2")])["P_00"][
+                    "Q30"
+                ]["occurrences"],
+                6,
+            )
+
+    def test_create_fact_statistics_alias_attribution_good(self):
+        data = self.test_alias_documents
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for num_workers in [1, 2]:
+                log_dir = os.path.join(tmp_dir, str(num_workers))
+                fact_matcher = self.create_fact_matcher(alias_attribution=True, match_event_log_dir=log_dir)
+                fact_matcher.create_fact_statistics(data, text_key="text", num_workers=num_workers)
+                occurrences = fact_matcher.entity_relation_occurrence_info_dict
+
+                self.assertEqual(
+                    {
+                        subj_id: [fact[key] for key in ["occurrences", *utility.ALIAS_OCCURRENCE_KEYS]]
+                        for subj_id, fact in occurrences["P_00"].items()
+                        if fact["occurrences"] > 0
+                    },
+                    {"Q30": [2, 1, 1, 0, 0], "Q178903": [3, 0, 1, 1, 1]},
+                )
+                self.assertEqual(fact_matcher.load_match_event_log([log_dir]), occurrences)
+                self.assertEqual(
+                    {
+                        subj_id: fact["occurrences"]
+                        for subj_id, fact in fact_matcher.load_match_event_log(
+                            [log_dir], subject_aliases=False, object_aliases=False
+                        )["P_00"].items()
+                    },
+                    {subj_id: fact["label_occurrences"] for subj_id, fact in occurrences["P_00"].items()},
+                )
+
+    def test_create_fact_statistics_profile_good(self):
+        data = self.test_documents[:4]
+        profiles = []
+        for num_workers in [1, 2]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                profile_path = os.path.join(tmp_dir, "profile.json")
+                fact_matcher = self.create_fact_matcher(profile=True, profile_path=profile_path)
+                fact_matcher.create_fact_statistics(
+                    data, text_key="text", save_file_content=True, num_workers=num_workers
+                )
+                self.assertEqual(utility.load_json_dict(profile_path), fact_matcher.get_profile())
+            profiles.append(fact_matcher.get_profile())
+
+        self.assertEqual(profiles[0]["counters"], profiles[1]["counters"])
+        self.assertEqual(
+            {counter: profiles[0]["counters"][counter] for counter in ["documents", "sentences", "matches"]},
+            {"documents": 4, "sentences": 5, "matches": int(fact_matcher.occurrence_store.occurrences.sum())},
+        )
+        self.assertEqual(profiles[0]["counters"]["windows"], fact_matcher.ngram_window_counters["probed"])
+        self.assertTrue(
+            {"read_and_split", "clean_string", "prefilter", "tokenize", "subject_lookup", "object_matching"}.issubset(
+                profiles[0]["timers"]
+            )
+        )
+        fact_matcher = self.create_fact_matcher()
+        fact_matcher.create_fact_statistics(data, text_key="text", save_file_content=True)
+        self.assertEqual(fact_matcher.get_profile(), {"timers": {}, "counters": {}})
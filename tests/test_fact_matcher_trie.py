@@ -0,0 +1,159 @@
+import copy
+import os
+import unittest
+from unittest.mock import patch
+
+from sample_efficiency_evaluation import FactMatcherSimple, FactMatcherTrie
+
+
+class FactMatcherTrieTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.test_entity_relation_occurrence_info_dict = {
+            "P_00": {
+                "Q30": {
+                    "subj_label": "United States of America",
+                    "subj_aliases": {"the United States of America", "America", "U.S.A.", "USA", "U.S.", "US"},
+                    "obj_id": "Q61",
+                    "obj_label": "Washington, D.C.",
+                    "obj_aliases": set(),
+                    "occurrences": 0,
+                    "sentences": dict(),
+                },
+                "Q178903": {
+                    "subj_label": "Alexander Hamilton",
+                    "subj_aliases": {
+                        "Publius",
+                        "Hamilton",
+                        "Alexander Hamilton, US Treasury secretary",
+                        "A. Ham",
+                        "RB",
+                    },
+                    "obj_id": "Q30",
+                    "obj_label": "United States of America",
+                    "obj_aliases": {"the United States of America", "America", "U.S.A.", "USA", "U.S.", "US"},
+                    "occurrences": 0,
+                    "sentences": dict(),
+                },
+            },
+            "P_01": {
+                "Q2127993": {
+                    "subj_label": "Rainer Bernhardt",
+                    "subj_aliases": {"Rainer Herbert Georg Bernhardt", "Bernhardt", "RB"},
+                    "obj_id": "Q30",
+                    "obj_label": "United States of America",
+                    "obj_aliases": {"the United States of America", "America", "U.S.A.", "USA", "U.S.", "US"},
+                    "occurrences": 0,
+                    "sentences": dict(),
+                },
+                "Q38": {
+                    "subj_label": "Italy",
+                    "subj_aliases": {"IT", "ITA", "Italia", "Italian Republic"},
+                    "obj_id": "Q652",
+                    "obj_label": "Italian",
+                    "obj_aliases": set(),
+                    "occurrences": 0,
+                    "sentences": dict(),
+                },
+            },
+        }
+        self.data = [
+            {
+                "text": "United States of America blah blah blah Washington, D.C. blah."
+                " United States of America blah Alexander Hamilton, US Treasury secretary blah blah Washington, D.C. blah."
+                " United States of America (U.S.A.) blah blah blah Washington, D.C. blah."
+            },
+            {
+                "text": "United of America (U.S.A.) blah blah blah Washington, D.C. blah."
+                " Alexander  Hamilton blah blah blah the United States of America."
+            },
+            {
+                "text": "Publius blah blah blah the USA based in Washington, D.C. blah."
+                " Hamilton blah blah blah United States of America."
+                " US blah blah blah A. Ham."
+                " us blah blah blah a. ham, united states of america."
+            },
+            {
+                "text": "Rainer Herbert Georg Bernhardt blah blah blah the USA blah."
+                " Bernhardt blah blah blah United States of America."
+                " RB blah blah blah the USA. rb blah blah blah the USA."
+                " The Italian (IT) blah blah blah team. The Italian (it) blah blah blah team."
+            },
+        ]
+        self.test_resources_abs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "test_resources"))
+
+    def test_create_subject_trie_good(self):
+        with (
+            patch.object(
+                FactMatcherTrie,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict,
+            ),
+        ):
+            fact_matcher = FactMatcherTrie(bear_data_path=f"{self.test_resources_abs_path}")
+
+            self.assertEqual(fact_matcher.subject_trie["US"], {None: "US"})
+            self.assertEqual(fact_matcher.subject_trie["u.s"], {".": {None: "u.s ."}})
+            self.assertEqual(
+                fact_matcher.subject_trie["rainer"],
+                {
+                    "bernhardt": {None: "rainer bernhardt"},
+                    "herbert": {"georg": {"bernhardt": {None: "rainer herbert georg bernhardt"}}},
+                },
+            )
+            self.assertNotIn("us", fact_matcher.subject_trie)
+
+    def test_create_fact_statistics_same_as_simple(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=copy.deepcopy(self.test_entity_relation_occurrence_info_dict),
+            ),
+        ):
+            fact_matcher_simple = FactMatcherSimple(bear_data_path=f"{self.test_resources_abs_path}")
+            fact_matcher_simple.create_fact_statistics(self.data, text_key="text", save_file_content=True)
+            simple_result = fact_matcher_simple.entity_relation_occurrence_info_dict
+
+        with (
+            patch.object(
+                FactMatcherTrie,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict,
+            ),
+        ):
+            for shared_index in [False, True]:
+                fact_matcher_trie = FactMatcherTrie(
+                    bear_data_path=f"{self.test_resources_abs_path}", shared_index=shared_index
+                )
+                fact_matcher_trie.create_fact_statistics(self.data, text_key="text", save_file_content=True)
+
+                self.assertEqual(fact_matcher_trie.max_ngram, fact_matcher_simple.max_ngram)
+                self.assertEqual(fact_matcher_trie.entity_relation_occurrence_info_dict, simple_result)
+                self.assertEqual(len(fact_matcher_trie.relation_mapping_dict) == 0, shared_index)
+            self.assertEqual(simple_result["P_00"]["Q178903"]["occurrences"], 7)
+            self.assertEqual(simple_result["P_01"]["Q2127993"]["occurrences"], 3)
+            self.assertEqual(simple_result["P_01"]["Q38"]["occurrences"], 1)
+
+    def test_create_fact_statistics_max_allowed_ngram_length(self):
+        with (
+            patch.object(
+                FactMatcherSimple,
+                "extract_entity_information",
+                return_value=self.test_entity_relation_occurrence_info_dict,
+            ),
+        ):
+            fact_matcher_simple = FactMatcherSimple(
+                bear_data_path=f"{self.test_resources_abs_path}", max_allowed_ngram_length=2
+            )
+            fact_matcher_trie = FactMatcherTrie(
+                bear_data_path=f"{self.test_resources_abs_path}", max_allowed_ngram_length=2
+            )
+        sentence = "Rainer Herbert Georg Bernhardt and Rainer Bernhardt live in the USA."
+        tokens, tokens_lower = fact_matcher_simple.get_tokens_from_sentence(sentence, only_lower=False)
+
+        self.assertEqual(
+            sorted(fact_matcher_trie._get_subject_ngrams(tokens, tokens_lower)),
+            sorted(fact_matcher_simple._get_subject_ngrams(tokens, tokens_lower)),
+        )
+        self.assertNotIn("rainer herbert georg bernhardt", fact_matcher_trie._get_subject_ngrams(tokens, tokens_lower))
@@ -0,0 +1,211 @@
+import unittest
+
+import numpy as np
+
+from sample_efficiency_evaluation.occurrence_store import OccurrenceStore
+from utility.utility import get_sentence_priority
+
+
+class OccurrenceStoreTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.relation_info_dict = {
+            "P_00": {
+                "Q30": {
+                    "subj_label": "United States of America",
+                    "subj_aliases": {"America", "USA"},
+                    "obj_id": "Q61",
+                    "obj_label": "Washington, D.C.",
+                    "obj_aliases": set(),
+                    "occurrences": 2,
+                    "sentences": {"United States of America blah Washington, D.C.": 2},
+                },
+                "Q178903": {
+                    "subj_label": "Alexander Hamilton",
+                    "subj_aliases": {"Hamilton"},
+                    "obj_id": "Q30",
+                    "obj_label": "United States of America",
+                    "obj_aliases": {"America", "USA"},
+                    "occurrences": 0,
+                    "sentences": {},
+                },
+            },
+            "P_01": {},
+            "P_02": {
+                "Q38": {
+                    "subj_label": "Italy",
+                    "subj_aliases": set(),
+                    "obj_id": "Q652",
+                    "obj_label": "Italian",
+                    "obj_aliases": set(),
+                    "occurrences": 1,
+                    "sentences": {},
+                },
+            },
+        }
+
+    def test_from_relation_info_dict_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.fact_ids, {("P_00", "Q30"): 0, ("P_00", "Q178903"): 1, ("P_02", "Q38"): 2})
+        self.assertEqual(store.occurrences.dtype, np.int64)
+        self.assertEqual(store.occurrences.tolist(), [2, 0, 1])
+        self.assertEqual(store.obj_labels[1], "United States of America")
+        self.assertEqual(set(store.obj_aliases[1]), {"America", "USA"})
+        self.assertEqual(store.sentences, {0: {"United States of America blah Washington, D.C.": 2}})
+        self.assertEqual(store.to_relation_info_dict(), self.relation_info_dict)
+
+    def test_add_occurrence_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+
+        store.add_occurrence(1, "Alexander Hamilton blah USA.")
+        store.add_occurrence(1, "Alexander Hamilton blah USA.")
+        store.add_occurrence(1)
+        store.merge_fact(2, 3, {"Italy blah Italian.": 3})
+
+        self.assertEqual(store.occurrences.tolist(), [2, 3, 4])
+        self.assertEqual(store.get_matched_fact_ids(), [0, 1, 2])
+        self.assertEqual(store.sentences[1], {"Alexander Hamilton blah USA.": 2})
+        self.assertEqual(store.get_fact(2)["sentences"], {"Italy blah Italian.": 3})
+
+        store.reset([0, 2])
+
+        self.assertEqual(store.occurrences.tolist(), [0, 3, 0])
+        self.assertEqual(store.get_matched_fact_ids(), [1])
+
+        store.clear_sentences()
+
+        self.assertEqual(store.to_relation_info_dict()["P_00"]["Q178903"]["sentences"], {})
+        self.assertEqual(store.to_relation_info_dict()["P_00"]["Q178903"]["occurrences"], 3)
+
+    def test_add_fact_grows_occurrences(self):
+        store = OccurrenceStore()
+        for i in range(100):
+            fact_id = store.add_fact("P_00", f"Q{i}", f"Subject {i}", [], f"O{i}", f"Object {i}", [], occurrences=i)
+            self.assertEqual(fact_id, i)
+
+        self.assertEqual(store.occurrences.tolist(), list(range(100)))
+        self.assertEqual(list(store.to_relation_info_dict()["P_00"]), [f"Q{i}" for i in range(100)])
+
+    def test_sentence_references_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+
+        reference_id = store.add_sentence_reference(3, 10, 48)
+        store.add_occurrence(1, reference_id)
+        store.add_occurrence(2, reference_id)
+        reference_ids: dict[str, int] = {}
+        store.merge_fact(1, 1, {"7:0:21": 1}, reference_ids)
+        store.merge_fact(2, 1, {"7:0:21": 1}, reference_ids)
+
+        self.assertEqual(store.reference_documents.tolist(), [3, 7])
+        self.assertEqual(store.sentences[1], {0: 1, 1: 1})
+        self.assertEqual(store.get_sentences(1), {"3:10:48": 1, "7:0:21": 1})
+        self.assertEqual(store.get_fact(2)["sentences"], {"3:10:48": 1, "7:0:21": 1})
+        self.assertEqual(store.get_sentences(0), {"United States of America blah Washington, D.C.": 2})
+
+        store.clear_sentences()
+
+        self.assertEqual(len(store.reference_documents), 0)
+
+    def test_sentence_sampling_reservoir_good(self):
+        sentences = [f"Sentence {i}." for i in range(50)]
+        expected_sentences = sorted(sentences, key=get_sentence_priority)[:5]
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+        store.set_sentence_sampling(5, "reservoir")
+
+        for sentence in sentences + sentences[:10]:
+            store.add_occurrence(1, sentence)
+
+        self.assertEqual(store.occurrences.tolist(), [2, 60, 1])
+        self.assertEqual(set(store.sentences[1]), set(expected_sentences))
+        self.assertEqual(
+            store.sentences[1], {sentence: 2 if sentence in sentences[:10] else 1 for sentence in expected_sentences}
+        )
+
+        merged_store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+        merged_store.set_sentence_sampling(5, "reservoir")
+        for part in (sentences[30:], sentences[:30] + sentences[:10]):
+            part_store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+            part_store.set_sentence_sampling(5, "reservoir")
+            for sentence in part:
+                part_store.add_occurrence(1, sentence)
+            merged_store.merge_fact(1, int(part_store.occurrences[1]), part_store.get_sentences(1))
+
+        self.assertEqual(merged_store.occurrences.tolist(), [2, 60, 1])
+        self.assertEqual(merged_store.sentences[1], store.sentences[1])
+
+    def test_sentence_sampling_references_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+        store.set_sentence_sampling(5, "reservoir")
+        references = [(document_index, 0, 10) for document_index in range(50)]
+        expected_references = sorted(
+            [f"{document_index}:0:10" for document_index, _, _ in references], key=get_sentence_priority
+        )[:5]
+
+        for reference in references:
+            store.add_occurrence(1, store.add_occurrence(2, reference))
+
+        self.assertEqual(store.occurrences.tolist(), [2, 50, 51])
+        self.assertEqual(set(store.get_sentences(1)), set(expected_references))
+        self.assertEqual(store.get_sentences(2), store.get_sentences(1))
+        self.assertLess(len(store.reference_documents), 30)
+
+        store.set_sentence_sampling(0, "first")
+        self.assertEqual(store.add_occurrence(1, (50, 0, 10)), (50, 0, 10))
+        store.merge_fact(1, 1, {"51:0:10": 1}, {})
+        self.assertEqual(store.reference_documents[-1], references[-1][0])
+
+    def test_sentence_sampling_first_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+        store.set_sentence_sampling(2, "first")
+
+        for sentence in ["A.", "B.", "C.", "A.", "D."]:
+            store.add_occurrence(1, sentence)
+        store.merge_fact(1, 2, {"E.": 1, "B.": 1})
+
+        self.assertEqual(store.occurrences.tolist(), [2, 7, 1])
+        self.assertEqual(store.sentences[1], {"A.": 2, "B.": 2})
+
+    def test_sentence_sampling_unknown_method(self):
+        with self.assertRaises(ValueError):
+            OccurrenceStore(sentence_sampling="random")
+
+    def test_alias_attribution_good(self):
+        store = OccurrenceStore.from_relation_info_dict(self.relation_info_dict)
+
+        self.assertIsNone(store.alias_occurrences)
+        self.assertNotIn("label_occurrences", store.get_fact(0))
+
+        store.set_alias_attribution(True)
+        store.add_occurrence(1)
+        store.add_alias_occurrence(1, subj_via_alias=False, obj_via_alias=True)
+        store.add_occurrence(1, count=2)
+        store.add_alias_occurrence(1, subj_via_alias=True, obj_via_alias=True, count=2)
+        store.merge_fact(2, 1, {}, alias_occurrences=[1, 0, 0, 0])
+        fact_id = store.add_fact("P_02", "Q1", "Subject", [], "Q2", "Object", [], occurrences=5)
+
+        self.assertEqual(store.alias_occurrences.tolist(), [[0, 0, 0, 0], [0, 0, 1, 2], [1, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertEqual(
+            {key: value for key, value in store.get_fact(1).items() if key.endswith("occurrences")},
+            {
+                "occurrences": 3,
+                "label_occurrences": 0,
+                "subj_alias_occurrences": 0,
+                "obj_alias_occurrences": 1,
+                "subj_obj_alias_occurrences": 2,
+            },
+        )
+        self.assertEqual(
+            OccurrenceStore.from_relation_info_dict(store.to_relation_info_dict()).alias_occurrences.tolist(),
+            store.alias_occurrences.tolist(),
+        )
+
+        store.reset([1])
+
+        self.assertEqual(store.get_alias_occurrences(1), [0, 0, 0, 0])
+        self.assertEqual(store.get_alias_occurrences(fact_id), [0, 0, 0, 0])
+
+        store.reset()
+
+        self.assertEqual(store.alias_occurrences.sum(), 0)
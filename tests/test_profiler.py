@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from sample_efficiency_evaluation.profiler import StageProfiler
+from utility import utility
+
+
+class StageProfilerTest(unittest.TestCase):
+
+    def test_lap_good(self):
+        profiler = StageProfiler(enabled=True)
+        profiler.start()
+        profiler.lap("tokenize")
+        profiler.lap("subject_lookup")
+        profiler.lap("tokenize")
+        profiler.count("sentences")
+        profiler.count("windows", 5)
+
+        profile = profiler.get_profile()
+        self.assertEqual(set(profile["timers"]), {"tokenize", "subject_lookup"})
+        self.assertTrue(all(seconds >= 0 for seconds in profile["timers"].values()))
+        self.assertEqual(profile["counters"], {"sentences": 1, "windows": 5})
+
+    def test_lap_disabled_good(self):
+        profiler = StageProfiler()
+        profiler.start()
+        profiler.lap("tokenize")
+        profiler.count("sentences")
+
+        self.assertEqual(profiler.get_profile(), {"timers": {}, "counters": {}})
+
+    def test_merge_good(self):
+        profiler = StageProfiler(enabled=True)
+        profiler.count("sentences", 2)
+        profiler.merge({"timers": {"tokenize": 1.5}, "counters": {"sentences": 3, "matches": 1}})
+        profiler.merge({"timers": {"tokenize": 0.5}, "counters": {}})
+
+        self.assertEqual(
+            profiler.get_profile(), {"timers": {"tokenize": 2.0}, "counters": {"sentences": 5, "matches": 1}}
+        )
+        profiler.reset()
+        self.assertEqual(profiler.get_profile(), {"timers": {}, "counters": {}})
+
+    def test_dump_good(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = StageProfiler(
+                enabled=True, dump_path=os.path.join(tmp_dir, "profile.json"), dump_interval_seconds=3600
+            )
+            profiler.merge({"timers": {"tokenize": 1.5}, "counters": {"sentences": 3}})
+            profiler.maybe_dump()
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "profile.json")))
+            profiler.dump()
+            self.assertEqual(
+                utility.load_json_dict(os.path.join(tmp_dir, "profile.json")),
+                {"timers": {"tokenize": 1.5}, "counters": {"sentences": 3}},
+            )
+
+            profiler.dump(os.path.join(tmp_dir, "profile.prom"))
+            with open(os.path.join(tmp_dir, "profile.prom"), encoding="utf-8") as f:
+                self.assertEqual(
+                    f.read(),
+                    "# TYPE fact_matcher_stage_seconds_total counter\n"
+                    'fact_matcher_stage_seconds_total{stage="tokenize"} 1.5\n'
+                    "# TYPE fact_matcher_events_total counter\n"
+                    'fact_matcher_events_total{counter="sentences"} 3\n',
+                )
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["profile.json", "profile.prom"])
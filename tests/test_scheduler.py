@@ -0,0 +1,74 @@
+import copy
+import os
+import unittest
+from unittest.mock import patch
+
+from datasets import Dataset
+
+from sample_efficiency_evaluation import FactMatcherSimple
+from sample_efficiency_evaluation.scheduler import ChunkScheduler
+
+
+class ChunkSchedulerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.test_resources_abs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "test_resources"))
+        self.data = [
+            {"text": "Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan blah. " * 50},
+            {"text": "Nepal blah blah blah Khadga Prasad Sharma Oli. Armenia blah blah blah Nikol Pashinyan."},
+            {"text": "Blah blah blah."},
+            {"text": "Nikol Pashinyan blah blah blah Republic of Armenia. Abudhabi blah Khalifa bin Zayed Al Nahyan."},
+            {"text": "Free State of Fiume blah blah blah Gabriele D'Annunzio."},
+            {"text": "Nepal blah blah blah Khadga Prasad Sharma Oli."},
+        ]
+
+    def test_get_tasks_good(self):
+        scheduler = ChunkScheduler(num_workers=2, chunks_per_worker=2)
+
+        tasks = scheduler.get_tasks(self.data, "text")
+        self.assertEqual([chunk for chunk, _, _ in tasks], [range(0, 1), range(1, 6)])
+        self.assertEqual(sum(text_size for _, text_size, _ in tasks), sum(len(doc["text"]) for doc in self.data))
+
+        scheduler = ChunkScheduler(num_workers=2, stream_chunk_size=4)
+        tasks = list(scheduler.get_tasks(Dataset.from_list(self.data).to_iterable_dataset(), "text"))
+        self.assertEqual([chunk for chunk, _, _ in tasks], [range(0, 4), range(4, 6)])
+        self.assertEqual([documents for _, _, documents in tasks], [self.data[:4], self.data[4:]])
+        self.assertEqual(sum(text_size for _, text_size, _ in tasks), sum(len(doc["text"]) for doc in self.data))
+
+    def test_run_good(self):
+        fact_matcher = FactMatcherSimple(bear_data_path=self.test_resources_abs_path)
+        fact_matcher.create_fact_statistics(self.data, text_key="text", save_file_content=True)
+
+        for file_contents in [
+            self.data,
+            Dataset.from_list(self.data),
+            Dataset.from_list(self.data).to_iterable_dataset(),
+        ]:
+            parallel_fact_matcher = FactMatcherSimple(bear_data_path=self.test_resources_abs_path)
+            parallel_fact_matcher.create_fact_statistics(
+                file_contents, text_key="text", save_file_content=True, num_workers=2, chunks_per_worker=3
+            )
+
+            self.assertEqual(
+                parallel_fact_matcher.entity_relation_occurrence_info_dict,
+                fact_matcher.entity_relation_occurrence_info_dict,
+            )
+            self.assertEqual(parallel_fact_matcher.ngram_window_counters, fact_matcher.ngram_window_counters)
+            self.assertLessEqual(len(parallel_fact_matcher.worker_utilization), 2)
+            self.assertTrue(
+                all(
+                    0 <= stats["utilization"] <= 1 and stats["busy_seconds"] >= 0
+                    for stats in parallel_fact_matcher.worker_utilization.values()
+                )
+            )
+        self.assertEqual(
+            sum(stats["text_size"] for stats in parallel_fact_matcher.worker_utilization.values()),
+            sum(len(doc["text"]) for doc in self.data),
+        )
+        self.assertEqual(sum(stats["chunks"] for stats in parallel_fact_matcher.worker_utilization.values()), 1)
+
+    def test_run_worker_failure(self):
+        fact_matcher = FactMatcherSimple(bear_data_path=self.test_resources_abs_path)
+        with patch.object(FactMatcherSimple, "_process_file_contents", side_effect=RuntimeError("worker failed")):
+            with self.assertRaises(RuntimeError):
+                fact_matcher.create_fact_statistics(self.data, text_key="text", num_workers=2)
@@ -0,0 +1,31 @@
+import unittest
+
+from sample_efficiency_evaluation.sentence_cache import SentenceMatchCache
+
+
+class SentenceMatchCacheTest(unittest.TestCase):
+
+    def test_sentence_match_cache_good(self):
+        sentence_cache = SentenceMatchCache(max_size=2)
+        keys = [SentenceMatchCache.get_key(sentence) for sentence in ["Blah blah.", "Blah  blah.", "🇳🇵 blah \udc80."]]
+
+        self.assertEqual(len(set(keys)), 3)
+        self.assertEqual(SentenceMatchCache.get_key("Blah blah."), keys[0])
+        self.assertIsNone(sentence_cache.get(keys[0]))
+        sentence_cache.put(keys[0], ())
+        sentence_cache.put(keys[1], ((3, False, True),))
+        self.assertEqual(sentence_cache.get(keys[0]), ())
+        sentence_cache.put(keys[2], ((1, False, False), (2, True, False)))
+
+        self.assertEqual(len(sentence_cache), 2)
+        self.assertIsNone(sentence_cache.get(keys[1]))
+        self.assertEqual(sentence_cache.get(keys[2]), ((1, False, False), (2, True, False)))
+        self.assertEqual(sentence_cache.counters, {"hits": 2, "misses": 2, "evictions": 1})
+
+        sentence_cache.reset_counters()
+        self.assertEqual(sentence_cache.counters, {"hits": 0, "misses": 0, "evictions": 0})
+        self.assertEqual(sentence_cache.get(keys[0]), ())
+
+    def test_sentence_match_cache_bad_size(self):
+        with self.assertRaises(ValueError):
+            SentenceMatchCache(max_size=0)
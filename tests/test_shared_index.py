@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from sample_efficiency_evaluation.shared_index import FlatBuffer, FlatStringLists, FlatStringMap
+
+
+class SharedIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.mapping = {f"key {i}": list(range(i % 4)) for i in range(1000)}
+        self.mapping.update({"": [7], "ñandú": [1, 2], "🇳🇵": [3]})
+        self.string_lists = [["a", "ß"], [], ["U.S.", "", "🇳🇵"]]
+
+    def test_flat_string_map_good(self):
+        flat_buffer = FlatBuffer(FlatBuffer.serialize(FlatStringMap.to_sections("map", self.mapping)))
+        flat_string_map = FlatStringMap(flat_buffer, "map")
+
+        self.assertEqual(len(flat_string_map), len(self.mapping))
+        for key, values in self.mapping.items():
+            self.assertIn(key, flat_string_map)
+            self.assertEqual(flat_string_map[key], tuple(values))
+            self.assertEqual(flat_string_map.get(key), tuple(values))
+        self.assertNotIn("key 1000", flat_string_map)
+        self.assertIsNone(flat_string_map.get("Key 1"))
+        self.assertEqual(flat_string_map.get("ñandu", ()), ())
+        with self.assertRaises(KeyError):
+            _ = flat_string_map["key -1"]
+
+    def test_flat_string_map_empty(self):
+        flat_string_map = FlatStringMap(FlatBuffer(FlatBuffer.serialize(FlatStringMap.to_sections("map", {}))), "map")
+
+        self.assertEqual(len(flat_string_map), 0)
+        self.assertNotIn("", flat_string_map)
+
+    def test_flat_buffer_file_good(self):
+        sections = {
+            **FlatStringMap.to_sections("map", self.mapping),
+            **FlatStringLists.to_sections("lists", self.string_lists),
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.idx")
+            with open(path, "wb") as f:
+                f.write(FlatBuffer.serialize(sections))
+            with open(path, "rb") as f:
+                flat_buffer = FlatBuffer(f.read())
+
+        flat_string_lists = FlatStringLists(flat_buffer, "lists")
+        self.assertEqual([flat_string_lists[i] for i in range(len(flat_string_lists))], self.string_lists)
+        self.assertEqual(flat_string_lists.get(1, []), [])
+        self.assertEqual(FlatStringMap(flat_buffer, "map")["ñandú"], (1, 2))
+        with self.assertRaises(ValueError):
+            FlatBuffer(b"not a flat buffer")
@@ -1,6 +1,7 @@
+import copy
 import os
+import tempfile
 import unittest
-from unittest.mock import patch
 
 from utility import utility
 
@@ -133,22 +134,289 @@ class UtilityTest(unittest.TestCase):
         self.assertFalse(utility.word_in_sentence("Yerevan T.c.", "Armenia blah Yerevan T.c blah blah Nikol Pashinyan"))
         self.assertFalse(utility.word_in_sentence("Dubai", "Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan."))
 
-    def test_join_relation_info_json_files_good_1(self):
-        with (
-            patch.object(utility, "load_json_dict") as load_json_dict,
-            patch.object(utility, "save_dict_as_json") as save_dict_as_json,
-            patch.object(
-                os,
-                "listdir",
-                return_value=["0_relation_info.json", "1_relation_info.json"],
-            ),
-        ):
-            load_json_dict.side_effect = [
-                self.entity_relation_result_info_dict_1,
-                self.entity_relation_result_info_dict_2,
+    def test_expand_sentence_references_good(self):
+        relation_info_dict = {
+            "P6": {
+                "Q1519": {"occurrences": 2, "sentences": {"1:0:43": 1, "0:11:54": 1}},
+                "Q399": {"occurrences": 1, "sentences": {"1:0:43": 1}},
+            },
+            "P2": {"Q837": {"occurrences": 0, "sentences": {}}},
+        }
+        file_contents = iter(
+            [
+                {"text": "Something.\nAbu Dhabi blah Khalifa bin Zayed Al Nahyan."},
+                {"text": "Abu Dhabi blah Khalifa bin Zayed Al Nahyan. Armenia."},
             ]
-            utility.join_relation_occurrences_info_json_files("output")
-            save_dict_as_json.assert_called_once_with(
+        )
+
+        self.assertEqual(
+            utility.expand_sentence_references(relation_info_dict, file_contents),
+            {
+                "P6": {
+                    "Q1519": {"occurrences": 2, "sentences": {"Abu Dhabi blah Khalifa bin Zayed Al Nahyan.": 2}},
+                    "Q399": {"occurrences": 1, "sentences": {"Abu Dhabi blah Khalifa bin Zayed Al Nahyan.": 1}},
+                },
+                "P2": {"Q837": {"occurrences": 0, "sentences": {}}},
+            },
+        )
+
+    def test_merge_relation_occurrence_info_json_files_good(self):
+        relation_info_dict_1 = copy.deepcopy(self.entity_relation_result_info_dict_1)
+        relation_info_dict_1["P1"] = {}
+        relation_info_dict_2 = copy.deepcopy(self.entity_relation_result_info_dict_2)
+        relation_info_dict_2["P1"] = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = [os.path.join(tmp_dir, f"{i}_relation_occurrence_info.json") for i in range(2)]
+            utility.save_dict_as_json(relation_info_dict_1, file_paths[0])
+            utility.save_dict_as_json(relation_info_dict_2, file_paths[1])
+
+            utility.merge_relation_occurrence_info_json_files(
+                file_paths, os.path.join(tmp_dir, "merged.json"), merge_sentences=True, chunk_size=7
+            )
+            merged = utility.load_json_dict(os.path.join(tmp_dir, "merged.json"))
+            utility.merge_relation_occurrence_info_json_files(file_paths, os.path.join(tmp_dir, "joined.json"))
+            with open(os.path.join(tmp_dir, "joined.json"), "r", encoding="utf-8") as f:
+                joined = f.read()
+            expected = copy.deepcopy(relation_info_dict_1)
+            for _, entities in expected.items():
+                for _, fact in entities.items():
+                    fact.pop("sentences")
+            expected["P6"]["Q1519"]["occurrences"] = 2
+            expected["P6"]["Q399"]["occurrences"] = 2
+            expected["P2"]["Q5626824"]["occurrences"] = 2
+            expected["P2"]["Q837"]["occurrences"] = 2
+            utility.save_dict_as_json(expected, os.path.join(tmp_dir, "expected.json"))
+            with open(os.path.join(tmp_dir, "expected.json"), "r", encoding="utf-8") as f:
+                self.assertEqual(joined, f.read())
+
+        self.assertEqual(list(merged), ["P6", "P2", "P1"])
+        self.assertEqual(merged["P1"], {})
+        self.assertEqual(merged["P6"]["Q1519"]["occurrences"], 2)
+        self.assertEqual(
+            merged["P6"]["Q1519"]["sentences"], {"Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan.": 2}
+        )
+        self.assertEqual(
+            merged["P6"]["Q399"]["sentences"],
+            {"Armenia blah blah blah Nikol Pashinyan": 1, "Armenia blah blah blah Nikol Pashinyan blub": 1},
+        )
+        self.assertEqual(merged["P2"]["Q5626824"]["sentences"], {"sentence 1": 1, "sentence 2": 1})
+
+    def test_iter_relation_occurrence_info_json_file_good(self):
+        relation_info_dict = copy.deepcopy(self.entity_relation_result_info_dict_1)
+        relation_info_dict["P1"] = {}
+        relation_info_dict["P6"]["Q1519"]["sentences"] = {'Abu Dhabi "{[blah]}" \\ \\" blah \u00e9 Khalifa.': 1}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "relation_occurrence_info.json")
+            utility.save_dict_as_json(relation_info_dict, file_path)
+            for chunk_size in [1, 2, 7, 2**20]:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    entries = list(utility.iter_relation_occurrence_info_json_file(f, chunk_size))
+
+                self.assertEqual(
+                    entries,
+                    [
+                        entry
+                        for relation_id, entities in relation_info_dict.items()
+                        for entry in [(relation_id, None, None)]
+                        + [(relation_id, subj_id, fact) for subj_id, fact in entities.items()]
+                    ],
+                )
+
+    def test_merge_relation_occurrence_info_json_files_different_facts(self):
+        relation_info_dict_2 = copy.deepcopy(self.entity_relation_result_info_dict_2)
+        relation_info_dict_2["P2"].pop("Q837")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = [os.path.join(tmp_dir, f"{i}_relation_occurrence_info.json") for i in range(2)]
+            utility.save_dict_as_json(self.entity_relation_result_info_dict_1, file_paths[0])
+            utility.save_dict_as_json(relation_info_dict_2, file_paths[1])
+
+            with self.assertRaises(ValueError):
+                utility.merge_relation_occurrence_info_json_files(file_paths, os.path.join(tmp_dir, "merged.json"))
+
+    def test_relation_occurrence_info_parquet_good(self):
+        relation_info_dict_1 = copy.deepcopy(self.entity_relation_result_info_dict_1)
+        relation_info_dict_2 = copy.deepcopy(self.entity_relation_result_info_dict_2)
+        for relation_info_dict in [relation_info_dict_1, relation_info_dict_2]:
+            for _, entities in relation_info_dict.items():
+                for _, fact in entities.items():
+                    fact["subj_aliases"] = sorted(fact["subj_aliases"])
+            relation_info_dict["P31"] = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i, relation_info_dict in enumerate([relation_info_dict_1, relation_info_dict_2]):
+                utility.save_relation_occurrence_info_parquet(
+                    relation_info_dict,
+                    os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet"),
+                    os.path.join(tmp_dir, f"{i}_relation_occurrence_sentences.parquet"),
+                )
+            loaded = utility.load_relation_occurrence_info(
+                os.path.join(tmp_dir, "0_relation_occurrence_info.parquet"),
+                sentences_file_path=os.path.join(tmp_dir, "0_relation_occurrence_sentences.parquet"),
+            )
+            occurrences = utility.load_relation_occurrence_info(
+                os.path.join(tmp_dir, "1_relation_occurrence_info.parquet"), columns=["occurrences"]
+            )
+            increasing_occurrences = utility.count_increasing_occurrences_in_slices(tmp_dir)
+            utility.merge_relation_occurrence_info_parquet_files(
+                [os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet") for i in range(2)],
+                os.path.join(tmp_dir, "joined.parquet"),
+                [os.path.join(tmp_dir, f"{i}_relation_occurrence_sentences.parquet") for i in range(2)],
+                os.path.join(tmp_dir, "joined_sentences.parquet"),
+            )
+            merged = utility.load_relation_occurrence_info(
+                os.path.join(tmp_dir, "joined.parquet"),
+                sentences_file_path=os.path.join(tmp_dir, "joined_sentences.parquet"),
+            )
+
+        self.assertEqual(loaded, relation_info_dict_1)
+        self.assertEqual(occurrences["P2"]["Q5626824"], {"occurrences": 2})
+        self.assertEqual(
+            increasing_occurrences["P2"]["Q5626824"]["occurrences_increase"],
+            [
+                {"Slice": 0, "occurrences": 0, "total increase": 0},
+                {"Slice": 1, "occurrences": 2, "total increase": 0},
+            ],
+        )
+        self.assertEqual(merged["P6"]["Q1519"]["occurrences"], 2)
+        self.assertEqual(merged["P2"]["Q5626824"]["occurrences"], 2)
+        self.assertEqual(
+            merged["P6"]["Q1519"]["sentences"], {"Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan.": 2}
+        )
+        self.assertEqual(
+            merged["P6"]["Q399"]["sentences"],
+            {"Armenia blah blah blah Nikol Pashinyan": 1, "Armenia blah blah blah Nikol Pashinyan blub": 1},
+        )
+        self.assertEqual(merged["P2"]["Q548114"]["sentences"], {})
+        self.assertEqual(list(merged), list(relation_info_dict_1))
+        self.assertEqual(merged["P31"], {})
+
+    def test_measure_alias_importance_good(self):
+        relation_info_dict = copy.deepcopy(self.entity_relation_result_info_dict_1)
+        for entities in relation_info_dict.values():
+            for fact in entities.values():
+                fact.update(dict(zip(utility.ALIAS_OCCURRENCE_KEYS, [fact["occurrences"], 0, 0, 0])))
+        relation_info_dict["P6"]["Q399"].update(
+            {"occurrences": 4, "label_occurrences": 0, "subj_alias_occurrences": 3, "obj_alias_occurrences": 1}
+        )
+        relation_info_dict["P2"]["Q5626824"].update({"occurrences": 3, "subj_alias_occurrences": 3})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            utility.save_dict_as_json(relation_info_dict, os.path.join(tmp_dir, "relation_occurrence_info.json"))
+            for i in range(2):
+                utility.save_relation_occurrence_info_parquet(
+                    relation_info_dict, os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet")
+                )
+            utility.merge_relation_occurrence_info_parquet_files(
+                [os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet") for i in range(2)],
+                os.path.join(tmp_dir, "joined.parquet"),
+            )
+            json_importance = utility.measure_alias_importance(os.path.join(tmp_dir, "relation_occurrence_info.json"))
+            parquet_importance = utility.measure_alias_importance(
+                os.path.join(tmp_dir, "0_relation_occurrence_info.parquet")
+            )
+            merged = utility.load_relation_occurrence_info(os.path.join(tmp_dir, "joined.parquet"))
+            merged_importance = utility.measure_alias_importance(os.path.join(tmp_dir, "joined.parquet"))
+            utility.save_relation_occurrence_info_parquet(
+                self.entity_relation_result_info_dict_2, os.path.join(tmp_dir, "no_attribution.parquet")
+            )
+            with self.assertRaises(ValueError):
+                utility.measure_alias_importance(os.path.join(tmp_dir, "no_attribution.parquet"))
+
+        self.assertEqual(json_importance, parquet_importance)
+        self.assertEqual(merged["P6"]["Q399"]["subj_alias_occurrences"], 6)
+        self.assertEqual(merged_importance["average_alias_increase"], 2 * parquet_importance["average_alias_increase"])
+        self.assertEqual(parquet_importance["subjects_with_aliases"], 0.6)
+        self.assertEqual(parquet_importance["objects_with_aliases"], 0.0)
+        self.assertEqual(parquet_importance["facts_with_matches"], 4)
+        self.assertEqual(parquet_importance["facts_with_alias_matches"], 2)
+        self.assertEqual(parquet_importance["facts_with_label_matches_only"], 2)
+        self.assertEqual(parquet_importance["facts_without_matches"], 1)
+        self.assertEqual(parquet_importance["facts_without_label_matches"], 3)
+        self.assertEqual(
+            parquet_importance["alias_matches_by_alias_type"], {"subj_and_obj": 0.5, "subj": 0.5, "obj": 0.0}
+        )
+        self.assertEqual(parquet_importance["alias_importance"], 0.5)
+        self.assertEqual(parquet_importance["average_alias_increase"], 3.5)
+        self.assertEqual(
+            parquet_importance["occurrences"],
+            {
+                "label_occurrences": 2,
+                "subj_alias_occurrences": 6,
+                "obj_alias_occurrences": 1,
+                "subj_obj_alias_occurrences": 0,
+            },
+        )
+
+    def test_sample_sentences_good(self):
+        sentences = {f"Sentence {i}.": i for i in range(20)}
+        expected = sorted(sentences, key=utility.get_sentence_priority)[:3]
+
+        self.assertEqual(utility.sample_sentences(sentences, None, "reservoir"), sentences)
+        self.assertEqual(
+            utility.sample_sentences(sentences, 3, "first"), {"Sentence 0.": 0, "Sentence 1.": 1, "Sentence 2.": 2}
+        )
+        self.assertEqual(
+            utility.sample_sentences(sentences, 3, "reservoir"),
+            {sentence: sentences[sentence] for sentence in expected},
+        )
+        self.assertEqual(utility.get_sentence_priority("Sentence 0."), 339521550547668041)
+
+    def test_merge_relation_occurrence_info_files_max_sentences_per_fact(self):
+        relation_info_dict_1 = copy.deepcopy(self.entity_relation_result_info_dict_1)
+        relation_info_dict_2 = copy.deepcopy(self.entity_relation_result_info_dict_2)
+        sentences = ["Armenia blah blah blah Nikol Pashinyan", "Armenia blah blah blah Nikol Pashinyan blub"]
+        expected_sentence = min(sentences, key=utility.get_sentence_priority)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i, relation_info_dict in enumerate([relation_info_dict_1, relation_info_dict_2]):
+                utility.save_dict_as_json(relation_info_dict, os.path.join(tmp_dir, f"{i}.json"))
+                utility.save_relation_occurrence_info_parquet(
+                    relation_info_dict,
+                    os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet"),
+                    os.path.join(tmp_dir, f"{i}_relation_occurrence_sentences.parquet"),
+                )
+            merged_json = {}
+            merged_parquet = {}
+            for sentence_sampling in ["reservoir", "first"]:
+                utility.merge_relation_occurrence_info_json_files(
+                    [os.path.join(tmp_dir, f"{i}.json") for i in range(2)],
+                    os.path.join(tmp_dir, "merged.json"),
+                    merge_sentences=True,
+                    max_sentences_per_fact=1,
+                    sentence_sampling=sentence_sampling,
+                )
+                merged_json[sentence_sampling] = utility.load_json_dict(os.path.join(tmp_dir, "merged.json"))
+                utility.merge_relation_occurrence_info_parquet_files(
+                    [os.path.join(tmp_dir, f"{i}_relation_occurrence_info.parquet") for i in range(2)],
+                    os.path.join(tmp_dir, "joined.parquet"),
+                    [os.path.join(tmp_dir, f"{i}_relation_occurrence_sentences.parquet") for i in range(2)],
+                    os.path.join(tmp_dir, "joined_sentences.parquet"),
+                    max_sentences_per_fact=1,
+                    sentence_sampling=sentence_sampling,
+                )
+                merged_parquet[sentence_sampling] = utility.load_relation_occurrence_info(
+                    os.path.join(tmp_dir, "joined.parquet"),
+                    sentences_file_path=os.path.join(tmp_dir, "joined_sentences.parquet"),
+                )
+
+        for merged in [merged_json, merged_parquet]:
+            self.assertEqual(merged["reservoir"]["P6"]["Q399"]["occurrences"], 2)
+            self.assertEqual(merged["reservoir"]["P6"]["Q399"]["sentences"], {expected_sentence: 1})
+            self.assertEqual(merged["first"]["P6"]["Q399"]["sentences"], {sentences[0]: 1})
+            self.assertEqual(merged["first"]["P2"]["Q5626824"]["sentences"], {"sentence 1": 1})
+            self.assertEqual(
+                merged["first"]["P6"]["Q1519"]["sentences"],
+                {"Abu Dhabi blah blah blah Khalifa bin Zayed Al Nahyan.": 2},
+            )
+
+    def test_join_relation_info_json_files_good_1(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            utility.save_dict_as_json(
+                self.entity_relation_result_info_dict_1, os.path.join(tmp_dir, "0_relation_info.json")
+            )
+            utility.save_dict_as_json(
+                self.entity_relation_result_info_dict_2, os.path.join(tmp_dir, "1_relation_info.json")
+            )
+            utility.join_relation_occurrences_info_json_files(tmp_dir)
+            self.assertEqual(
+                utility.load_json_dict(os.path.join(tmp_dir, "joined_relation_occurrence_info.json")),
                 {
                     "P6": {
                         "Q1519": {
@@ -195,5 +463,4 @@ class UtilityTest(unittest.TestCase):
                         },
                     },
                 },
-                "output/joined_relation_occurrence_info.json",
             )
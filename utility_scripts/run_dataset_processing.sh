@@ -1,9 +1,8 @@
 #!/bin/bash
 
-CUR_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
-
 # Configuration
 #NUM_SLICES=4                                   # Number of slices to divide the dataset into
+#NUM_WORKERS=4                                  # Optional, number of worker processes per slice (default NUM_SLICES)
 #DATASET_PATH=""                                # Pass as string
 #DATASET_NAME=""                                # Optional
 #BEAR_DATA_PATH="BEAR"
@@ -14,48 +13,23 @@ CUR_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 #MATCHER_TYPE="simple"
 #SAVE_FILE_CONTENT_IN_SLICE="True"                       # Pass as string (Should always be True)
 
-# Create output directory if it doesn't exist
-mkdir -p "$REL_INFO_OUTPUT_DIR"
-
-mkdir -p "$REL_INFO_OUTPUT_DIR"/slice_infos
-
-cleanup() {
-    echo "Terminating all background processes..."
-    pkill -P $$  # Kill all child processes of the current script
-    exit 1
-}
-
-# Set up trap to catch SIGINT (Ctrl+C) and call the cleanup function
-trap cleanup SIGINT
-
-# Download the dataset
-python3 -c "import datasets; datasets.load_dataset('${DATASET_PATH}', '${DATASET_NAME}', split='train')"
-
-# Loop through each slice and assign a Python processing job
-for (( i=0; i<NUM_SLICES; i++ )); do
-
-    # Run the slice processor in the background with the specified GPU
-    python3 ${CUR_DIR}/slice_processor.py \
-        --dataset_path "$DATASET_PATH" \
-        --dataset_name "$DATASET_NAME" \
-        --bear_data_path "$BEAR_DATA_PATH" \
-        --bear_facts_path "$BEAR_FACTS_PATH" \
-        --path_to_all_entities "$PATH_TO_ALL_ENTITIES" \
-        --exclude_aliases "$EXCLUDE_ALIASES" \
-        --rel_info_output_dir "$REL_INFO_OUTPUT_DIR" \
-        --matcher_type "$MATCHER_TYPE" \
-        --total_slices $NUM_SLICES \
-        --slice_num $((i)) \
-        --save_file_content "$SAVE_FILE_CONTENT_IN_SLICE" &
-
-done
-
-# Wait for all background processes to finish
-wait
-echo "All slices processed."
-
-# Merge the slices
-python3 -c "from utility.utility import join_relation_occurrences_info_json_files; join_relation_occurrences_info_json_files('${REL_INFO_OUTPUT_DIR}')"
+# Exit with the exit code of the first failing command, so a failed slice never ends in a merged result
+set -e
+
+# Match the facts in all slices (a restarted run skips the finished slices) and merge the slices
+sample-efficiency-evaluation match \
+    --dataset_path "$DATASET_PATH" \
+    --dataset_name "$DATASET_NAME" \
+    --bear_data_path "$BEAR_DATA_PATH" \
+    --bear_facts_path "$BEAR_FACTS_PATH" \
+    --path_to_all_entities "$PATH_TO_ALL_ENTITIES" \
+    --exclude_aliases "$EXCLUDE_ALIASES" \
+    --rel_info_output_dir "$REL_INFO_OUTPUT_DIR" \
+    --matcher_type "$MATCHER_TYPE" \
+    --total_slices "$NUM_SLICES" \
+    --num_workers "${NUM_WORKERS:-$NUM_SLICES}" \
+    --save_file_content "$SAVE_FILE_CONTENT_IN_SLICE"
+echo "All slices processed and merged."
 
 # Create Diagram
-python3 -c "from utility.utility import create_fact_occurrence_histogram; create_fact_occurrence_histogram('${REL_INFO_OUTPUT_DIR}/joined_relation_occurrence_info.json')"
+sample-efficiency-evaluation histogram "$REL_INFO_OUTPUT_DIR/joined_relation_occurrence_info.json"